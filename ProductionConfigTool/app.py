@@ -1,16 +1,30 @@
 import streamlit as st
-import serial.tools.list_ports
 import pandas as pd
-import numpy as np
 import time
 import datetime
-import matplotlib.pyplot as plt
 import io
-from serial_handler import SerialHandler
+import threading
+from serial_handler import SerialHandler, DEFAULT_BAUDRATE, HIGH_SPEED_BAUDRATES
 from packet_builder import PacketBuilder
-from test_functions import run_test
+from test_functions import run_test_outcome
 from utils import get_current_datetime_bytes
 from automated_test import automated_test_ui
+from provisioning import provisioning_ui
+from hands_free import hands_free_ui
+from config_profiles import ProfileLibrary, sku_profile_name
+from port_discovery import PortDiscovery
+from result_uploader import ResultUploader
+from yield_monitor import YieldMonitor
+from spc_monitor import SPCMonitor, LINE_WIDE
+from measurement_limits import load_limits, check_limits, capability, MEASUREMENT_LABELS
+from test_engine import MEASUREMENT_NAMES, describe_failure
+from failure_index import FailureIndex
+from history_store import HistoryStore
+from history_import import CSV_COLUMNS
+from cycle_time import cycle_time_report
+from sampling_profiler import SamplingProfiler
+from test_plan import resolve_test_plan, load_plan_overrides
+from station_state import StationState, RESULT_COLUMNS
 
 # Set page title and configuration
 st.set_page_config(
@@ -21,93 +35,446 @@ st.set_page_config(
 
 st.title("스위치 생산 설정 및 검사 프로그램")
 
-# Function to update test statistics
-def update_test_statistics(test_name, result):
+def finish_profiled_run():
+    """Stop sampling the run that just ended and save the profile after the last one"""
+    st.session_state.profiler.stop()
+    st.session_state.profile_runs_left -= 1
+    if st.session_state.profile_runs_left == 0:
+        st.session_state.profile_path = st.session_state.profiler.save()
+
+# On-demand sampling profiler covering the next reruns (see "성능 진단" in the sidebar).
+# A profiled run that ended early (st.rerun() or an exception) never reached the end of
+# the script, so it is still sampling here and is finished first.
+if st.session_state.get('profiler') is not None and st.session_state.profiler.running:
+    finish_profiled_run()
+profiling_run = st.session_state.get('profile_runs_left', 0) > 0
+if profiling_run:
+    st.session_state.profiler.start(threading.get_ident())
+
+PRODUCT_TYPES = {0x5B: "조명 스위치", 0x5C: "콘센트 스위치", 0x5D: "디밍 스위치"}
+
+# Failed rows loaded for the detail table when analyzing stored history
+HISTORY_FAILURE_ROWS = 1000
+
+# History store field -> result table column
+HISTORY_COLUMN_LABELS = {field: column for column, field in CSV_COLUMNS.items()}
+
+# Stored fields read for the cycle-time report
+CYCLE_TIME_FIELDS = ["time", "test", "result", "mac", "fixture", "failure_cause", "duration"]
+
+# Cycle-time statistics column -> label
+LATENCY_LABELS = {
+    'test': '테스트', 'fixture': '픽스처', 'count': '검사 수', 'mean': '평균 (초)', 'p50': 'P50 (초)',
+    'p90': 'P90 (초)', 'p95': 'P95 (초)', 'max': '최대 (초)', 'total': '합계 (초)',
+    'time_share': '시간 비중 (%)', 'timeout_share': '시간 초과 비율 (%)'
+}
+
+# Function to generate charts (cached: only re-rendered when the data changes)
+@st.cache_data(max_entries=64, show_spinner=False)
+def generate_chart(data, x_col, y_col, title, kind='bar', color=None):
+    """Generate a matplotlib chart and return it as a Streamlit figure"""
+    # matplotlib is only imported once a chart is actually needed
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    
+    fig, ax = plt.subplots(figsize=(10, 5))
+    
+    if kind == 'bar':
+        if color:
+            data.plot(kind=kind, x=x_col, y=y_col, ax=ax, color=color, rot=45)
+        else:
+            data.plot(kind=kind, x=x_col, y=y_col, ax=ax, rot=45)
+    elif kind == 'pie':
+        # For pie charts, we need to handle data differently
+        data[y_col].plot(kind=kind, ax=ax, autopct='%1.1f%%')
+        ax.set_ylabel('')
+    
+    ax.set_title(title)
+    ax.grid(True, linestyle='--', alpha=0.7)
+    
+    # Adjust layout
+    plt.tight_layout()
+    
+    # Convert plot to a Streamlit-compatible format
+    buf = io.BytesIO()
+    plt.savefig(buf, format='png')
+    
+    # Close the plot to prevent memory leaks
+    plt.close(fig)
+    
+    return buf.getvalue()
+
+# Serial port discovery runs in the background and is shared by all sessions
+@st.cache_resource
+def get_port_discovery():
+    """Return the process-wide port discovery service"""
+    return PortDiscovery().start()
+
+# Profile library shared by all sessions (compiled templates are cached inside)
+@st.cache_resource
+def get_profile_library():
+    """Return the process-wide configuration profile library"""
+    return ProfileLibrary()
+
+def record_test_result(test_name, result, test_time=None, measurements=None, failure_code=None, cause=None,
+                       fixture=None, config_data=None, duration=None):
     """
-    Update test statistics for the given test
+    Add a test result to the result table, statistics and result upload queue
     
     Args:
-        test_name (str): Name of the test
+        test_name (str): Name of the test (e.g. "터치 검사")
         result (str): Result of the test ('통과' or '실패')
+        test_time (str): Time of the test (default: now)
+        measurements (dict): Numeric measurements decoded from the response
+        failure_code (int): Result code of a failed test (None if the device did not answer)
+        cause (str): Failure cause (default: looked up from failure_code)
+        fixture (str): Fixture the unit was tested on (default: the connected fixture)
+        config_data (dict): Configuration of the tested unit (default: the current configuration)
+        duration (float): Test duration in seconds (monotonic clock)
     """
-    # Update test counts by type
-    today = datetime.datetime.now().strftime("%Y-%m-%d")
-    
-    # If the test doesn't exist in the DataFrame, add it
-    if not any(st.session_state.test_count_by_type['테스트'] == test_name):
-        new_test = pd.DataFrame({
-            '테스트': [test_name],
-            '통과 수': [1 if result == '통과' else 0],
-            '실패 수': [1 if result == '실패' else 0],
-            '총 검사 수': [1],
-            '통과율': [100.0 if result == '통과' else 0.0]
-        })
-        st.session_state.test_count_by_type = pd.concat([st.session_state.test_count_by_type, new_test], ignore_index=True)
-    else:
-        # Update existing test statistics
-        test_idx = st.session_state.test_count_by_type[st.session_state.test_count_by_type['테스트'] == test_name].index[0]
-        
-        if result == '통과':
-            st.session_state.test_count_by_type.at[test_idx, '통과 수'] += 1
-        else:
-            st.session_state.test_count_by_type.at[test_idx, '실패 수'] += 1
-            
-        st.session_state.test_count_by_type.at[test_idx, '총 검사 수'] += 1
-        
-        # Calculate pass rate
-        pass_count = st.session_state.test_count_by_type.at[test_idx, '통과 수']
-        total_count = st.session_state.test_count_by_type.at[test_idx, '총 검사 수']
-        pass_rate = (pass_count / total_count) * 100 if total_count > 0 else 0
-        st.session_state.test_count_by_type.at[test_idx, '통과율'] = pass_rate
-    
-    # Update daily pass rate
-    if not any(st.session_state.daily_pass_rate['날짜'] == today):
-        new_day = pd.DataFrame({
-            '날짜': [today],
-            '통과 수': [1 if result == '통과' else 0],
-            '실패 수': [1 if result == '실패' else 0],
-            '총 검사 수': [1],
-            '통과율': [100.0 if result == '통과' else 0.0]
-        })
-        st.session_state.daily_pass_rate = pd.concat([st.session_state.daily_pass_rate, new_day], ignore_index=True)
-    else:
-        # Update existing day statistics
-        day_idx = st.session_state.daily_pass_rate[st.session_state.daily_pass_rate['날짜'] == today].index[0]
+    config_data = config_data or st.session_state.config_data
+    
+    if result == '실패' and cause is None:
+        cause = describe_failure(test_name.removesuffix(" 검사"), failure_code)
+    
+    record = {
+        '테스트': test_name,
+        '결과': result,
+        '시간': test_time or datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        '제품 종류': PRODUCT_TYPES.get(config_data['product_type'], "알 수 없음"),
+        '조명 회로': config_data['light_circuits'],
+        '콘센트 회로': config_data['outlet_circuits'],
+        '디밍 종류': config_data['dimming_type'],
+        'MAC 주소': config_data['mac_address'],
+        '픽스처': fixture or st.session_state.get('fixture_name') or "",
+        '오류 코드': failure_code if result == '실패' else None,
+        '원인': cause if result == '실패' else None,
+        '소요 시간 (초)': duration,
+    }
+    
+    # Store numeric measurements in the typed measurement table
+    measurement_row = None
+    if measurements:
+        measurement_row = {
+            '시간': record['시간'],
+            'MAC 주소': record['MAC 주소'],
+            'SKU': sku_profile_name(config_data),
+            '픽스처': record['픽스처'],
+            **{name: measurements.get(name) for name in MEASUREMENT_NAMES},
+        }
+    
+    # Result table, statistics and failure index are shared by the whole station
+    st.session_state.station.add_result(record, measurement_row)
+    
+    # Feed the live yield monitor
+    get_yield_monitor().add_result(test_name, result, record['MAC 주소'])
+    
+    # Statistical process control per test and fixture
+    for alert in get_spc_monitor().add_result(test_name, result, record['픽스처']):
+        st.toast(f"⚠️ {alert['fixture']} 픽스처 {alert['test']} 실패율 이상 ({alert['method']})")
+    
+    result_fields = {
+        'time': record['시간'],
+        'test': test_name,
+        'result': result,
+        'product': record['제품 종류'],
+        'mac': record['MAC 주소'],
+        'fixture': record['픽스처'],
+        'light_circuits': int(record['조명 회로']),
+        'outlet_circuits': int(record['콘센트 회로']),
+        'dimming_type': int(record['디밍 종류']),
+        'failure_code': record['오류 코드'],
+        'failure_cause': record['원인'],
+        'duration': duration,
+    }
+    
+    # Keep the result in the local columnar history
+    get_history_store().append(result_fields)
+    
+    # Push to the line aggregation server if configured
+    uploader = station.result_uploader
+    if uploader is not None:
+        uploader.enqueue({**result_fields, **(measurements or {})})
+
+def run_and_record_test(test_type):
+    """
+    Run one test on the connected device and record its outcome
+    
+    Args:
+        test_type (str): Type of test to run (e.g. "터치")
+    """
+    station = st.session_state.station
+    with station.device_lock:
+        test_start = time.monotonic()
+        outcome = run_test_outcome(test_type, station.serial_handler)
+        duration = time.monotonic() - test_start
+    record_test_result(
+        f"{test_type} 검사",
+        outcome["result"],
+        measurements=outcome["measurements"],
+        failure_code=outcome["result_code"] if outcome["cause"] else None,
+        cause=outcome["cause"],
+        duration=duration
+    )
+
+# The history store buffers appends, so every session must share one instance
+@st.cache_resource
+def get_history_store():
+    """Return the process-wide result history store"""
+    return HistoryStore()
+
+# Live yield statistics are shared by all sessions of the station
+@st.cache_resource
+def get_yield_monitor():
+    """Return the process-wide yield monitor"""
+    return YieldMonitor(windows=(900, 3600))
+
+@st.fragment(run_every=5)
+def show_live_yield():
+    """Render the live yield view (re-run every 5 seconds without a full rerun)"""
+    snapshot = get_yield_monitor().snapshot()
+    shift = snapshot["shift"]
+    
+    st.subheader("실시간 수율")
+    st.caption(f"교대 시작: {datetime.datetime.fromtimestamp(shift['started_at']).strftime('%Y-%m-%d %H:%M:%S')}")
+    
+    if shift["tests"] == 0:
+        st.info("이번 교대의 검사 데이터가 없습니다.")
+        return
+    
+    shift_col1, shift_col2, shift_col3 = st.columns(3)
+    with shift_col1:
+        st.metric("교대 검사 수", shift["tests"])
+    with shift_col2:
+        st.metric("교대 통과율", f"{shift['pass_rate']:.1f}%")
+    with shift_col3:
+        st.metric("교대 제품 수", shift["units"])
+    
+    for window in snapshot["windows"]:
+        st.markdown(f"#### 최근 {window['window_seconds'] // 60}분")
         
-        if result == '통과':
-            st.session_state.daily_pass_rate.at[day_idx, '통과 수'] += 1
-        else:
-            st.session_state.daily_pass_rate.at[day_idx, '실패 수'] += 1
-            
-        st.session_state.daily_pass_rate.at[day_idx, '총 검사 수'] += 1
+        win_col1, win_col2, win_col3, win_col4 = st.columns(4)
+        with win_col1:
+            st.metric("직행률 (FPY)", f"{window['first_pass_yield']:.1f}%" if window['first_pass_yield'] is not None else "-")
+        with win_col2:
+            st.metric("통과율", f"{window['pass_rate']:.1f}%" if window['pass_rate'] is not None else "-")
+        with win_col3:
+            st.metric("시간당 생산량 (UPH)", f"{window['units_per_hour']:.0f}")
+        with win_col4:
+            st.metric("검사 수", window["tests"])
         
-        # Calculate pass rate
-        pass_count = st.session_state.daily_pass_rate.at[day_idx, '통과 수']
-        total_count = st.session_state.daily_pass_rate.at[day_idx, '총 검사 수']
-        pass_rate = (pass_count / total_count) * 100 if total_count > 0 else 0
-        st.session_state.daily_pass_rate.at[day_idx, '통과율'] = pass_rate
+        if window["failure_rate_by_test"]:
+            st.dataframe(
+                pd.DataFrame(
+                    list(window["failure_rate_by_test"].items()),
+                    columns=['테스트', '실패율 (%)']
+                ).round(2),
+                use_container_width=True,
+                hide_index=True
+            )
+    
+    if st.button("새 교대 시작"):
+        get_yield_monitor().reset()
+        st.rerun()
+
+# SPC streams are shared by all sessions of the station
+@st.cache_resource
+def get_spc_monitor():
+    """Return the process-wide SPC monitor"""
+    return SPCMonitor()
+
+def show_spc():
+    """Render SPC status, p-charts and alerts"""
+    spc = get_spc_monitor()
+    summary = spc.summary()
+    
+    st.subheader("공정 관리 (SPC)")
+    
+    if not summary:
+        st.info("검사 데이터가 없습니다. 검사를 실행하여 데이터를 수집하세요.")
+        return
+    
+    # Per test and fixture detector state
+    summary_df = pd.DataFrame(summary).rename(columns={
+        'test': '테스트', 'fixture': '픽스처', 'results': '검사 수', 'failure_rate': '실패율',
+        'baseline': '라인 기준 실패율', 'ewma': 'EWMA', 'cusum': 'CUSUM', 'alarm': '이상'
+    })
+    st.dataframe(summary_df.round(4), use_container_width=True, hide_index=True)
+    
+    # p-chart for a selected test and fixture
+    chart_col1, chart_col2 = st.columns(2)
+    with chart_col1:
+        spc_test = st.selectbox("테스트", spc.tests(), key="spc_test")
+    with chart_col2:
+        spc_fixture = st.selectbox("픽스처", ["전체 라인"] + spc.fixtures(spc_test), key="spc_fixture")
+    
+    points = spc.p_chart(spc_test, LINE_WIDE if spc_fixture == "전체 라인" else spc_fixture)
+    if points:
+        chart_df = pd.DataFrame(points)
+        chart_df['시간'] = pd.to_datetime(chart_df['time'], unit='s')
+        st.line_chart(
+            chart_df.set_index('시간')[['p', 'center', 'ucl']].rename(
+                columns={'p': '실패율', 'center': '중심선', 'ucl': '관리 상한'}
+            )
+        )
+    else:
+        st.caption(f"p-관리도는 {spc.subgroup_size}건 단위로 표시됩니다.")
+    
+    # Recent alerts
+    st.subheader("이상 경보")
+    if spc.alerts:
+        alerts_df = pd.DataFrame(list(spc.alerts)[::-1])
+        alerts_df['time'] = pd.to_datetime(alerts_df['time'], unit='s').dt.strftime("%Y-%m-%d %H:%M:%S")
+        st.dataframe(
+            alerts_df.rename(columns={
+                'time': '시간', 'test': '테스트', 'fixture': '픽스처', 'method': '검출 방식',
+                'value': '통계량', 'limit': '한계', 'baseline': '라인 기준 실패율',
+                'failure_rate': '픽스처 실패율', 'results': '검사 수'
+            }).round(4),
+            use_container_width=True,
+            hide_index=True
+        )
+    else:
+        st.success("이상 경보가 없습니다.")
+
+# Tolerance tables change rarely; reload them at most once a minute
+@st.cache_data(ttl=60)
+def get_measurement_limits():
+    """Return the per-SKU tolerance table"""
+    return load_limits()
+
+# Test plan overrides change rarely; reload them at most once a minute
+@st.cache_data(ttl=60)
+def get_test_plan_overrides():
+    """Return the per-SKU test plan overrides"""
+    return load_plan_overrides()
+
+def current_test_plan():
+    """Return the test sequence for the configuration being produced"""
+    return resolve_test_plan(st.session_state.config_data, get_test_plan_overrides())
+
+def station_product_stats(state):
+    """Pass/fail counts and pass rate per product type of the station's results"""
+    # Group by product type and calculate statistics
+    product_stats = state.test_results.groupby('제품 종류').agg(
+        통과=('결과', lambda x: (x == '통과').sum()),
+        실패=('결과', lambda x: (x == '실패').sum()),
+        총검사수=('결과', 'count')
+    ).reset_index()
+    
+    # Calculate pass rate
+    product_stats['통과율'] = (product_stats['통과'] / product_stats['총검사수'] * 100).round(2)
+    return product_stats
+
+def show_cycle_time_analysis(report):
+    """Render per-test latency distributions, slowest tests and fixtures, and timeout share"""
+    timed = report["timed"]
+    
+    st.subheader("사이클 타임 분석")
+    
+    if timed.empty:
+        st.info("소요 시간이 기록된 검사가 없습니다.")
+        return
+    
+    metric_col1, metric_col2, metric_col3, metric_col4 = st.columns(4)
+    with metric_col1:
+        st.metric("측정된 검사 수", len(timed))
+    with metric_col2:
+        st.metric("검사당 평균", f"{timed['duration'].mean():.3f}초")
+    with metric_col3:
+        st.metric("시간 초과 비율", f"{timed['timeout'].mean() * 100:.1f}%")
+    with metric_col4:
+        st.metric("시간 초과 시간 비중", f"{report['timeout_time_share']:.1f}%")
+    
+    # Latency distribution per test, slowest first
+    import altair as alt
+    st.markdown("#### 검사별 소요 시간 분포")
+    st.altair_chart(
+        alt.Chart(timed[['test', 'duration']]).mark_boxplot(extent='min-max').encode(
+            x=alt.X('test:N', title='테스트', sort=list(report['by_test']['test'])),
+            y=alt.Y('duration:Q', title='소요 시간 (초)')
+        ),
+        use_container_width=True
+    )
+    
+    st.markdown("#### 검사별 소요 시간")
+    st.dataframe(report['by_test'].rename(columns=LATENCY_LABELS).round(3), use_container_width=True, hide_index=True)
+    
+    st.markdown("#### 픽스처별 소요 시간")
+    st.dataframe(report['by_fixture'].rename(columns=LATENCY_LABELS).round(3), use_container_width=True, hide_index=True)
+    
+    st.markdown("#### 가장 오래 걸린 검사")
+    st.dataframe(
+        report['slowest'].drop(columns=['timeout']).rename(columns=HISTORY_COLUMN_LABELS).round(3),
+        use_container_width=True,
+        hide_index=True
+    )
+
+def show_measurement_analysis():
+    """Render limit checks and process capability of the numeric measurements"""
+    measurements = st.session_state.station.measurements
+    
+    st.subheader("측정값 분석")
+    
+    if measurements.empty:
+        st.info("측정 데이터가 없습니다. 미터링 검사를 실행하여 데이터를 수집하세요.")
+        return
+    
+    limits = get_measurement_limits()
+    checks = check_limits(measurements, limits)
+    
+    metric_col1, metric_col2, metric_col3 = st.columns(3)
+    with metric_col1:
+        st.metric("측정 수", len(measurements))
+    with metric_col2:
+        st.metric("규격 이탈", int((~checks['in_spec']).sum()))
+    with metric_col3:
+        st.metric("규격 합격률", f"{checks['in_spec'].mean() * 100:.1f}%")
+    
+    # Capability per SKU and measurement
+    st.markdown("#### 공정 능력 (Cpk)")
+    capability_df = capability(measurements, limits)
+    capability_df['measurement'] = capability_df['measurement'].map(MEASUREMENT_LABELS)
+    st.dataframe(
+        capability_df.rename(columns={
+            'measurement': '측정 항목', 'n': '측정 수', 'mean': '평균', 'std': '표준편차',
+            'lsl': '하한 규격', 'usl': '상한 규격', 'cp': 'Cp', 'cpk': 'Cpk', 'out_of_spec': '규격 이탈'
+        }).round(3),
+        use_container_width=True,
+        hide_index=True
+    )
+    
+    # Rows outside their SKU limits
+    out_of_spec = measurements[~checks['in_spec']]
+    if not out_of_spec.empty:
+        st.markdown("#### 규격 이탈 측정값")
+        st.dataframe(
+            out_of_spec.rename(columns=MEASUREMENT_LABELS),
+            use_container_width=True,
+            hide_index=True
+        )
+
+# Results, statistics and the device connection belong to the station, not to a browser session
+@st.cache_resource
+def get_station_state():
+    """Return the process-wide station state"""
+    return StationState()
+
+station = get_station_state()
+st.session_state.station = station
 
 # Initialize session state variables if they don't exist
-if 'serial_connected' not in st.session_state:
-    st.session_state.serial_connected = False
-if 'serial_handler' not in st.session_state:
-    st.session_state.serial_handler = None
-if 'test_results' not in st.session_state:
-    st.session_state.test_results = pd.DataFrame(columns=['테스트', '결과', '시간', '제품 종류', '조명 회로', '콘센트 회로', '디밍 종류'])
-if 'daily_pass_rate' not in st.session_state:
-    st.session_state.daily_pass_rate = pd.DataFrame(columns=['날짜', '통과 수', '실패 수', '총 검사 수', '통과율'])
-if 'test_count_by_type' not in st.session_state:
-    st.session_state.test_count_by_type = pd.DataFrame(columns=['테스트', '통과 수', '실패 수', '총 검사 수', '통과율'])
 if 'auto_test_running' not in st.session_state:
     st.session_state.auto_test_running = False
+
 if 'auto_test_results' not in st.session_state:
     st.session_state.auto_test_results = {}
 if 'test_sequence' not in st.session_state:
-    st.session_state.test_sequence = [
-        "터치", "도플러 센서", "IR", "콘센트 릴레이", "조명 릴레이", "미터링", "LED", "부저"
-    ]
-# 테스트 통계 업데이트 함수 세션 상태에 저장
-st.session_state.update_test_statistics = update_test_statistics
+    st.session_state.test_sequence = None  # None: follow the product test plan
+# 결과 기록 함수 세션 상태에 저장
+st.session_state.record_test_result = record_test_result
+st.session_state.current_test_plan = current_test_plan
 if 'config_data' not in st.session_state:
     st.session_state.config_data = {
         'product_type': 0x5B,  # Default: Light switch
@@ -139,40 +506,141 @@ if 'config_data' not in st.session_state:
 # Serial Communication Setup
 st.sidebar.header("통신 설정")
 
-# Get available COM ports
-ports = [port.device for port in serial.tools.list_ports.comports()]
-selected_port = st.sidebar.selectbox("시리얼 포트 선택", ports)
+# Get available COM ports (cached list kept current by the discovery service)
+port_discovery = get_port_discovery()
+if st.sidebar.button("포트 새로고침"):
+    port_discovery.rescan()
+port_info = {port["device"]: port for port in port_discovery.ports()}
+selected_port = st.sidebar.selectbox(
+    "시리얼 포트 선택",
+    list(port_info.keys()),
+    format_func=lambda device: f"{device} ({port_info[device]['fixture']})" if port_info[device]["fixture"] else device
+)
+
+# Fixture assigned to the selected port (matched by USB serial number)
+st.session_state.fixture_name = port_info[selected_port]["fixture"] if selected_port else None
+
+if selected_port and port_info[selected_port]["serial_number"]:
+    with st.sidebar.expander("픽스처 지정"):
+        st.caption(f"USB 시리얼 번호: {port_info[selected_port]['serial_number']}")
+        fixture_name = st.text_input("픽스처 이름", value=st.session_state.fixture_name or "")
+        if st.button("픽스처 저장"):
+            port_discovery.assign_fixture(port_info[selected_port]["serial_number"], fixture_name)
+            st.rerun()
+
+# Opt-in link speed negotiation (the rate that worked is remembered per fixture)
+negotiate_link = st.sidebar.checkbox("고속 통신 (보레이트 협상)", value=False, disabled=station.serial_connected)
 
-if st.sidebar.button("연결" if not st.session_state.serial_connected else "연결 해제"):
-    if not st.session_state.serial_connected:
+if st.sidebar.button("연결" if not station.serial_connected else "연결 해제"):
+    if not station.serial_connected:
         try:
-            st.session_state.serial_handler = SerialHandler(selected_port, 115200)
-            st.session_state.serial_connected = True
-            st.sidebar.success(f"{selected_port}에 연결되었습니다.")
+            station.connect(SerialHandler(selected_port, DEFAULT_BAUDRATE))
+            if negotiate_link:
+                link_key = st.session_state.fixture_name or selected_port
+                remembered = port_discovery.link_baudrate(link_key)
+                candidates = ([remembered] if remembered else []) + [r for r in HIGH_SPEED_BAUDRATES if r != remembered]
+                baudrate = station.serial_handler.negotiate_baudrate(candidates)
+                port_discovery.record_link_baudrate(link_key, baudrate)
+            st.sidebar.success(f"{selected_port}에 연결되었습니다. ({station.serial_handler.serial.baudrate} bps)")
         except Exception as e:
             st.sidebar.error(f"연결 실패: {str(e)}")
     else:
-        if st.session_state.serial_handler:
-            st.session_state.serial_handler.close()
-        st.session_state.serial_connected = False
-        st.session_state.serial_handler = None
+        station.disconnect()
         st.sidebar.info("연결이 해제되었습니다.")
 
+# Wire-level capture of every frame exchanged on the connected port
+# The capture belongs to the shared connection: the checkbox shows its state and only a click changes it
+def toggle_capture():
+    if st.session_state.capture_enabled:
+        station.start_capture(selected_port)
+    else:
+        station.stop_capture()
+
+st.session_state.capture_enabled = station.capture_path is not None
+st.sidebar.checkbox("통신 캡처 기록", key="capture_enabled", on_change=toggle_capture,
+                    disabled=not station.serial_connected)
+if station.capture_path is not None:
+    st.sidebar.info(f"캡처 파일: {station.capture_path}")
+
+# Line aggregation server (results are queued offline while it is unreachable)
+# The uploader belongs to the station and is only replaced by an explicit apply, never while typing
+with st.sidebar.expander("결과 서버"):
+    uploader = station.result_uploader
+    # A new session starts from the uploader already running for the station
+    if 'server_url' not in st.session_state:
+        st.session_state.server_url = uploader.server_url if uploader else ""
+        st.session_state.station_id = uploader.station_id if uploader else "station-1"
+    server_url = st.text_input("서버 주소", key="server_url", placeholder="http://127.0.0.1:8600")
+    station_id = st.text_input("스테이션 이름", key="station_id")
+    apply_col, stop_col = st.columns(2)
+    with apply_col:
+        if st.button("적용", disabled=not server_url or not station_id):
+            station.set_result_uploader(ResultUploader(server_url, station_id))
+    with stop_col:
+        if st.button("전송 중지", disabled=uploader is None):
+            station.set_result_uploader(None)
+
+    uploader = station.result_uploader
+    if uploader is not None:
+        st.caption(f"{uploader.server_url} · 전송 완료 {uploader.uploaded}건 · 대기 배치 {uploader.spooled_batches}개")
+        if uploader.last_error:
+            st.caption(f"마지막 오류: {uploader.last_error}")
+
+# Diagnostics: sample where the script spends its time over the next reruns
+with st.sidebar.expander("성능 진단"):
+    profile_runs = st.number_input("프로파일링할 실행 횟수", min_value=1, max_value=100, value=5)
+    if st.button("프로파일링 시작", disabled=st.session_state.get('profile_runs_left', 0) > 0):
+        st.session_state.profiler = SamplingProfiler()
+        st.session_state.profile_runs_left = int(profile_runs)
+        st.session_state.profile_path = None
+    if st.session_state.get('profile_runs_left', 0) > 0:
+        st.caption(f"프로파일링 중: 남은 실행 {st.session_state.profile_runs_left}회 (화면 조작 시 실행됨)")
+
 # Connection status indicator
 st.sidebar.metric(
     "연결 상태", 
-    "연결됨" if st.session_state.serial_connected else "연결 안됨",
+    "연결됨" if station.serial_connected else "연결 안됨",
     delta=None,
     delta_color="off"
 )
 
 # Main content with tabs
-tab1, tab2, tab3 = st.tabs(["제품 설정", "검사 기능", "검사 데이터 분석"])
+tab1, provision_tab, tab2, tab3 = st.tabs(["제품 설정", "일괄 설정", "검사 기능", "검사 데이터 분석"])
 
 # Config Tab
 with tab1:
     st.header("제품 설정")
     
+    # Configuration profile library
+    profile_library = get_profile_library()
+    with st.expander("설정 프로필"):
+        profile_names = profile_library.list_profiles()
+        
+        load_col, save_col = st.columns(2)
+        
+        with load_col:
+            selected_profile = st.selectbox("저장된 프로필", options=profile_names)
+            if selected_profile:
+                profile_versions = profile_library.versions(selected_profile)
+                selected_version = st.selectbox(
+                    "버전",
+                    options=profile_versions[::-1],
+                    format_func=lambda v: f"v{v}"
+                )
+                if st.button("프로필 불러오기"):
+                    profile = profile_library.load(selected_profile, selected_version)
+                    st.session_state.config_data.update(profile["config"])
+                    st.rerun()
+        
+        with save_col:
+            profile_name = st.text_input("프로필 이름", value=sku_profile_name(st.session_state.config_data))
+            if st.button("현재 설정을 프로필로 저장"):
+                try:
+                    version = profile_library.save(profile_name, st.session_state.config_data)
+                    st.success(f"프로필 '{profile_name}' v{version}이(가) 저장되었습니다.")
+                except Exception as e:
+                    st.error(f"프로필 저장 실패: {str(e)}")
+    
     col1, col2 = st.columns(2)
     
     with col1:
@@ -383,18 +851,36 @@ with tab1:
     )
     st.session_state.config_data['relay_status'] = relay_status
     
+    # Verification mode for configuration send
+    verify_options = {"확인 안 함": None, "ACK 대기": "ack", "설정 읽기 비교": "readback"}
+    selected_verify = st.radio("전송 확인 방식", options=list(verify_options.keys()), horizontal=True)
+    verify_mode = verify_options[selected_verify]
+    
     # Send configuration button
-    if st.button("설정 전송", disabled=not st.session_state.serial_connected):
+    if st.button("설정 전송", disabled=not station.serial_connected):
         try:
             # Create packet builder with current configuration
             packet_builder = PacketBuilder(st.session_state.config_data)
             packet = packet_builder.build_packet()
             
-            # Send packet via serial
-            st.session_state.serial_handler.send_packet(packet)
-            
-            # Display success message and packet details
-            st.success("설정이 성공적으로 전송되었습니다.")
+            # Send packet via serial (with device verification if selected)
+            if verify_mode is None:
+                with station.device_lock:
+                    station.serial_handler.send_packet(packet)
+                    station.serial_handler.consume_acknowledgement()
+                st.success("설정이 성공적으로 전송되었습니다.")
+            else:
+                with station.device_lock:
+                    outcome = station.serial_handler.send_packet_verified(packet, mode=verify_mode)
+                if outcome["verified"]:
+                    st.success(f"설정이 전송되고 디바이스에서 확인되었습니다. (시도 {outcome['attempts']}회)")
+                else:
+                    st.error(f"설정 확인 실패 (시도 {outcome['attempts']}회): {outcome['error']}")
+                    if outcome["mismatches"]:
+                        st.dataframe(
+                            pd.DataFrame(outcome["mismatches"], columns=['항목', '전송값', '읽은값']),
+                            use_container_width=True
+                        )
             
             # Display the packet in hex for debugging
             packet_hex = ' '.join([f"{b:02X}" for b in packet])
@@ -403,12 +889,16 @@ with tab1:
         except Exception as e:
             st.error(f"전송 실패: {str(e)}")
 
+# Bulk provisioning Tab
+with provision_tab:
+    provisioning_ui(get_profile_library())
+
 # Testing Tab
 with tab2:
     st.header("제품 검사")
     
     # Create tabs for manual and automated testing
-    test_tab1, test_tab2 = st.tabs(["개별 검사", "자동화 검사 시퀀스"])
+    test_tab1, test_tab2, test_tab3 = st.tabs(["개별 검사", "자동화 검사 시퀀스", "핸즈프리 사이클"])
     
     # Manual Testing Tab
     with test_tab1:
@@ -417,216 +907,45 @@ with tab2:
         
         # Define test functions
         with test_col1:
-            if st.button("터치 검사", disabled=not st.session_state.serial_connected):
-                result = run_test("터치", st.session_state.serial_handler)
-                
-                # Get current product information
-                product_types = {0x5B: "조명 스위치", 0x5C: "콘센트 스위치", 0x5D: "디밍 스위치"}
-                current_product = product_types.get(st.session_state.config_data['product_type'], "알 수 없음")
-                
-                # Add test result with more details
-                new_result = pd.DataFrame({
-                    '테스트': ['터치 검사'],
-                    '결과': [result],
-                    '시간': [datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")],
-                    '제품 종류': [current_product],
-                    '조명 회로': [st.session_state.config_data['light_circuits']],
-                    '콘센트 회로': [st.session_state.config_data['outlet_circuits']],
-                    '디밍 종류': [st.session_state.config_data['dimming_type']]
-                })
-                
-                # 테스트 결과 업데이트
-                st.session_state.test_results = pd.concat([st.session_state.test_results, new_result], ignore_index=True)
-                
-                # 테스트 통계 업데이트
-                update_test_statistics("터치 검사", result)
-            
-        if st.button("IR 검사", disabled=not st.session_state.serial_connected):
-            result = run_test("IR", st.session_state.serial_handler)
-            
-            # Get current product information
-            product_types = {0x5B: "조명 스위치", 0x5C: "콘센트 스위치", 0x5D: "디밍 스위치"}
-            current_product = product_types.get(st.session_state.config_data['product_type'], "알 수 없음")
-            
-            # Add test result with more details
-            new_result = pd.DataFrame({
-                '테스트': ['IR 검사'],
-                '결과': [result],
-                '시간': [datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")],
-                '제품 종류': [current_product],
-                '조명 회로': [st.session_state.config_data['light_circuits']],
-                '콘센트 회로': [st.session_state.config_data['outlet_circuits']],
-                '디밍 종류': [st.session_state.config_data['dimming_type']]
-            })
-            st.session_state.test_results = pd.concat([st.session_state.test_results, new_result], ignore_index=True)
-            
-            # Update test statistics
-            update_test_statistics("IR 검사", result)
-            
-        if st.button("LED 검사", disabled=not st.session_state.serial_connected):
-            result = run_test("LED", st.session_state.serial_handler)
+            if st.button("터치 검사", disabled=not station.serial_connected):
+                run_and_record_test("터치")
             
-            # Get current product information
-            product_types = {0x5B: "조명 스위치", 0x5C: "콘센트 스위치", 0x5D: "디밍 스위치"}
-            current_product = product_types.get(st.session_state.config_data['product_type'], "알 수 없음")
+        if st.button("IR 검사", disabled=not station.serial_connected):
+            run_and_record_test("IR")
             
-            # Add test result with more details
-            new_result = pd.DataFrame({
-                '테스트': ['LED 검사'],
-                '결과': [result],
-                '시간': [datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")],
-                '제품 종류': [current_product],
-                '조명 회로': [st.session_state.config_data['light_circuits']],
-                '콘센트 회로': [st.session_state.config_data['outlet_circuits']],
-                '디밍 종류': [st.session_state.config_data['dimming_type']]
-            })
-            st.session_state.test_results = pd.concat([st.session_state.test_results, new_result], ignore_index=True)
-            
-            # Update test statistics
-            update_test_statistics("LED 검사", result)
+        if st.button("LED 검사", disabled=not station.serial_connected):
+            run_and_record_test("LED")
     
     with test_col2:
-        if st.button("도플러 센서 검사", disabled=not st.session_state.serial_connected):
-            result = run_test("도플러 센서", st.session_state.serial_handler)
-            
-            # Get current product information
-            product_types = {0x5B: "조명 스위치", 0x5C: "콘센트 스위치", 0x5D: "디밍 스위치"}
-            current_product = product_types.get(st.session_state.config_data['product_type'], "알 수 없음")
-            
-            # Add test result with more details
-            new_result = pd.DataFrame({
-                '테스트': ['도플러 센서 검사'],
-                '결과': [result],
-                '시간': [datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")],
-                '제품 종류': [current_product],
-                '조명 회로': [st.session_state.config_data['light_circuits']],
-                '콘센트 회로': [st.session_state.config_data['outlet_circuits']],
-                '디밍 종류': [st.session_state.config_data['dimming_type']]
-            })
-            st.session_state.test_results = pd.concat([st.session_state.test_results, new_result], ignore_index=True)
-            
-            # Update test statistics
-            update_test_statistics("도플러 센서 검사", result)
-            
-        if st.button("콘센트 릴레이 검사", disabled=not st.session_state.serial_connected):
-            result = run_test("콘센트 릴레이", st.session_state.serial_handler)
-            
-            # Get current product information
-            product_types = {0x5B: "조명 스위치", 0x5C: "콘센트 스위치", 0x5D: "디밍 스위치"}
-            current_product = product_types.get(st.session_state.config_data['product_type'], "알 수 없음")
+        if st.button("도플러 센서 검사", disabled=not station.serial_connected):
+            run_and_record_test("도플러 센서")
             
-            # Add test result with more details
-            new_result = pd.DataFrame({
-                '테스트': ['콘센트 릴레이 검사'],
-                '결과': [result],
-                '시간': [datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")],
-                '제품 종류': [current_product],
-                '조명 회로': [st.session_state.config_data['light_circuits']],
-                '콘센트 회로': [st.session_state.config_data['outlet_circuits']],
-                '디밍 종류': [st.session_state.config_data['dimming_type']]
-            })
-            st.session_state.test_results = pd.concat([st.session_state.test_results, new_result], ignore_index=True)
+        if st.button("콘센트 릴레이 검사", disabled=not station.serial_connected):
+            run_and_record_test("콘센트 릴레이")
             
-            # Update test statistics
-            update_test_statistics("콘센트 릴레이 검사", result)
-            
-        if st.button("부저 검사", disabled=not st.session_state.serial_connected):
-            result = run_test("부저", st.session_state.serial_handler)
-            
-            # Get current product information
-            product_types = {0x5B: "조명 스위치", 0x5C: "콘센트 스위치", 0x5D: "디밍 스위치"}
-            current_product = product_types.get(st.session_state.config_data['product_type'], "알 수 없음")
-            
-            # Add test result with more details
-            new_result = pd.DataFrame({
-                '테스트': ['부저 검사'],
-                '결과': [result],
-                '시간': [datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")],
-                '제품 종류': [current_product],
-                '조명 회로': [st.session_state.config_data['light_circuits']],
-                '콘센트 회로': [st.session_state.config_data['outlet_circuits']],
-                '디밍 종류': [st.session_state.config_data['dimming_type']]
-            })
-            st.session_state.test_results = pd.concat([st.session_state.test_results, new_result], ignore_index=True)
-            
-            # Update test statistics
-            update_test_statistics("부저 검사", result)
+        if st.button("부저 검사", disabled=not station.serial_connected):
+            run_and_record_test("부저")
     
     with test_col3:
-        if st.button("조명 릴레이 검사", disabled=not st.session_state.serial_connected):
-            result = run_test("조명 릴레이", st.session_state.serial_handler)
-            
-            # Get current product information
-            product_types = {0x5B: "조명 스위치", 0x5C: "콘센트 스위치", 0x5D: "디밍 스위치"}
-            current_product = product_types.get(st.session_state.config_data['product_type'], "알 수 없음")
-            
-            # Add test result with more details
-            new_result = pd.DataFrame({
-                '테스트': ['조명 릴레이 검사'],
-                '결과': [result],
-                '시간': [datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")],
-                '제품 종류': [current_product],
-                '조명 회로': [st.session_state.config_data['light_circuits']],
-                '콘센트 회로': [st.session_state.config_data['outlet_circuits']],
-                '디밍 종류': [st.session_state.config_data['dimming_type']]
-            })
-            st.session_state.test_results = pd.concat([st.session_state.test_results, new_result], ignore_index=True)
+        if st.button("조명 릴레이 검사", disabled=not station.serial_connected):
+            run_and_record_test("조명 릴레이")
             
-            # Update test statistics
-            update_test_statistics("조명 릴레이 검사", result)
-            
-        if st.button("미터링 검사", disabled=not st.session_state.serial_connected):
-            result = run_test("미터링", st.session_state.serial_handler)
-            
-            # Get current product information
-            product_types = {0x5B: "조명 스위치", 0x5C: "콘센트 스위치", 0x5D: "디밍 스위치"}
-            current_product = product_types.get(st.session_state.config_data['product_type'], "알 수 없음")
-            
-            # Add test result with more details
-            new_result = pd.DataFrame({
-                '테스트': ['미터링 검사'],
-                '결과': [result],
-                '시간': [datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")],
-                '제품 종류': [current_product],
-                '조명 회로': [st.session_state.config_data['light_circuits']],
-                '콘센트 회로': [st.session_state.config_data['outlet_circuits']],
-                '디밍 종류': [st.session_state.config_data['dimming_type']]
-            })
-            st.session_state.test_results = pd.concat([st.session_state.test_results, new_result], ignore_index=True)
-            
-            # Update test statistics
-            update_test_statistics("미터링 검사", result)
+        if st.button("미터링 검사", disabled=not station.serial_connected):
+            run_and_record_test("미터링")
     
     # Run all tests
-    if st.button("모든 검사 실행", disabled=not st.session_state.serial_connected):
-        test_types = ["터치", "도플러 센서", "IR", "콘센트 릴레이", "조명 릴레이", "미터링", "LED", "부저"]
-        
-        # Get current product information
-        product_types = {0x5B: "조명 스위치", 0x5C: "콘센트 스위치", 0x5D: "디밍 스위치"}
-        current_product = product_types.get(st.session_state.config_data['product_type'], "알 수 없음")
-        
-        for test_type in test_types:
-            result = run_test(test_type, st.session_state.serial_handler)
-            
-            # Add more detailed information for historical analysis
-            new_result = pd.DataFrame({
-                '테스트': [f"{test_type} 검사"],
-                '결과': [result],
-                '시간': [datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")],
-                '제품 종류': [current_product],
-                '조명 회로': [st.session_state.config_data['light_circuits']],
-                '콘센트 회로': [st.session_state.config_data['outlet_circuits']],
-                '디밍 종류': [st.session_state.config_data['dimming_type']]
-            })
-            st.session_state.test_results = pd.concat([st.session_state.test_results, new_result], ignore_index=True)
-            
-            # Update test statistics
-            update_test_statistics(f"{test_type} 검사", result)
+    if st.button("모든 검사 실행", disabled=not station.serial_connected):
+        for test_type in current_test_plan():
+            run_and_record_test(test_type)
     
     # 자동화 테스트 탭
     with test_tab2:
         automated_test_ui()
     
+    # 보드 장착 감지 자동 실행 탭
+    with test_tab3:
+        hands_free_ui(port_discovery)
+    
     # Show test results
     st.subheader("검사 결과")
     
@@ -639,15 +958,16 @@ with tab2:
         return ""
     
     # Display the test results
-    if not st.session_state.test_results.empty:
+    test_results = station.test_results
+    if not test_results.empty:
         st.dataframe(
-            st.session_state.test_results.style.applymap(highlight_result, subset=['결과']),
+            test_results.style.applymap(highlight_result, subset=['결과']),
             use_container_width=True
         )
         
         # Add button to clear results
         if st.button("결과 초기화"):
-            st.session_state.test_results = pd.DataFrame(columns=['테스트', '결과', '시간'])
+            station.clear_results()
             st.rerun()
     else:
         st.info("검사 결과가 없습니다. 검사를 실행하세요.")
@@ -656,51 +976,69 @@ with tab2:
 with tab3:
     st.header("검사 데이터 분석")
     
-    # Create tabs for different analysis views
-    analysis_tab1, analysis_tab2, analysis_tab3, analysis_tab4 = st.tabs([
-        "일별 통계", "검사 유형별 통계", "제품 유형별 통계", "실패율 분석"
-    ])
+    # Analyze the current session or a date range of the stored history
+    data_source = st.radio("데이터 범위", ["현재 세션", "저장된 기록"], horizontal=True)
     
-    # Function to generate charts
-    def generate_chart(data, x_col, y_col, title, kind='bar', color=None):
-        """Generate a matplotlib chart and return it as a Streamlit figure"""
-        fig, ax = plt.subplots(figsize=(10, 5))
+    if data_source == "저장된 기록":
+        history_store = get_history_store()
+        history_store.flush()
+        history_days = history_store.days()
         
-        if kind == 'bar':
-            if color:
-                data.plot(kind=kind, x=x_col, y=y_col, ax=ax, color=color, rot=45)
-            else:
-                data.plot(kind=kind, x=x_col, y=y_col, ax=ax, rot=45)
-        elif kind == 'pie':
-            # For pie charts, we need to handle data differently
-            data[y_col].plot(kind=kind, ax=ax, autopct='%1.1f%%')
-            ax.set_ylabel('')
-        
-        ax.set_title(title)
-        ax.grid(True, linestyle='--', alpha=0.7)
-        
-        # Adjust layout
-        plt.tight_layout()
-        
-        # Convert plot to a Streamlit-compatible format
-        buf = io.BytesIO()
-        plt.savefig(buf, format='png')
-        buf.seek(0)
+        if history_days:
+            last_day = datetime.date.fromisoformat(history_days[-1])
+            first_day = datetime.date.fromisoformat(history_days[0])
+            date_range = st.date_input(
+                "기간",
+                value=(max(first_day, last_day - datetime.timedelta(days=89)), last_day),
+                min_value=first_day,
+                max_value=last_day
+            )
+        else:
+            date_range = ()
         
-        # Close the plot to prevent memory leaks
-        plt.close(fig)
+        if len(date_range) == 2:
+            range_start, range_end = (day.isoformat() for day in date_range)
+            history_summary = history_store.summary(range_start, range_end)
+            daily_source = history_summary["daily"].rename(columns={'day': '날짜', '통과': '통과 수', '실패': '실패 수'})
+            type_source = history_summary["by_test"].rename(columns={'test': '테스트', '통과': '통과 수', '실패': '실패 수'})
+            product_stats = history_summary["by_product"].rename(columns={'product': '제품 종류', '총 검사 수': '총검사수'})
+            failure_index = FailureIndex.from_counts(
+                history_store.failure_counts(range_start, range_end).itertuples(index=False, name=None)
+            )
+            # Detail table: only the most recent failures are loaded
+            failed_tests = history_store.failures(range_start, range_end, limit=HISTORY_FAILURE_ROWS).rename(columns=HISTORY_COLUMN_LABELS)
+            cycle_report = cycle_time_report(history_store.scan(range_start, range_end, columns=CYCLE_TIME_FIELDS).to_pandas())
+        else:
+            daily_source = pd.DataFrame(columns=['날짜', '통과 수', '실패 수', '총 검사 수', '통과율'])
+            type_source = pd.DataFrame(columns=['테스트', '통과 수', '실패 수', '총 검사 수', '통과율'])
+            product_stats = pd.DataFrame(columns=['제품 종류', '통과', '실패', '총검사수', '통과율'])
+            failed_tests = pd.DataFrame(columns=RESULT_COLUMNS)
+            failure_index = FailureIndex()
+            cycle_report = cycle_time_report(pd.DataFrame(columns=CYCLE_TIME_FIELDS))
+    else:
+        daily_source = station.daily_pass_rate
+        type_source = station.test_count_by_type
         
-        return buf
+        # Computed once per new result and shared by every open session
+        product_stats = station.derived('product_stats', station_product_stats)
+        failed_tests = station.derived('failed_tests', lambda state: state.test_results[state.test_results['결과'] == '실패'])
+        failure_index = station.failure_index
+        cycle_report = station.derived('cycle_report', lambda state: cycle_time_report(state.test_results.rename(columns=CSV_COLUMNS)))
+    
+    # Create tabs for different analysis views
+    analysis_tab1, analysis_tab2, analysis_tab3, analysis_tab4, analysis_tab5, analysis_tab6, analysis_tab7, analysis_tab8 = st.tabs([
+        "일별 통계", "검사 유형별 통계", "제품 유형별 통계", "실패율 분석", "실시간 수율", "공정 관리 (SPC)", "측정값 분석", "사이클 타임"
+    ])
     
     # Daily statistics tab
     with analysis_tab1:
         st.subheader("일별 검사 통계")
         
-        if st.session_state.daily_pass_rate.empty:
+        if daily_source.empty:
             st.info("검사 데이터가 없습니다. 검사를 실행하여 데이터를 수집하세요.")
         else:
             # Sort by date
-            daily_data = st.session_state.daily_pass_rate.sort_values(by='날짜')
+            daily_data = daily_source.sort_values(by='날짜')
             
             # Create two columns for charts
             chart_col1, chart_col2 = st.columns(2)
@@ -736,7 +1074,7 @@ with tab3:
     with analysis_tab2:
         st.subheader("검사 유형별 통계")
         
-        if st.session_state.test_count_by_type.empty:
+        if type_source.empty:
             st.info("검사 데이터가 없습니다. 검사를 실행하여 데이터를 수집하세요.")
         else:
             # Create two columns for charts
@@ -744,7 +1082,7 @@ with tab3:
             
             with chart_col1:
                 # Pass/fail by test type
-                test_data = st.session_state.test_count_by_type[['테스트', '통과 수', '실패 수']]
+                test_data = type_source[['테스트', '통과 수', '실패 수']]
                 test_chart = generate_chart(
                     test_data,
                     '테스트',
@@ -757,7 +1095,7 @@ with tab3:
             with chart_col2:
                 # Pass rate by test type
                 pass_rate_chart = generate_chart(
-                    st.session_state.test_count_by_type,
+                    type_source,
                     '테스트',
                     '통과율',
                     '검사 유형별 통과율 (%)',
@@ -767,25 +1105,15 @@ with tab3:
             
             # Display the data table
             st.subheader("검사 유형별 데이터")
-            st.dataframe(st.session_state.test_count_by_type, use_container_width=True)
+            st.dataframe(type_source, use_container_width=True)
     
     # Product type statistics tab
     with analysis_tab3:
         st.subheader("제품 유형별 통계")
         
-        if st.session_state.test_results.empty:
+        if product_stats.empty:
             st.info("검사 데이터가 없습니다. 검사를 실행하여 데이터를 수집하세요.")
         else:
-            # Group by product type and calculate statistics
-            product_stats = st.session_state.test_results.groupby('제품 종류').agg(
-                통과=('결과', lambda x: (x == '통과').sum()),
-                실패=('결과', lambda x: (x == '실패').sum()),
-                총검사수=('결과', 'count')
-            ).reset_index()
-            
-            # Calculate pass rate
-            product_stats['통과율'] = (product_stats['통과'] / product_stats['총검사수'] * 100).round(2)
-            
             # Create charts
             chart_col1, chart_col2 = st.columns(2)
             
@@ -819,30 +1147,21 @@ with tab3:
     with analysis_tab4:
         st.subheader("실패율 분석")
         
-        if st.session_state.test_results.empty:
+        if product_stats.empty:
             st.info("검사 데이터가 없습니다. 검사를 실행하여 데이터를 수집하세요.")
         else:
-            # Filter the data to only include failed tests
-            failed_tests = st.session_state.test_results[st.session_state.test_results['결과'] == '실패']
-            
             if failed_tests.empty:
                 st.success("모든 검사가 통과되었습니다! 실패한 검사가 없습니다.")
             else:
-                # Group by test type and count failures
-                failure_counts_by_test = failed_tests.groupby('테스트').size()
-                failure_by_test = pd.DataFrame({
-                    '테스트': failure_counts_by_test.index,
-                    '실패 수': failure_counts_by_test.values
-                })
-                failure_by_test = failure_by_test.sort_values('실패 수', ascending=False)
-                
-                # Group by product type and count failures
-                failure_counts_by_product = failed_tests.groupby('제품 종류').size()
-                failure_by_product = pd.DataFrame({
-                    '제품 종류': failure_counts_by_product.index,
-                    '실패 수': failure_counts_by_product.values
-                })
-                failure_by_product = failure_by_product.sort_values('실패 수', ascending=False)
+                # Failure counts by test type and product type (from the failure index)
+                failure_by_test = pd.DataFrame(
+                    [(row['test'], row['count']) for row in failure_index.pareto(by=("test",))],
+                    columns=['테스트', '실패 수']
+                )
+                failure_by_product = pd.DataFrame(
+                    [(row['product'], row['count']) for row in failure_index.pareto(by=("product",))],
+                    columns=['제품 종류', '실패 수']
+                )
                 
                 # Create two columns for charts
                 chart_col1, chart_col2 = st.columns(2)
@@ -869,10 +1188,49 @@ with tab3:
                     )
                     st.image(product_failure_chart)
                 
+                # Failure Pareto from the failure index
+                st.subheader("실패 원인 파레토")
+                
+                pareto_labels = {"test": "테스트", "code": "오류 코드", "cause": "원인", "product": "제품 종류", "fixture": "픽스처"}
+                pareto_by = st.multiselect(
+                    "분류 기준",
+                    list(pareto_labels),
+                    default=["test", "cause"],
+                    format_func=pareto_labels.get
+                )
+                
+                if pareto_by:
+                    pareto_df = pd.DataFrame(failure_index.pareto(by=tuple(pareto_by)))
+                    pareto_df = pareto_df.rename(columns={
+                        **pareto_labels, 'count': '실패 수', 'share': '비율 (%)', 'cumulative_share': '누적 비율 (%)'
+                    })
+                    pareto_df['항목'] = pareto_df[[pareto_labels[d] for d in pareto_by]].astype(str).agg(" / ".join, axis=1)
+                    
+                    st.bar_chart(pareto_df.set_index('항목')['실패 수'])
+                    st.dataframe(pareto_df.drop(columns=['항목']).round(1), use_container_width=True, hide_index=True)
+                
                 # Show detailed failure data
                 st.subheader("실패한 검사 세부 데이터")
+                if data_source == "저장된 기록" and failure_index.total > len(failed_tests):
+                    st.caption(f"최근 {len(failed_tests):,}건 표시 (전체 {failure_index.total:,}건)")
                 st.dataframe(failed_tests, use_container_width=True)
 
+    # Live yield tab (refreshes itself from the shared yield monitor)
+    with analysis_tab5:
+        show_live_yield()
+    
+    # Statistical process control tab
+    with analysis_tab6:
+        show_spc()
+    
+    # Measurement capability tab
+    with analysis_tab7:
+        show_measurement_analysis()
+    
+    # Cycle-time bottleneck tab
+    with analysis_tab8:
+        show_cycle_time_analysis(cycle_report)
+
     # Display a button to export historical data 
     st.subheader("검사 데이터 내보내기")
     
@@ -880,9 +1238,9 @@ with tab3:
     
     with export_col1:
         if st.button("CSV 파일로 내보내기"):
-            if not st.session_state.test_results.empty:
+            if not station.test_results.empty:
                 # Convert DataFrame to CSV
-                csv = st.session_state.test_results.to_csv(index=False)
+                csv = station.test_results.to_csv(index=False)
                 
                 # Create a download button
                 st.download_button(
@@ -901,12 +1259,56 @@ with tab3:
             
             if confirm:
                 # Reset all test data
-                st.session_state.test_results = pd.DataFrame(columns=['테스트', '결과', '시간', '제품 종류', '조명 회로', '콘센트 회로', '디밍 종류'])
-                st.session_state.daily_pass_rate = pd.DataFrame(columns=['날짜', '통과 수', '실패 수', '총 검사 수', '통과율'])
-                st.session_state.test_count_by_type = pd.DataFrame(columns=['테스트', '통과 수', '실패 수', '총 검사 수', '통과율'])
+                station.reset()
                 st.success("모든 검사 데이터가 초기화되었습니다.")
                 st.rerun()
 
+def show_profile():
+    """Render the top functions and a flame graph of the finished profile"""
+    profiler = st.session_state.profiler
+    
+    with st.expander("성능 진단 결과", expanded=True):
+        st.caption(
+            f"샘플 {profiler.samples}개 · 측정 시간 {profiler.sampled_time:.2f}초 · 저장 위치: {st.session_state.profile_path}"
+        )
+        
+        top_functions = pd.DataFrame(profiler.top_functions(limit=25))
+        if top_functions.empty:
+            st.info("수집된 샘플이 없습니다.")
+            return
+        
+        st.dataframe(
+            top_functions.rename(columns={
+                'function': '함수', 'self': '자체 샘플', 'total': '누적 샘플',
+                'self_share': '자체 비율 (%)', 'total_share': '누적 비율 (%)'
+            }).round(1),
+            use_container_width=True
+        )
+        
+        # Icicle-style flame graph: outermost frame on top, width = share of samples
+        import altair as alt
+        flame = pd.DataFrame(profiler.flame())
+        st.altair_chart(
+            alt.Chart(flame).mark_rect(stroke="white").encode(
+                x=alt.X('start:Q', title='샘플 비율 (%)', scale=alt.Scale(domain=[0, 100])),
+                x2='end:Q',
+                y=alt.Y('depth:O', title='호출 깊이'),
+                color=alt.Color('function:N', legend=None),
+                tooltip=[alt.Tooltip('function:N', title='함수'), alt.Tooltip('samples:Q', title='샘플')]
+            ).properties(height=max(200, 22 * (int(flame['depth'].max()) + 1))),
+            use_container_width=True
+        )
+        
+        with open(st.session_state.profile_path, encoding="utf-8") as f:
+            st.download_button("프로파일 다운로드 (folded)", f.read(), file_name="profile.folded")
+
+# Finish the profile after the requested number of reruns
+if profiling_run:
+    finish_profiled_run()
+
+if st.session_state.get('profile_path'):
+    show_profile()
+
 # Display a footer with version information
 st.markdown("---")
 st.markdown("<div style='text-align: center;'>스위치 생산 설정 및 검사 프로그램 v1.0.0</div>", unsafe_allow_html=True)
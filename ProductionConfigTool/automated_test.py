@@ -1,9 +1,7 @@
 import streamlit as st
 import pandas as pd
-import numpy as np
-import time
-import datetime
-from test_functions import run_test
+from test_engine import ALL_TESTS, run_test_sequence, supports_batch_tests
+from test_functions import run_test_outcome, run_batch_outcome
 
 def run_automated_test_sequence(serial_handler, test_sequence=None):
     """
@@ -11,73 +9,24 @@ def run_automated_test_sequence(serial_handler, test_sequence=None):
     
     Args:
         serial_handler: 시리얼 통신 핸들러
-        test_sequence: 실행할 테스트 시퀀스 목록
+        test_sequence: 실행할 테스트 시퀀스 목록 (기본: 현재 제품 설정의 검사 계획)
         
     Returns:
         dict: 테스트 결과 딕셔너리
     """
     if test_sequence is None:
-        test_sequence = [
-            "터치", "도플러 센서", "IR", "콘센트 릴레이", 
-            "조명 릴레이", "미터링", "LED", "부저"
-        ]
-    
-    # 결과를 저장할 딕셔너리
-    results = {}
-    summary = {
-        "총 검사 수": len(test_sequence),
-        "통과": 0,
-        "실패": 0,
-        "통과율": 0.0,
-        "시작 시간": datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-        "종료 시간": "",
-        "소요 시간": ""
-    }
-    
-    start_time = time.time()
-    
-    # 테스트 시퀀스 실행
-    for test_type in test_sequence:
-        test_name = f"{test_type} 검사"
-        st.info(f"{test_name} 실행 중...")
-        
-        # 테스트 실행
-        try:
-            result = run_test(test_type, serial_handler)
-            
-            # 결과 저장
-            results[test_name] = {
-                "결과": result,
-                "시간": datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            }
-            
-            # 요약 정보 업데이트
-            if result == "통과":
-                summary["통과"] += 1
-            else:
-                summary["실패"] += 1
-                
-        except Exception as e:
-            results[test_name] = {
-                "결과": "실패",
-                "시간": datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                "오류": str(e)
-            }
-            summary["실패"] += 1
-    
-    # 테스트 완료 후 시간 정보 업데이트
-    end_time = time.time()
-    summary["종료 시간"] = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    summary["소요 시간"] = f"{end_time - start_time:.2f}초"
-    
-    # 통과율 계산
-    if summary["총 검사 수"] > 0:
-        summary["통과율"] = (summary["통과"] / summary["총 검사 수"]) * 100
-    
-    return {
-        "results": results,
-        "summary": summary
-    }
+        test_sequence = st.session_state.current_test_plan()
+    
+    # 펌웨어가 일괄 검사를 지원하면 한 번의 명령으로 모든 검사 실행, 아니면 검사별 명령
+    batch_runner = run_batch_outcome if len(test_sequence) > 1 and supports_batch_tests(serial_handler) else None
+    
+    return run_test_sequence(
+        serial_handler,
+        test_sequence,
+        on_progress=lambda test_name: st.info(f"{test_name} 실행 중..."),
+        test_runner=run_test_outcome,
+        batch_runner=batch_runner
+    )
 
 def display_automated_test_results(test_results):
     """
@@ -120,6 +69,8 @@ def display_automated_test_results(test_results):
         st.write("종료 시간:", summary["종료 시간"])
     with time_col3:
         st.write("소요 시간:", summary["소요 시간"])
+    if summary.get("일괄 검사 시간 (초)") is not None:
+        st.caption(f"일괄 검사 시간: {summary['일괄 검사 시간 (초)']:.3f}초 (검사별 소요 시간은 측정되지 않음)")
     
     # 상세 테스트 결과 테이블
     st.subheader("상세 검사 결과")
@@ -130,6 +81,8 @@ def display_automated_test_results(test_results):
             "테스트": test_name,
             "결과": data["결과"],
             "시간": data["시간"],
+            "소요 시간 (초)": None if data["소요 시간 (초)"] is None else round(data["소요 시간 (초)"], 3),
+            "원인": data.get("원인", "-"),
             "오류": data.get("오류", "-")
         }
         for test_name, data in results.items()
@@ -166,34 +119,45 @@ def automated_test_ui():
     st.subheader("검사 시퀀스 설정")
     
     # 가능한 모든 테스트 목록
-    all_tests = ["터치", "도플러 센서", "IR", "콘센트 릴레이", "조명 릴레이", "미터링", "LED", "부저"]
+    all_tests = ALL_TESTS
+    
+    # 제품 설정에 맞는 검사 계획 (해당 하드웨어가 없는 검사 제외)
+    test_plan = st.session_state.current_test_plan()
+    skipped = [test for test in all_tests if test not in test_plan]
+    if skipped:
+        st.caption(f"현재 제품 설정에서 제외되는 검사: {', '.join(skipped)}")
     
-    # 테스트 시퀀스 선택
+    # 테스트 시퀀스 선택 (직접 변경하지 않았으면 제품 검사 계획을 따름)
     selected_tests = st.multiselect(
         "실행할 검사 항목 선택",
         options=all_tests,
-        default=st.session_state.test_sequence
+        default=st.session_state.test_sequence or test_plan
     )
     
     # 선택된 테스트 시퀀스 저장
     if selected_tests:
-        st.session_state.test_sequence = selected_tests
+        st.session_state.test_sequence = None if selected_tests == test_plan else selected_tests
+    
+    if st.session_state.test_sequence is not None and st.button("제품 검사 계획으로 되돌리기"):
+        st.session_state.test_sequence = None
+        st.rerun()
     
     # 테스트 순서 조정
     st.info("검사 순서를 변경하려면 위의 선택 항목에서 제거 후 원하는 순서로 다시 추가하세요.")
     
     # 테스트 실행 버튼
+    station = st.session_state.station
     if st.button("자동 검사 시퀀스 실행", 
-                disabled=not st.session_state.serial_connected or len(selected_tests) == 0):
+                disabled=not station.serial_connected or len(selected_tests) == 0):
         
         # 테스트 결과를 저장할 공간 초기화
         st.session_state.auto_test_running = True
         
-        # 테스트 실행
-        with st.spinner("자동화 검사 시퀀스 실행 중입니다..."):
+        # 테스트 실행 (다른 세션의 검사와 섞이지 않도록 장치 잠금)
+        with st.spinner("자동화 검사 시퀀스 실행 중입니다..."), station.device_lock:
             test_results = run_automated_test_sequence(
-                st.session_state.serial_handler, 
-                st.session_state.test_sequence
+                station.serial_handler, 
+                selected_tests
             )
             
             # 테스트 결과 저장
@@ -201,32 +165,16 @@ def automated_test_ui():
             
             # 테스트 결과 업데이트
             for test_name, data in test_results["results"].items():
-                # 테스트 이름에서 "검사" 제거
-                test_type = test_name.replace(" 검사", "")
-                
-                # 제품 정보 가져오기
-                product_types = {0x5B: "조명 스위치", 0x5C: "콘센트 스위치", 0x5D: "디밍 스위치"}
-                current_product = product_types.get(st.session_state.config_data['product_type'], "알 수 없음")
-                
-                # 테스트 결과를 전체 결과에 추가
-                new_result = pd.DataFrame({
-                    '테스트': [test_name],
-                    '결과': [data["결과"]],
-                    '시간': [data["시간"]],
-                    '제품 종류': [current_product],
-                    '조명 회로': [st.session_state.config_data['light_circuits']],
-                    '콘센트 회로': [st.session_state.config_data['outlet_circuits']],
-                    '디밍 종류': [st.session_state.config_data['dimming_type']]
-                })
-                st.session_state.test_results = pd.concat([st.session_state.test_results, new_result], ignore_index=True)
-                
-                # 테스트 통계 업데이트 - 테스트 통계 함수가 있는지 확인하고 호출
-                update_test_statistics_fn = globals().get("update_test_statistics", None)
-                if update_test_statistics_fn is None and hasattr(st.session_state, "update_test_statistics"):
-                    update_test_statistics_fn = st.session_state.update_test_statistics
+                # 테스트 결과를 전체 결과 및 통계에 추가
+                record_test_result_fn = globals().get("record_test_result", None)
+                if record_test_result_fn is None and hasattr(st.session_state, "record_test_result"):
+                    record_test_result_fn = st.session_state.record_test_result
                 
-                if update_test_statistics_fn:
-                    update_test_statistics_fn(test_name, data["결과"])
+                if record_test_result_fn:
+                    record_test_result_fn(
+                        test_name, data["결과"], data["시간"], data.get("측정값"),
+                        data.get("오류 코드"), data.get("원인"), duration=data["소요 시간 (초)"]
+                    )
             
             st.session_state.auto_test_running = False
         
@@ -0,0 +1,71 @@
+"""
+Benchmark of the result handoff from fixture workers to the UI process
+
+A writer process produces test results as fast as it can, either as dict
+records on a multiprocessing queue (unpickled one by one by the reader) or
+into the shared-memory ResultRing (copied in blocks by the reader). The
+reader's CPU time per record is the cost the UI process pays per result.
+
+Usage:
+    python bench_result_ring.py [records]
+"""
+import sys
+import time
+import multiprocessing
+from result_ring import ResultRing
+
+_CONTEXT = multiprocessing.get_context("spawn")
+
+def queue_writer(events, records):
+    for i in range(records):
+        events.put({"type": "test", "fixture": "F0", "mac": f"{i & 0xFFFF:04X}", "test": "터치 검사",
+                    "result": "통과", "result_code": 0, "duration": 0.01, "time": time.time()})
+    events.put(None)
+
+def ring_writer(ring_name, records):
+    ring = ResultRing(name=ring_name)
+    for i in range(records):
+        ring.write(0, f"{i & 0xFFFF:04X}", 0x10, 0, 0.01, True)
+    ring.close()
+
+def bench_queue(records):
+    events = _CONTEXT.Queue()
+    writer = _CONTEXT.Process(target=queue_writer, args=(events, records))
+    writer.start()
+
+    received = 0
+    cpu_start = time.process_time()
+    while events.get() is not None:
+        received += 1
+    cpu = time.process_time() - cpu_start
+
+    writer.join()
+    return received, 0, cpu
+
+def bench_ring(records):
+    ring = ResultRing(1, capacity=65536)
+    writer = _CONTEXT.Process(target=ring_writer, args=(ring.name, records))
+    writer.start()
+
+    received = lost = cursor = 0
+    cpu_start = time.process_time()
+    while writer.is_alive() or ring.written(0) > cursor:
+        fresh, cursor, dropped = ring.read(0, cursor)
+        received += len(fresh)
+        lost += dropped
+        if not len(fresh):
+            # A UI reader polls on its refresh interval; do not spin
+            time.sleep(0.001)
+    cpu = time.process_time() - cpu_start
+
+    writer.join()
+    ring.close()
+    return received, lost, cpu
+
+if __name__ == "__main__":
+    records = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+
+    print(f"{records} results from one writer process")
+    for name, bench in (("queue (pickled dicts)", bench_queue), ("shared-memory ring", bench_ring)):
+        received, lost, cpu = bench(records)
+        print(f"{name:<22} received {received:>8} lost {lost:>6}   reader CPU {cpu / max(received, 1) * 1e6:7.2f} us/result")
@@ -0,0 +1,102 @@
+"""
+Benchmark of the SerialHandler command/response path
+
+Compares the reusable-buffer path (readinto into a preallocated buffer,
+in-place command framing, no-copy responses) with the previous
+implementation (bytearray growth with +=, bytearray.insert, bytes copies).
+
+Usage:
+    python bench_serial_io.py [frames]
+"""
+import sys
+import time
+import tracemalloc
+from serial_handler import SerialHandler
+from device_emulator import DeviceEmulator
+
+class StaticPort:
+    """Port that answers every frame instantly with the same response, so only
+    the handler-side cost is measured"""
+
+    is_open = True
+
+    def __init__(self):
+        self._response = memoryview(DeviceEmulator().response_frame(0x10))
+        self._position = 40
+
+    @property
+    def in_waiting(self):
+        return 40 - self._position
+
+    def write(self, data):
+        self._position = 0
+        return len(data)
+
+    def readinto(self, buffer):
+        count = min(len(buffer), 40 - self._position)
+        buffer[:count] = self._response[self._position:self._position + count]
+        self._position += count
+        return count
+
+    def read(self, size=1):
+        data = bytes(self._response[self._position:self._position + size])
+        self._position += len(data)
+        return data
+
+class LegacySerialHandler(SerialHandler):
+    """SerialHandler with the previous per-frame allocating read/command path"""
+
+    def read_response(self, expected_bytes=40, timeout=5, copy=True):
+        start_time = time.time()
+        buffer = bytearray()
+
+        while (len(buffer) < expected_bytes) and (time.time() - start_time < timeout):
+            if self.serial.in_waiting > 0:
+                buffer += self.serial.read(self.serial.in_waiting)
+
+        if len(buffer) < expected_bytes:
+            raise Exception(f"Timeout waiting for response. Received {len(buffer)}/{expected_bytes} bytes")
+
+        return bytes(buffer)
+
+    def send_command(self, command_code, data=None, wait_for_response=True, copy=True):
+        packet = bytearray([0xDA, command_code])
+        if data:
+            packet.extend(data)
+        packet.insert(2, len(packet) - 2)
+        packet.append(0x25)
+        self.send_packet(packet)
+        if wait_for_response:
+            return self.read_response()
+        return None
+
+def run(handler, frames, copy):
+    """Run the test commands round-robin and return seconds per frame"""
+    start_time = time.perf_counter()
+    for i in range(frames):
+        handler.send_command(0x10 + (i & 0x07), copy=copy)
+    return (time.perf_counter() - start_time) / frames
+
+def measure(name, handler_class, port_class, frames, copy=True):
+    handler = handler_class.from_serial(port_class())
+
+    # Warm up, then time without tracing
+    run(handler, 1000, copy)
+    per_frame = run(handler, frames, copy)
+
+    # Peak traced memory of the handler side over the same workload
+    tracemalloc.start()
+    run(handler, frames // 10, copy)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(f"{name:<28} {per_frame * 1e6:8.2f} us/frame   peak traced {peak:6d} B")
+
+if __name__ == "__main__":
+    frames = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+
+    for port_class in (StaticPort, DeviceEmulator):
+        print(f"{frames} command/response round trips against {port_class.__name__}")
+        measure("legacy (+=, insert, copy)", LegacySerialHandler, port_class, frames)
+        measure("reusable buffers, copy", SerialHandler, port_class, frames, copy=True)
+        measure("reusable buffers, no copy", SerialHandler, port_class, frames, copy=False)
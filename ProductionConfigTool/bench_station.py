@@ -0,0 +1,89 @@
+"""
+Benchmark of station throughput against the number of fixtures
+
+Runs the same per-unit workload (configuration + all tests against emulated
+boards) with one thread per fixture in a single process and with one worker
+process per fixture (StationRuntime), and prints units per second and the
+scaling efficiency relative to one fixture.
+
+Usage:
+    python bench_station.py [units per fixture] [max fixtures] [test time ms]
+"""
+import sys
+import os
+import time
+import threading
+from serial_handler import SerialHandler
+from device_emulator import DeviceEmulator
+from packet_builder import PacketBuilder
+from station_runtime import StationRuntime, run_fixture_unit
+
+CONFIG = {
+    'product_type': 0x5C, 'light_circuits': 2, 'outlet_circuits': 1, 'dimming_type': 0, 'delay_time': 0,
+    'sub_id': 0, 'ir_present': 1, 'scenario': 0, 'comm_company': 0, 'three_way': 0,
+    'overload_protection': 0, 'emergency_call': 0, 'outlet1_learn_value': 0, 'outlet1_current_value': 0,
+    'outlet2_learn_value': 0, 'outlet2_current_value': 0, 'relay_status': 0, 'outlet1_mode': 0,
+    'outlet2_mode': 0, 'sleep_mode': 0, 'delay_mode': 0, 'dimming_value': 0, 'color_temp_value': 0,
+    'mac_address': '0000',
+}
+
+def emulator_options(test_time):
+    # Per-test commands at the default rate, as on a line without batch firmware
+    return {"simulate_wire_time": True, "test_time": test_time, "batch_tests": False}
+
+def run_threads(fixtures, units, template, test_time):
+    """One thread per fixture in this process; returns units per second"""
+    def fixture_loop(fixture):
+        handler = SerialHandler.from_serial(DeviceEmulator(**emulator_options(test_time)))
+        for unit in range(units):
+            run_fixture_unit(handler, fixture, {"mac": f"{unit:04X}", "template": template}, lambda record: None)
+
+    threads = [threading.Thread(target=fixture_loop, args=(f"F{n}",)) for n in range(fixtures)]
+    start_time = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return fixtures * units / (time.perf_counter() - start_time)
+
+def run_processes(fixtures, units, template, test_time):
+    """One worker process per fixture; returns units per second (process start-up excluded)"""
+    runtime = StationRuntime({f"F{n}": None for n in range(fixtures)}, emulate=emulator_options(test_time))
+    runtime.start()
+
+    ready = 0
+    while ready < fixtures:
+        ready += sum(1 for event in runtime.events(timeout=10) if event["type"] == "ready")
+
+    start_time = time.perf_counter()
+    for unit in range(units):
+        for n in range(fixtures):
+            runtime.submit(f"F{n}", mac=f"{unit:04X}", template=template)
+
+    done = 0
+    while done < fixtures * units:
+        done += sum(1 for event in runtime.events(timeout=10) if event["type"] == "unit")
+    elapsed = time.perf_counter() - start_time
+
+    runtime.close()
+    return fixtures * units / elapsed
+
+if __name__ == "__main__":
+    units = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    max_fixtures = int(sys.argv[2]) if len(sys.argv) > 2 else 16
+    test_time = (float(sys.argv[3]) if len(sys.argv) > 3 else 20) / 1000
+
+    template = PacketBuilder(CONFIG).build_template()
+    counts = [n for n in (1, 2, 4, 8, 16, 32) if n <= max_fixtures]
+
+    print(f"{units} units per fixture, {test_time * 1000:.0f} ms per test, {os.cpu_count()} CPUs")
+    print(f"{'fixtures':>8} {'threads u/s':>12} {'eff':>6} {'processes u/s':>14} {'eff':>6}")
+
+    base_threads = base_processes = None
+    for fixtures in counts:
+        threads = run_threads(fixtures, units, template, test_time)
+        processes = run_processes(fixtures, units, template, test_time)
+        base_threads = base_threads or threads
+        base_processes = base_processes or processes
+        print(f"{fixtures:>8} {threads:>12.1f} {threads / (base_threads * fixtures):>6.0%} "
+              f"{processes:>14.1f} {processes / (base_processes * fixtures):>6.0%}")
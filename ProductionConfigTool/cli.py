@@ -0,0 +1,193 @@
+"""
+Headless production line runner (no Streamlit UI)
+
+Sends the configuration to each unit, runs the test sequence and prints one
+JSON object per line on stdout (config, test, unit summary and batch summary
+records), so stations and scripted batches can consume the results directly.
+
+Examples:
+    python cli.py --port COM3 --profile "조명 스위치 1회로" --mac 0001
+    python cli.py --port /dev/ttyUSB0 --config config.json --mac 0001 --mac-end 0010 --verify ack
+    python cli.py --emulate --profile "조명 스위치 1회로" --mac 0001 --tests 터치,LED
+    python cli.py --port /dev/ttyUSB0 --profile "조명 스위치 1회로" --mac 0001 --negotiate
+"""
+import sys
+import json
+import time
+import argparse
+import datetime
+from serial_handler import SerialHandler, DEFAULT_BAUDRATE
+from packet_builder import PacketBuilder, ConfigPacket
+from config_profiles import ProfileLibrary
+from test_engine import ALL_TESTS, execute_test
+from test_plan import resolve_test_plan
+from utils import parse_mac_range
+
+def emit(record):
+    """Write one JSON lines record to stdout"""
+    sys.stdout.write(json.dumps(record, ensure_ascii=False) + "\n")
+    sys.stdout.flush()
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="스위치 생산 설정 및 검사 (헤드리스)")
+    parser.add_argument("--port", help="시리얼 포트 (예: COM3, /dev/ttyUSB0)")
+    parser.add_argument("--baudrate", type=int, default=DEFAULT_BAUDRATE)
+    parser.add_argument("--negotiate", action="store_true", help="연결 후 지원되는 가장 빠른 보레이트로 전환")
+    parser.add_argument("--emulate", action="store_true", help="실제 포트 대신 디바이스 에뮬레이터 사용")
+
+    config_group = parser.add_mutually_exclusive_group()
+    config_group.add_argument("--profile", help="설정 프로필 이름")
+    config_group.add_argument("--config", help="설정 JSON 파일 경로 (config_data 형식)")
+    config_group.add_argument("--no-config", action="store_true", help="설정 전송 없이 검사만 실행")
+
+    parser.add_argument("--mac", help="MAC 주소 (마지막 2바이트, HEX)")
+    parser.add_argument("--mac-end", help="마지막 MAC 주소 (지정 시 범위 내 보드를 순서대로 처리)")
+    parser.add_argument("--verify", choices=["ack", "readback"], help="설정 전송 확인 방식")
+    parser.add_argument("--tests", help="쉼표로 구분한 검사 목록 (기본: 제품 설정에 맞는 검사 계획)")
+    parser.add_argument("--wait-timeout", type=float, default=60, help="보드 장착/제거 대기 시간 (초)")
+
+    args = parser.parse_args(argv)
+
+    if not args.port and not args.emulate:
+        parser.error("--port 또는 --emulate 중 하나가 필요합니다.")
+    if not args.no_config and not (args.profile or args.config):
+        parser.error("--profile, --config 또는 --no-config 중 하나가 필요합니다.")
+    if not args.no_config and not args.mac:
+        parser.error("설정 전송에는 --mac 이 필요합니다.")
+
+    return args
+
+def open_handler(args):
+    """Open the serial handler (or an emulated device)"""
+    if args.emulate:
+        from device_emulator import DeviceEmulator
+        return SerialHandler.from_serial(DeviceEmulator(baudrate=args.baudrate))
+    return SerialHandler(args.port, args.baudrate)
+
+def load_template(args):
+    """Return the compiled packet template for the requested configuration"""
+    if args.profile:
+        return ProfileLibrary().compile(args.profile)
+
+    with open(args.config, encoding="utf-8") as f:
+        config_data = json.load(f)
+    return PacketBuilder(config_data).build_template()
+
+def send_config(serial_handler, template, mac, verify_mode):
+    """Send the unit configuration and return a config record"""
+    unit_packet = ConfigPacket(template)
+    unit_packet.set_field('mac_address', mac)
+    unit_packet.set_datetime()
+    packet = unit_packet.view()
+
+    record = {"type": "config", "mac": mac, "ok": False, "error": None}
+
+    try:
+        if verify_mode:
+            outcome = serial_handler.send_packet_verified(packet, mode=verify_mode)
+            record["ok"] = outcome["verified"]
+            record["attempts"] = outcome["attempts"]
+            record["error"] = outcome["error"]
+        else:
+            record["ok"] = serial_handler.send_packet(packet)
+            serial_handler.consume_acknowledgement()
+    except Exception as e:
+        record["error"] = str(e)
+
+    return record
+
+def run_unit(serial_handler, args, template, mac, test_sequence):
+    """Configure and test one unit, emitting its records; return True if it passed"""
+    start_time = time.monotonic()
+    passed = 0
+
+    if template is not None:
+        config_record = send_config(serial_handler, template, mac, args.verify)
+        emit(config_record)
+        if not config_record["ok"]:
+            emit({"type": "unit", "mac": mac, "passed": False, "tests_passed": 0,
+                  "tests_total": len(test_sequence), "duration_s": round(time.monotonic() - start_time, 3)})
+            return False
+
+    for test_type in test_sequence:
+        test_start = time.monotonic()
+        outcome = execute_test(test_type, serial_handler)
+        emit({
+            "type": "test",
+            "mac": mac,
+            "test": f"{test_type} 검사",
+            "result": outcome["result"],
+            "result_code": outcome["result_code"],
+            "cause": outcome["cause"],
+            "error": outcome["error"],
+            "measurements": outcome["measurements"] or None,
+            "time": datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "duration_s": round(time.monotonic() - test_start, 4)
+        })
+        if outcome["result"] == "통과":
+            passed += 1
+
+    unit_passed = passed == len(test_sequence)
+    emit({"type": "unit", "mac": mac, "passed": unit_passed, "tests_passed": passed,
+          "tests_total": len(test_sequence), "duration_s": round(time.monotonic() - start_time, 3)})
+    return unit_passed
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    test_sequence = args.tests.split(",") if args.tests else None
+    unknown_tests = [t for t in test_sequence or [] if t not in ALL_TESTS]
+    if unknown_tests:
+        emit({"type": "error", "error": f"알 수 없는 검사: {', '.join(unknown_tests)}"})
+        return 2
+
+    try:
+        if args.mac_end and not args.mac:
+            raise ValueError("--mac-end 에는 --mac 이 필요합니다.")
+        # A single --mac is checked as a one-address range
+        mac_addresses = parse_mac_range(args.mac.upper(), (args.mac_end or args.mac).upper()) if args.mac else [None]
+
+        template = None if args.no_config else load_template(args)
+        if test_sequence is None:
+            # Without --tests, run the plan for the configured product (everything with --no-config)
+            test_sequence = ALL_TESTS if template is None else resolve_test_plan(PacketBuilder.decode_packet(template))
+        serial_handler = open_handler(args)
+    except Exception as e:
+        emit({"type": "error", "error": str(e)})
+        return 2
+
+    units_passed = 0
+    units_done = 0
+    batch_mode = len(mac_addresses) > 1
+    link_negotiated = False
+
+    try:
+        for mac in mac_addresses:
+            # In batch mode each board is swapped by the operator
+            if batch_mode and not serial_handler.wait_for_device(present=True, timeout=args.wait_timeout):
+                emit({"type": "error", "mac": mac, "error": "보드 장착 대기 시간 초과"})
+                break
+
+            # The link is negotiated once, with the first board; later boards are brought up by
+            # wait_for_device, or stay at the rate negotiation fell back to
+            if args.negotiate and not link_negotiated:
+                emit({"type": "link", "baudrate": serial_handler.negotiate_baudrate()})
+                link_negotiated = True
+
+            units_done += 1
+            if run_unit(serial_handler, args, template, mac, test_sequence):
+                units_passed += 1
+
+            if batch_mode and not serial_handler.wait_for_device(present=False, timeout=args.wait_timeout):
+                emit({"type": "error", "mac": mac, "error": "보드 제거 대기 시간 초과"})
+                break
+    except KeyboardInterrupt:
+        pass
+    finally:
+        serial_handler.close()
+
+    emit({"type": "summary", "units": units_done, "passed": units_passed, "failed": units_done - units_passed})
+    return 0 if units_done and units_passed == units_done else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
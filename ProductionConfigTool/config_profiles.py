@@ -0,0 +1,187 @@
+import os
+import re
+import json
+import datetime
+from packet_builder import PacketBuilder, patch_packet, DATETIME_INDEX
+
+# Default directory holding the profile library (one sub-directory per profile)
+PROFILE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "profiles")
+
+PRODUCT_NAMES = {0x5B: "조명 스위치", 0x5C: "콘센트 스위치", 0x5D: "디밍 스위치"}
+
+def sku_profile_name(config_data):
+    """
+    Suggest a profile name for the SKU described by a configuration
+
+    Args:
+        config_data (dict): Configuration parameters
+
+    Returns:
+        str: Name such as "조명 스위치 3회로" or "콘센트 스위치 1회로 콘센트2"
+    """
+    name = f"{PRODUCT_NAMES.get(config_data['product_type'], '알 수 없음')} {config_data['light_circuits']}회로"
+
+    if config_data['outlet_circuits'] > 0:
+        name += f" 콘센트{config_data['outlet_circuits']}"
+    if config_data['dimming_type'] == 1:
+        name += " 디밍"
+    elif config_data['dimming_type'] == 2:
+        name += " 색온도"
+
+    return name
+
+class ProfileLibrary:
+    """
+    Named, versioned configuration profiles stored on disk, with cached
+    compiled packet templates
+
+    Each save writes a new immutable version file (<name>/v0001.json, ...),
+    so a template compiled for (name, version) never has to be rebuilt.
+    """
+
+    def __init__(self, profile_dir=PROFILE_DIR):
+        """
+        Initialize the profile library
+
+        Args:
+            profile_dir (str): Directory holding the profiles
+        """
+        self.profile_dir = profile_dir
+        self._templates = {}
+
+    def _profile_path(self, name):
+        if not name or not re.match(r'^[^/\\:*?"<>|.][^/\\:*?"<>|]*$', name):
+            raise ValueError(f"Invalid profile name: {name!r}")
+        return os.path.join(self.profile_dir, name)
+
+    def list_profiles(self):
+        """
+        List the names of all stored profiles
+
+        Returns:
+            list: Sorted profile names
+        """
+        if not os.path.isdir(self.profile_dir):
+            return []
+
+        return sorted(
+            name for name in os.listdir(self.profile_dir)
+            if self.versions(name)
+        )
+
+    def versions(self, name):
+        """
+        List the stored versions of a profile
+
+        Args:
+            name (str): Profile name
+
+        Returns:
+            list: Sorted version numbers (empty if the profile does not exist)
+        """
+        path = self._profile_path(name)
+        if not os.path.isdir(path):
+            return []
+
+        return sorted(
+            int(match.group(1))
+            for match in (re.match(r'^v(\d+)\.json$', f) for f in os.listdir(path))
+            if match
+        )
+
+    def load(self, name, version=None):
+        """
+        Load a profile
+
+        Args:
+            name (str): Profile name
+            version (int): Version to load (default: latest)
+
+        Returns:
+            dict: {"name", "version", "saved_at", "config"}
+        """
+        if version is None:
+            versions = self.versions(name)
+            if not versions:
+                raise KeyError(f"Profile not found: {name}")
+            version = versions[-1]
+
+        path = os.path.join(self._profile_path(name), f"v{version:04d}.json")
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+
+    def save(self, name, config_data):
+        """
+        Save a configuration as a new version of a profile
+
+        Args:
+            name (str): Profile name
+            config_data (dict): Configuration parameters
+
+        Returns:
+            int: Version number that was written
+        """
+        path = self._profile_path(name)
+        os.makedirs(path, exist_ok=True)
+
+        versions = self.versions(name)
+        version = versions[-1] + 1 if versions else 1
+
+        profile = {
+            "name": name,
+            "version": version,
+            "saved_at": datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "config": dict(config_data),
+        }
+
+        # Exclusive create so a concurrent save cannot overwrite this version
+        with open(os.path.join(path, f"v{version:04d}.json"), "x", encoding="utf-8") as f:
+            json.dump(profile, f, ensure_ascii=False, indent=2)
+
+        return version
+
+    def compile(self, name, version=None):
+        """
+        Compile a profile into a cached 40-byte packet template
+
+        Args:
+            name (str): Profile name
+            version (int): Version to compile (default: latest)
+
+        Returns:
+            bytes: Packet template (ID and date/time bytes cleared)
+        """
+        if version is None:
+            version = self.load(name)["version"]
+
+        key = (name, version)
+        if key not in self._templates:
+            profile = self.load(name, version)
+            self._templates[key] = PacketBuilder(profile["config"]).build_template()
+
+        return self._templates[key]
+
+    def build_unit_packet(self, name, mac_address, sub_id=None, datetime_bytes=None, version=None):
+        """
+        Build the packet for one unit by patching a compiled profile template
+
+        Args:
+            name (str): Profile name
+            mac_address (str): Unit MAC address (last 2 bytes, 4 hex digits)
+            sub_id (int): Optional per-unit SUB ID overriding the profile value
+            datetime_bytes (list): Optional 4 date/time bytes; left cleared if
+                                   None so they can be stamped at send time
+            version (int): Profile version (default: latest)
+
+        Returns:
+            bytes: 40-byte packet for the unit
+        """
+        mac_bytes = bytes.fromhex(mac_address)
+        updates = {2: mac_bytes[0], 3: mac_bytes[1]}
+
+        if sub_id is not None:
+            updates[7] = sub_id
+        if datetime_bytes is not None:
+            updates.update({DATETIME_INDEX + i: b for i, b in enumerate(datetime_bytes)})
+
+        return patch_packet(self.compile(name, version), updates)
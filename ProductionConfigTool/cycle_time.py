@@ -0,0 +1,88 @@
+"""
+Cycle-time analysis of per-test durations
+
+Works on result rows named after the result store fields (test, fixture,
+failure_cause, duration in seconds), from the station's result table or the
+history store, and shows where line time goes: which tests are slow, how
+their latency is spread, which fixtures are slow and how much of the time is
+spent waiting for boards that never answered.
+"""
+import pandas as pd
+from test_engine import RESPONSE_TIMEOUT_CAUSE
+
+# Latency percentiles reported per group
+PERCENTILES = (0.5, 0.9, 0.95)
+
+# Rows in the slowest-results table
+SLOWEST_ROWS = 20
+
+LATENCY_COLUMNS = ["count", "mean"] + [f"p{round(q * 100)}" for q in PERCENTILES] + \
+                  ["max", "total", "time_share", "timeout_share"]
+
+def timed_results(results):
+    """
+    Rows that have a measured duration, with a timeout flag
+
+    Args:
+        results (DataFrame): Result rows (test, fixture, failure_cause, duration)
+
+    Returns:
+        DataFrame: Rows with duration as float and "timeout" (the device did not answer in time)
+    """
+    timed = results[results["duration"].notna()].copy()
+    timed["duration"] = timed["duration"].astype(float)
+    timed["fixture"] = timed["fixture"].astype(object).fillna("")
+    timed["timeout"] = timed["failure_cause"].astype(object) == RESPONSE_TIMEOUT_CAUSE
+    return timed
+
+def latency_table(timed, by):
+    """
+    Duration statistics per group, slowest mean first
+
+    Args:
+        timed (DataFrame): Output of timed_results
+        by (str or list): Grouping column(s), e.g. "test" or "fixture"
+
+    Returns:
+        DataFrame: Group columns plus count, mean, p50, p90, p95, max, total (s),
+                   time_share (% of all measured test time) and timeout_share
+                   (% of the group's tests that timed out)
+    """
+    keys = [by] if isinstance(by, str) else list(by)
+    if timed.empty:
+        return pd.DataFrame(columns=keys + LATENCY_COLUMNS)
+
+    grouped = timed.groupby(keys, observed=True, sort=False)
+    table = grouped["duration"].agg(count="count", mean="mean", max="max", total="sum")
+
+    quantiles = grouped["duration"].quantile(list(PERCENTILES)).unstack()
+    quantiles.columns = [f"p{round(q * 100)}" for q in PERCENTILES]
+    table = table.join(quantiles)
+
+    table["time_share"] = table["total"] / timed["duration"].sum() * 100
+    table["timeout_share"] = grouped["timeout"].mean() * 100
+    return table[LATENCY_COLUMNS].sort_values("mean", ascending=False).reset_index()
+
+def cycle_time_report(results):
+    """
+    Cycle-time bottleneck report
+
+    Args:
+        results (DataFrame): Result rows (test, fixture, failure_cause, duration; other
+                             columns are kept in "slowest")
+
+    Returns:
+        dict: {"timed": rows with durations, "by_test", "by_fixture" (latency_table),
+               "slowest": the SLOWEST_ROWS longest tests,
+               "timeout_time_share": % of measured time spent in tests that timed out}
+    """
+    timed = timed_results(results)
+    total = timed["duration"].sum()
+
+    return {
+        "timed": timed,
+        "by_test": latency_table(timed, "test"),
+        "by_fixture": latency_table(timed, "fixture"),
+        "slowest": timed.nlargest(SLOWEST_ROWS, "duration"),
+        "timeout_time_share": timed.loc[timed["timeout"], "duration"].sum() / total * 100 if total else 0.0,
+    }
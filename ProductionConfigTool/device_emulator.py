@@ -0,0 +1,248 @@
+import time
+from packet_builder import PacketBuilder
+from serial_handler import SET_BAUDRATE_COMMAND, LINK_FALLBACK_TIMEOUT
+from test_engine import (
+    TEST_COMMANDS, ALL_TESTS, MEASUREMENT_LAYOUTS, STATUS_COMMAND, CAPABILITY_BATCH_TEST, BATCH_TEST_COMMAND
+)
+
+# Product type codes that mark a 40-byte configuration packet
+PRODUCT_TYPES = (0x5B, 0x5C, 0x5D)
+
+# Measurements reported by an idle board on the fixture (engineering units)
+DEFAULT_MEASUREMENTS = {"voltage": 220.0, "outlet1_current": 0, "outlet2_current": 0, "power": 0.0}
+
+# Rates the emulated firmware accepts in SET_BAUDRATE_COMMAND
+SUPPORTED_BAUDRATES = (115200, 230400, 460800, 921600)
+
+class DeviceEmulator:
+    """
+    In-process stand-in for a production line device behind a serial port
+
+    Implements the subset of the serial.Serial interface that SerialHandler
+    uses (write, read, readinto, in_waiting, reset_input_buffer, close), so a
+    SerialHandler can be driven without hardware for benchmarks and load tests.
+    """
+
+    def __init__(self, baudrate=115200, present=True, test_results=None, simulate_wire_time=False,
+                 measurements=None, batch_tests=True, supported_baudrates=SUPPORTED_BAUDRATES,
+                 max_link_baudrate=None, test_time=0.0):
+        """
+        Initialize the emulated device
+
+        Args:
+            baudrate (int): Emulated link speed
+            present (bool): Whether a board is seated (an absent board never answers)
+            test_results (dict): Optional result code per test command code (default 0 = pass)
+            simulate_wire_time (bool): Delay responses by their transmission time at baudrate
+            measurements (dict): Optional measurement name -> value, or callable returning
+                                 a value per test (default: DEFAULT_MEASUREMENTS)
+            batch_tests (bool): Emulate firmware that supports BATCH_TEST_COMMAND
+                                (False answers like older firmware)
+            supported_baudrates (tuple): Rates accepted by SET_BAUDRATE_COMMAND (empty = older firmware)
+            max_link_baudrate (int): Fastest rate the cable carries; frames sent faster are
+                                     lost (default: no limit)
+            test_time (float): Seconds the board takes to run one test before answering
+        """
+        self.baudrate = baudrate
+        self.present = present
+        self.test_results = test_results or {}
+        self.simulate_wire_time = simulate_wire_time
+        self.measurements = measurements or {}
+        self.batch_tests = batch_tests
+        self.supported_baudrates = supported_baudrates
+        self.max_link_baudrate = max_link_baudrate
+        self.test_time = test_time
+        
+        # The host side rate is `baudrate` (set by the handler); the board keeps its own
+        self.device_baudrate = baudrate
+        self._fallback_baudrate = None
+        self._switched_at = 0.0
+        self.is_open = True
+        self.config_packet = None
+        self.frames_received = 0
+
+        self._rx = bytearray()
+        self._rx_ready_at = 0.0
+
+    @property
+    def in_waiting(self):
+        if time.perf_counter() < self._rx_ready_at:
+            return 0
+        return len(self._rx)
+
+    def write(self, data):
+        """Receive one frame from the host and queue the device response"""
+        frame = bytes(data)
+        self.frames_received += 1
+
+        if self.present and self._link_carries_frame():
+            response = self.handle_frame(frame)
+            if response:
+                self._rx += response
+                # 10 bits per byte on the wire (start + 8 data + stop)
+                wire_time = (len(frame) + len(response)) * 10 / self.baudrate if self.simulate_wire_time else 0.0
+                self._rx_ready_at = time.perf_counter() + wire_time + self.test_time * self._tests_in(frame)
+
+        return len(frame)
+
+    def _tests_in(self, frame):
+        """Number of tests a host frame makes the board run"""
+        if 0x10 <= frame[1] <= 0x17:
+            return 1
+        if frame[1] == BATCH_TEST_COMMAND and len(frame) > 4:
+            return bin(frame[3]).count("1")
+        return 0
+
+    def _link_carries_frame(self):
+        """Whether a frame sent now reaches the board intact (rates match and the cable keeps up)"""
+        now = time.perf_counter()
+
+        # An unconfirmed rate change times out back to the previous rate
+        if self._fallback_baudrate is not None and now - self._switched_at > LINK_FALLBACK_TIMEOUT:
+            self.device_baudrate, self._fallback_baudrate = self._fallback_baudrate, None
+
+        if self.baudrate != self.device_baudrate:
+            return False
+        if self.max_link_baudrate is not None and self.baudrate > self.max_link_baudrate:
+            return False
+
+        self._fallback_baudrate = None
+        return True
+
+    @property
+    def dsr(self):
+        """Modem status lines follow the board-seated switch"""
+        return self.present
+
+    cts = cd = dsr
+
+    def flush(self):
+        pass
+
+    def readinto(self, buffer):
+        """Copy queued response bytes into buffer and return the count"""
+        count = min(len(buffer), self.in_waiting)
+        buffer[:count] = self._rx[:count]
+        del self._rx[:count]
+        return count
+
+    def read(self, size=1):
+        """Read up to size queued response bytes"""
+        data = bytearray(min(size, self.in_waiting))
+        self.readinto(data)
+        return bytes(data)
+
+    def reset_input_buffer(self):
+        self._rx.clear()
+
+    def close(self):
+        self.is_open = False
+
+    def response_frame(self, code, result_code=0, payload=b""):
+        """
+        Build a 40-byte response frame
+
+        Args:
+            code (int): Echoed command code
+            result_code (int): Result code placed in byte [2]
+            payload (bytes): Optional data starting at byte [3]
+
+        Returns:
+            bytes: 40-byte response
+        """
+        frame = bytearray(40)
+        frame[0] = 0xDA
+        frame[1] = code
+        frame[2] = result_code
+        frame[3:3 + len(payload)] = payload
+        frame[39] = 0x25
+        return bytes(frame)
+
+    def measurement_payload(self, code):
+        """
+        Encode the measurement payload reported for a test command
+
+        Args:
+            code (int): Test command code
+
+        Returns:
+            bytes: Payload placed from byte [3] (empty for tests without measurements)
+        """
+        for test_type, test_code in TEST_COMMANDS.items():
+            if test_code == code and test_type in MEASUREMENT_LAYOUTS:
+                structure, fields = MEASUREMENT_LAYOUTS[test_type]
+                raw_values = []
+                for name, counts in fields:
+                    value = self.measurements.get(name, DEFAULT_MEASUREMENTS[name])
+                    if callable(value):
+                        value = value()
+                    raw_values.append(min(max(round(value * counts), 0), 0xFFFF))
+                return structure.pack(*raw_values)
+        return b""
+
+    def batch_response(self, bitmap):
+        """
+        Run the tests of a BATCH_TEST_COMMAND bitmap and build the combined response
+
+        Args:
+            bitmap (int): Bit n set = run test command 0x10 + n
+
+        Returns:
+            bytes: 40-byte response with per-test result codes and measurement payloads
+        """
+        result_codes = bytearray(len(ALL_TESTS))
+        measurement_payloads = b""
+
+        for position, test_type in enumerate(ALL_TESTS):
+            if bitmap & (1 << position):
+                code = TEST_COMMANDS[test_type]
+                result_codes[position] = self.test_results.get(code, 0)
+                measurement_payloads += self.measurement_payload(code)
+
+        return self.response_frame(BATCH_TEST_COMMAND, int(any(result_codes)), bytes(result_codes) + measurement_payloads)
+
+    def handle_frame(self, frame):
+        """
+        Produce the device response for one host frame
+
+        Args:
+            frame (bytes): Configuration packet or command frame
+
+        Returns:
+            bytes: Response frame, or None if the device does not answer
+        """
+        if len(frame) < 4 or frame[0] != 0xDA or frame[-1] != 0x25:
+            return None
+
+        # Configuration packet: store it and acknowledge
+        if len(frame) == 40 and frame[1] in PRODUCT_TYPES:
+            if not PacketBuilder(None).validate_packet(frame):
+                return self.response_frame(frame[1], result_code=1)
+            self.config_packet = frame
+            return self.response_frame(frame[1])
+
+        code = frame[1]
+
+        # Read configuration back
+        if code == 0x02:
+            return self.config_packet if self.config_packet else self.response_frame(code, result_code=1)
+
+        # Status check (with capability flags) and individual tests
+        if code == STATUS_COMMAND:
+            return self.response_frame(code, payload=bytes([CAPABILITY_BATCH_TEST if self.batch_tests else 0]))
+        if 0x10 <= code <= 0x17:
+            return self.response_frame(code, self.test_results.get(code, 0), self.measurement_payload(code))
+        if code == BATCH_TEST_COMMAND and self.batch_tests and frame[2] == 1:
+            return self.batch_response(frame[3])
+
+        # Link speed change: acknowledge at the current rate, then switch
+        if code == SET_BAUDRATE_COMMAND and self.supported_baudrates and frame[2] == 4:
+            baudrate = int.from_bytes(frame[3:7], "little")
+            if baudrate not in self.supported_baudrates:
+                return self.response_frame(code, result_code=1)
+            self._fallback_baudrate = self.device_baudrate
+            self.device_baudrate = baudrate
+            self._switched_at = time.perf_counter()
+            return self.response_frame(code)
+
+        return self.response_frame(code, result_code=0xFF)
@@ -0,0 +1,108 @@
+import threading
+import pandas as pd
+from collections import Counter
+
+# Dimensions a failure is indexed by, in key order
+FAILURE_DIMENSIONS = ("test", "code", "cause", "product", "fixture")
+
+class FailureIndex:
+    """
+    Incremental failure count index for Pareto queries
+
+    Failures are counted per distinct (test, code, cause, product, fixture)
+    key. The number of keys is bounded by the taxonomy (tests x codes x
+    products x fixtures), not by the number of results, so a Pareto over any
+    combination of dimensions aggregates a few hundred counters at most.
+    """
+
+    def __init__(self):
+        self._counts = Counter()
+        self._lock = threading.Lock()
+        self.total = 0
+
+    def add(self, test, code, cause, product, fixture):
+        """
+        Count one failure
+
+        Args:
+            test (str): Test name (e.g. "터치 검사")
+            code (int): Result code (None when the device did not answer)
+            cause (str): Failure cause from test_engine.describe_failure
+            product (str): Product type name
+            fixture (str): Fixture name
+        """
+        with self._lock:
+            self._counts[(test, code, cause, product, fixture or "")] += 1
+            self.total += 1
+
+    @classmethod
+    def from_counts(cls, counts):
+        """
+        Build an index from pre-aggregated failure counts
+
+        Args:
+            counts (iterable): (test, code, cause, product, fixture, count) tuples; NaN means missing
+
+        Returns:
+            FailureIndex: Index holding the counts
+        """
+        index = cls()
+        for key in counts:
+            test, code, cause, product, fixture, count = (None if pd.isna(value) else value for value in key)
+            index._counts[(test, None if code is None else int(code), cause, product, fixture or "")] += int(count)
+            index.total += int(count)
+        return index
+
+    @classmethod
+    def from_frame(cls, results):
+        """
+        Build an index from a result table
+
+        Args:
+            results (DataFrame): Result table with 테스트/결과/오류 코드/원인/제품 종류/픽스처 columns
+
+        Returns:
+            FailureIndex: Index of the failed rows
+        """
+        failed = results[results['결과'] == '실패']
+        if failed.empty:
+            return cls()
+
+        counts = failed[['테스트', '오류 코드', '원인', '제품 종류', '픽스처']].value_counts(dropna=False)
+        return cls.from_counts(key + (count,) for key, count in counts.items())
+
+    def pareto(self, by=("test", "cause"), filters=None, top=None):
+        """
+        Failure Pareto over the chosen dimensions
+
+        Args:
+            by (tuple): Dimensions to group by (from FAILURE_DIMENSIONS)
+            filters (dict): Optional dimension -> value restrictions
+            top (int): Keep only the largest groups
+
+        Returns:
+            list: {dimension values..., "count", "share", "cumulative_share"} sorted by count
+        """
+        positions = [FAILURE_DIMENSIONS.index(dimension) for dimension in by]
+        conditions = [(FAILURE_DIMENSIONS.index(dimension), value) for dimension, value in (filters or {}).items()]
+
+        groups = Counter()
+        with self._lock:
+            for key, count in self._counts.items():
+                if all(key[position] == value for position, value in conditions):
+                    groups[tuple(key[position] for position in positions)] += count
+
+        total = sum(groups.values())
+        rows = []
+        cumulative = 0
+        for group, count in groups.most_common(top):
+            cumulative += count
+            row = dict(zip(by, group))
+            row.update(count=count, share=count / total * 100, cumulative_share=cumulative / total * 100)
+            rows.append(row)
+        return rows
+
+    def clear(self):
+        with self._lock:
+            self._counts.clear()
+            self.total = 0
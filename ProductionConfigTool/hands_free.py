@@ -0,0 +1,202 @@
+import streamlit as st
+from packet_builder import PacketBuilder
+from serial_handler import PRESENCE_LINES
+from result_ring import record_to_event
+from station_runtime import StationRuntime, AUTO_WAITING, AUTO_TESTING, AUTO_REMOVE, AUTO_STOPPED
+from utils import validate_mac
+
+# 픽스처 상태 표시 이름
+AUTO_STATE_LABELS = {
+    AUTO_WAITING: "보드 장착 대기",
+    AUTO_TESTING: "검사 중",
+    AUTO_REMOVE: "보드 제거 대기",
+    AUTO_STOPPED: "중지됨",
+}
+
+def start_hands_free(station, fixtures, config_data, test_sequence, verify_mode, mac_start, mac_end, presence_line):
+    """
+    픽스처마다 작업 프로세스를 띄우고 핸즈프리 사이클을 시작하는 함수
+
+    Args:
+        station (StationState): 스테이션 상태
+        fixtures (dict): 픽스처 이름 -> 시리얼 포트
+        config_data (dict): 모든 보드에 전송할 설정
+        test_sequence (list): 보드마다 실행할 검사 목록
+        verify_mode (str): 설정 전송 확인 방식 ("ack", "readback" 또는 None)
+        mac_start (str): 처음 장착되는 보드의 MAC 주소
+        mac_end (str): 마지막 MAC 주소 (None이면 제한 없음)
+        presence_line (str): 보드 장착 스위치가 연결된 신호선 (None이면 상태 명령 폴링)
+    """
+    # 검사 결과는 공유 메모리 링으로만 전달 (이벤트 큐에는 사이클 상태만)
+    runtime = StationRuntime(fixtures, presence_line=presence_line, test_events=False)
+    runtime.start()
+    runtime.start_auto(
+        template=PacketBuilder(config_data).build_template(),
+        tests=test_sequence,
+        verify=verify_mode,
+        mac_start=mac_start,
+        mac_end=mac_end
+    )
+
+    station.hands_free = {
+        "runtime": runtime,
+        "config_data": dict(config_data),
+        "states": {fixture: (AUTO_WAITING, None) for fixture in fixtures},
+        "units": 0,
+        "units_passed": 0,
+        "cycle_times": [],
+        "errors": [],
+    }
+
+def drain_hands_free_events(station, record_test_result):
+    """
+    작업 프로세스가 결과 링에 쓴 검사 결과와 이벤트 큐의 픽스처 상태를 반영하는 함수
+
+    Args:
+        station (StationState): 스테이션 상태
+        record_test_result (callable): 검사 결과 기록 함수
+    """
+    with station.lock:
+        hands_free = station.hands_free
+        if hands_free is None:
+            return
+
+        runtime = hands_free["runtime"]
+        for fixture, records in runtime.results():
+            for record in records:
+                event = record_to_event(record)
+                record_test_result(
+                    event["test"], event["result"], event["time"], event["measurements"],
+                    event["result_code"] if event["cause"] else None, event["cause"],
+                    fixture=fixture,
+                    config_data=dict(hands_free["config_data"], mac_address=event["mac"]),
+                    duration=event["duration_s"]
+                )
+
+        for event in runtime.events():
+            if event["type"] == "auto":
+                hands_free["states"][event["fixture"]] = (event["state"], event["mac"])
+            elif event["type"] == "unit":
+                hands_free["units"] += 1
+                hands_free["units_passed"] += event["passed"]
+                hands_free["cycle_times"].append(event["duration_s"])
+            elif event["type"] == "error":
+                hands_free["errors"].append(f"{event['fixture']}: {event['error']}")
+
+        # 오류를 보고하지 못하고 종료된 작업 프로세스 (강제 종료 등)
+        alive = runtime.alive()
+        for fixture, (state, mac) in hands_free["states"].items():
+            if state != AUTO_STOPPED and fixture not in alive:
+                hands_free["states"][fixture] = (AUTO_STOPPED, None)
+                hands_free["errors"].append(f"{fixture}: 작업 프로세스가 종료되었습니다.")
+
+def stop_hands_free(station, record_test_result):
+    """
+    핸즈프리 사이클을 끝내고 작업 프로세스를 종료하는 함수 (검사 중인 보드는 마저 검사)
+
+    Args:
+        station (StationState): 스테이션 상태
+        record_test_result (callable): 검사 결과 기록 함수
+    """
+    with station.lock:
+        hands_free = station.hands_free
+        if hands_free is None:
+            return
+        hands_free["runtime"].stop()
+        drain_hands_free_events(station, record_test_result)
+        hands_free["runtime"].close()
+        station.hands_free = None
+
+@st.fragment(run_every=1)
+def show_hands_free_status():
+    """핸즈프리 사이클 진행 상황 표시 (1초마다 전체 재실행 없이 갱신)"""
+    station = st.session_state.station
+    drain_hands_free_events(station, st.session_state.record_test_result)
+
+    hands_free = station.hands_free
+    if hands_free is None:
+        return
+
+    fixture_cols = st.columns(len(hands_free["states"]))
+    for col, (fixture, (state, mac)) in zip(fixture_cols, hands_free["states"].items()):
+        with col:
+            st.metric(fixture, AUTO_STATE_LABELS[state], f"MAC {mac}" if mac else None, delta_color="off")
+
+    cycle_times = hands_free["cycle_times"]
+    summary_col1, summary_col2, summary_col3 = st.columns(3)
+    with summary_col1:
+        st.metric("검사한 보드", hands_free["units"])
+    with summary_col2:
+        st.metric("통과 보드", hands_free["units_passed"])
+    with summary_col3:
+        st.metric("보드당 평균 검사 시간", f"{sum(cycle_times) / len(cycle_times):.2f}초" if cycle_times else "-")
+
+    for error in hands_free["errors"]:
+        st.error(error)
+
+    lost = hands_free["runtime"].lost_results
+    if lost:
+        st.warning(f"결과 링이 가득 차 검사 결과 {lost}건이 기록되지 않았습니다.")
+
+def hands_free_ui(port_discovery):
+    """
+    보드 장착 감지 자동 실행 UI 컴포넌트
+
+    Args:
+        port_discovery (PortDiscovery): 시리얼 포트 검색 서비스
+    """
+    st.header("핸즈프리 사이클")
+    st.caption(
+        "보드를 장착하면 설정 전송과 검사가 자동으로 실행되고, 보드를 제거하면 다음 보드를 기다립니다. "
+        "픽스처를 두 개 선택하면 한쪽에서 검사하는 동안 다른 쪽에 다음 보드를 장착할 수 있습니다."
+    )
+
+    station = st.session_state.station
+    record_test_result = st.session_state.record_test_result
+
+    if station.hands_free is not None:
+        if st.button("핸즈프리 중지"):
+            stop_hands_free(station, record_test_result)
+            st.rerun()
+        show_hands_free_status()
+        return
+
+    # 작업 프로세스가 픽스처 포트를 직접 엶
+    if station.serial_connected:
+        st.info("핸즈프리 사이클은 픽스처 포트를 직접 사용합니다. 사이드바에서 연결을 해제하세요.")
+        return
+
+    port_info = {port["device"]: port for port in port_discovery.ports()}
+    selected_ports = st.multiselect(
+        "픽스처 포트",
+        options=list(port_info.keys()),
+        format_func=lambda device: f"{port_info[device]['fixture']} ({device})" if port_info[device]["fixture"] else device
+    )
+
+    mac_col1, mac_col2 = st.columns(2)
+    with mac_col1:
+        mac_start = st.text_input("시작 MAC 주소 (HEX)", value=st.session_state.config_data['mac_address'], key="hands_free_mac_start").upper()
+    with mac_col2:
+        mac_end = st.text_input("종료 MAC 주소 (HEX, 비우면 제한 없음)", value="", key="hands_free_mac_end").upper()
+
+    mac_valid = all(validate_mac(mac) for mac in filter(None, (mac_start, mac_end)))
+    if not mac_start or not mac_valid:
+        st.error("MAC 주소는 4자리 HEX 값이어야 합니다.")
+
+    verify_options = {"ACK 대기": "ack", "설정 읽기 비교": "readback", "확인 안 함": None}
+    selected_verify = st.selectbox("전송 확인 방식", options=list(verify_options.keys()), key="hands_free_verify")
+
+    presence_options = {"상태 명령 폴링": None, **{line.upper(): line for line in PRESENCE_LINES}}
+    selected_presence = st.selectbox("보드 장착 감지", options=list(presence_options.keys()),
+                                     help="픽스처의 장착 스위치가 연결된 신호선, 없으면 상태 명령으로 확인")
+
+    test_sequence = st.session_state.test_sequence or st.session_state.current_test_plan()
+    st.write(f"검사 항목: {', '.join(test_sequence)}")
+
+    if st.button("핸즈프리 시작", disabled=not selected_ports or not mac_start or not mac_valid):
+        fixtures = {port_info[device]["fixture"] or device: device for device in selected_ports}
+        start_hands_free(
+            station, fixtures, st.session_state.config_data, test_sequence, verify_options[selected_verify],
+            mac_start, mac_end or None, presence_options[selected_presence]
+        )
+        st.rerun()
@@ -0,0 +1,195 @@
+"""
+Bulk import of exported result CSV files into the result store
+
+CSV files saved with "CSV 파일로 내보내기" are parsed in parallel worker
+processes, normalized to the compact result schema and bulk inserted into
+the aggregation server database, skipping rows already stored (same time,
+test and MAC address; exports without MAC addresses match on time and test).
+
+Usage:
+    python history_import.py --db results.db exports/*.csv
+    python history_import.py --db results.db --station line1-st3 --workers 8 exports/
+"""
+import os
+import sys
+import json
+import glob
+import argparse
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+import pandas as pd
+from result_server import ResultStore
+
+# Exported column -> result store field (columns missing from older exports become NULL)
+CSV_COLUMNS = {
+    '테스트': 'test',
+    '결과': 'result',
+    '시간': 'time',
+    '제품 종류': 'product',
+    '조명 회로': 'light_circuits',
+    '콘센트 회로': 'outlet_circuits',
+    '디밍 종류': 'dimming_type',
+    'MAC 주소': 'mac',
+    '픽스처': 'fixture',
+    '오류 코드': 'failure_code',
+    '원인': 'failure_cause',
+    '소요 시간 (초)': 'duration',
+}
+
+# Columns every result export has (the first exports had no MAC 주소 column)
+REQUIRED_COLUMNS = ['테스트', '결과', '시간']
+
+# Compact in-memory types used between the workers and the store
+COMPACT_DTYPES = {
+    'test': 'category',
+    'result': 'category',
+    'product': 'category',
+    'fixture': 'category',
+    'failure_cause': 'category',
+    'light_circuits': 'Int8',
+    'outlet_circuits': 'Int8',
+    'dimming_type': 'Int8',
+    'failure_code': 'Int16',
+    'duration': 'float32',
+}
+
+TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+def read_result_csv(path, station=None):
+    """
+    Read one exported result CSV and normalize it to the compact result schema
+
+    Args:
+        path (str): CSV file path
+        station (str): Station name stored with every row (optional)
+
+    Returns:
+        DataFrame: Columns named after result store fields; rows without a valid
+                   time or test are dropped and duplicates within the file removed
+    """
+    frame = pd.read_csv(
+        path,
+        encoding="utf-8-sig",
+        usecols=lambda column: column in CSV_COLUMNS,
+        dtype={'MAC 주소': str, '시간': str},
+    ).rename(columns=CSV_COLUMNS)
+
+    missing = [column for column in REQUIRED_COLUMNS if CSV_COLUMNS[column] not in frame]
+    if missing:
+        raise ValueError(f"필수 열이 없습니다: {', '.join(missing)}")
+
+    # Canonical time text so the same result exported twice dedupes exactly
+    timestamps = pd.to_datetime(frame['time'], format=TIME_FORMAT, errors="coerce")
+    frame = frame[timestamps.notna() & frame['test'].notna()].copy()
+    frame['time'] = timestamps[frame.index].dt.strftime(TIME_FORMAT)
+    # Rows without a MAC are stored as NULL and dedupe on time and test alone
+    frame['mac'] = frame['mac'].str.strip().str.upper() if 'mac' in frame else None
+
+    for column, dtype in COMPACT_DTYPES.items():
+        if column in frame:
+            frame[column] = frame[column].astype(dtype)
+
+    if station:
+        frame['station'] = station
+
+    return frame.drop_duplicates(subset=['time', 'test', 'mac']).reset_index(drop=True)
+
+def _read_worker(path, station):
+    try:
+        return path, read_result_csv(path, station), None
+    except Exception as e:
+        return path, None, str(e)
+
+def expand_paths(paths):
+    """
+    Expand directories (recursively) and glob patterns to CSV file paths
+
+    Args:
+        paths (list): Files, directories or glob patterns
+
+    Returns:
+        list: Sorted CSV file paths
+    """
+    files = set()
+    for path in paths:
+        if os.path.isdir(path):
+            files.update(glob.glob(os.path.join(path, "**", "*.csv"), recursive=True))
+        else:
+            files.update(glob.glob(path) or [path])
+    return sorted(files)
+
+def import_csv_files(paths, store, station=None, workers=None, on_file=None):
+    """
+    Import result CSV files into a result store using a process pool
+
+    At most two files per worker are in flight, so memory stays bounded by
+    the file size rather than the total import size.
+
+    Args:
+        paths (list): CSV file paths
+        store (ResultStore): Destination store
+        station (str): Station name stored with every row (optional)
+        workers (int): Worker processes (default: CPU count)
+        on_file (callable): Optional callback(path, rows, error) per finished file
+
+    Returns:
+        dict: {"files", "rows", "inserted", "duplicates", "errors": [{"file", "error"}]}
+    """
+    workers = workers or os.cpu_count() or 1
+    errors = []
+    read_rows = 0
+
+    def parsed_frames(executor):
+        nonlocal read_rows
+        pending = set()
+        queue = list(paths)
+
+        while queue or pending:
+            while queue and len(pending) < workers * 2:
+                pending.add(executor.submit(_read_worker, queue.pop(0), station))
+
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                path, frame, error = future.result()
+                if error:
+                    errors.append({"file": path, "error": error})
+                else:
+                    read_rows += len(frame)
+                if on_file:
+                    on_file(path, 0 if frame is None else len(frame), error)
+                if frame is not None and not frame.empty:
+                    yield frame
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        outcome = store.bulk_import(parsed_frames(executor))
+
+    return {
+        "files": len(paths),
+        "rows": read_rows,
+        "inserted": outcome["inserted"],
+        "duplicates": outcome["duplicates"],
+        "errors": errors,
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="검사 결과 CSV 일괄 가져오기")
+    parser.add_argument("paths", nargs="+", help="CSV 파일, 디렉터리 또는 glob 패턴")
+    parser.add_argument("--db", default="results.db", help="결과 데이터베이스 경로")
+    parser.add_argument("--station", help="가져온 결과에 기록할 스테이션 이름")
+    parser.add_argument("--workers", type=int, help="작업 프로세스 수 (기본: CPU 수)")
+    args = parser.parse_args(argv)
+
+    paths = expand_paths(args.paths)
+    if not paths:
+        parser.error("가져올 CSV 파일이 없습니다.")
+
+    store = ResultStore(args.db)
+    try:
+        summary = import_csv_files(paths, store, station=args.station, workers=args.workers)
+    finally:
+        store.close()
+
+    print(json.dumps(summary, ensure_ascii=False))
+    return 1 if summary["errors"] else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,298 @@
+import os
+import glob
+import time
+import threading
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+# Root of the day partitions: history/YYYY-MM-DD/part-<ns>.arrow
+HISTORY_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "history")
+
+# Stored result schema (field names follow result_server.RESULT_FIELDS); repeated
+# strings are dictionary encoded and files are uncompressed so reads can be zero-copy
+_DICTIONARY_STRING = pa.dictionary(pa.int32(), pa.string())
+HISTORY_SCHEMA = pa.schema([
+    ("time", pa.timestamp("s")),
+    ("test", _DICTIONARY_STRING),
+    ("result", _DICTIONARY_STRING),
+    ("product", _DICTIONARY_STRING),
+    ("light_circuits", pa.int8()),
+    ("outlet_circuits", pa.int8()),
+    ("dimming_type", pa.int8()),
+    ("mac", pa.string()),
+    ("fixture", _DICTIONARY_STRING),
+    ("failure_code", pa.int16()),
+    ("failure_cause", _DICTIONARY_STRING),
+    ("duration", pa.float32()),
+])
+
+# A day with more part files than this is merged into one file
+MAX_PARTS_PER_DAY = 32
+
+class HistoryStore:
+    """
+    Day-partitioned columnar result history (Arrow IPC files)
+
+    Each day is a directory of immutable Arrow IPC files. Reads memory-map the
+    files, so selecting columns and filtering only touches the pages a query
+    uses; days outside the requested range are never opened. Appends are
+    buffered and written as new part files; days with many parts are merged.
+    """
+
+    def __init__(self, root=HISTORY_DIR, flush_rows=1000, flush_interval=60.0):
+        """
+        Open (or create) the store
+
+        Args:
+            root (str): Directory holding the day partitions
+            flush_rows (int): Buffered records that trigger a write
+            flush_interval (float): Seconds after which buffered records are written on the next append
+        """
+        self.root = root
+        self.flush_rows = flush_rows
+        self.flush_interval = flush_interval
+
+        self._buffer = []
+        self._last_flush = time.monotonic()
+        self._lock = threading.Lock()
+        os.makedirs(root, exist_ok=True)
+
+    def append(self, record):
+        """
+        Buffer one result record
+
+        Args:
+            record (dict): Result fields (HISTORY_SCHEMA names; time as "YYYY-MM-DD HH:MM:SS")
+        """
+        with self._lock:
+            self._buffer.append(record)
+            due = len(self._buffer) >= self.flush_rows or time.monotonic() - self._last_flush >= self.flush_interval
+
+        if due:
+            self.flush()
+
+    def flush(self):
+        """Write buffered records to their day partitions"""
+        with self._lock:
+            records, self._buffer = self._buffer, []
+            self._last_flush = time.monotonic()
+
+        if records:
+            self.append_frame(pd.DataFrame(records))
+
+    def append_frame(self, frame):
+        """
+        Write a batch of results to their day partitions
+
+        Args:
+            frame (DataFrame): Columns named after HISTORY_SCHEMA fields (missing ones are null)
+        """
+        frame = frame.reindex(columns=HISTORY_SCHEMA.names)
+        frame['time'] = pd.to_datetime(frame['time'])
+        frame = frame[frame['time'].notna()]
+
+        for day, day_frame in frame.groupby(frame['time'].dt.strftime("%Y-%m-%d"), sort=True):
+            table = pa.Table.from_pandas(
+                day_frame.astype(object).where(day_frame.notna(), None).assign(time=day_frame['time']),
+                schema=HISTORY_SCHEMA,
+                preserve_index=False
+            )
+            day_dir = os.path.join(self.root, day)
+            os.makedirs(day_dir, exist_ok=True)
+            self._write(os.path.join(day_dir, f"part-{time.time_ns()}.arrow"), table)
+
+            if len(self._parts(day_dir)) > MAX_PARTS_PER_DAY:
+                self.compact(day)
+
+    def _write(self, path, table):
+        with pa.OSFile(path + ".tmp", "wb") as sink:
+            with pa.ipc.new_file(sink, HISTORY_SCHEMA) as writer:
+                writer.write_table(table)
+        os.replace(path + ".tmp", path)
+
+    def _parts(self, day_dir):
+        return sorted(glob.glob(os.path.join(day_dir, "part-*.arrow")))
+
+    def compact(self, day):
+        """
+        Merge the part files of one day into a single file
+
+        Args:
+            day (str): Partition date ("YYYY-MM-DD")
+        """
+        day_dir = os.path.join(self.root, day)
+        parts = self._parts(day_dir)
+        if len(parts) < 2:
+            return
+
+        # Read into memory, not memory-mapped: a mapped part cannot be removed on Windows
+        table = pa.concat_tables(self._read(path, mapped=False) for path in parts)
+        table = table.unify_dictionaries().combine_chunks()
+        self._write(os.path.join(day_dir, f"part-{time.time_ns()}.arrow"), table)
+        for path in parts:
+            os.remove(path)
+
+    def _read(self, path, columns=None, mapped=True):
+        if mapped:
+            table = pa.ipc.open_file(pa.memory_map(path, "r")).read_all()
+        else:
+            with pa.OSFile(path, "rb") as source:
+                table = pa.ipc.open_file(source).read_all()
+
+        # Parts written before a field was added read it as nulls
+        for field in HISTORY_SCHEMA:
+            if table.schema.get_field_index(field.name) < 0:
+                table = table.append_column(field, pa.nulls(len(table), field.type))
+
+        return table.select(columns) if columns else table
+
+    def days(self):
+        """
+        Stored partition dates
+
+        Returns:
+            list: Dates ("YYYY-MM-DD"), oldest first
+        """
+        return sorted(
+            name for name in os.listdir(self.root)
+            if len(name) == 10 and os.path.isdir(os.path.join(self.root, name))
+        )
+
+    def _partitions(self, start, end, columns=None):
+        """Yield (day, memory-mapped table) for every part file in a date range"""
+        self.flush()
+
+        for day in self.days():
+            if (start is None or day >= start) and (end is None or day <= end):
+                for path in self._parts(os.path.join(self.root, day)):
+                    yield day, self._read(path, columns)
+
+    def scan(self, start=None, end=None, columns=None):
+        """
+        Memory-mapped table of the results in a date range
+
+        Args:
+            start (str): First day ("YYYY-MM-DD", inclusive; default: oldest)
+            end (str): Last day ("YYYY-MM-DD", inclusive; default: newest)
+            columns (list): Columns to return (default: all)
+
+        Returns:
+            pyarrow.Table: Results (one chunk per part file; dictionaries are per chunk)
+        """
+        tables = [table for _, table in self._partitions(start, end, columns)]
+        if not tables:
+            schema = pa.schema([HISTORY_SCHEMA.field(name) for name in columns]) if columns else HISTORY_SCHEMA
+            return schema.empty_table()
+        return pa.concat_tables(tables)
+
+    def summary(self, start=None, end=None):
+        """
+        Pass/fail statistics per day, test and product for a date range
+
+        Every part file is aggregated on its own (dictionaries differ between
+        files) and the small partial counts are combined afterwards.
+
+        Args:
+            start (str): First day ("YYYY-MM-DD", inclusive)
+            end (str): Last day ("YYYY-MM-DD", inclusive)
+
+        Returns:
+            dict: {"daily", "by_test", "by_product"} DataFrames with 통과/실패/총 검사 수/통과율
+        """
+        partials = []
+
+        for day, table in self._partitions(start, end, columns=["test", "result", "product"]):
+            if len(table):
+                # One grouping per file; day, test and product totals are sums of it
+                counts = table.group_by(["test", "product", "result"]).aggregate([("result", "count")])
+                partials.append(counts.to_pandas().astype({"test": str, "product": str, "result": str}).assign(day=day))
+
+        counts = pd.concat(partials, ignore_index=True) if partials else None
+        return {
+            "daily": _pass_fail_table(counts, "day"),
+            "by_test": _pass_fail_table(counts, "test"),
+            "by_product": _pass_fail_table(counts, "product"),
+        }
+
+    def _failed_rows(self, table):
+        """Failed rows of one part file (compares dictionary indices instead of decoding strings)"""
+        result = table["result"].combine_chunks()
+        failed_index = result.dictionary.index("실패").as_py()
+        if failed_index < 0:
+            return table.slice(0, 0)
+        return table.filter(pc.equal(result.indices, failed_index))
+
+    def failure_counts(self, start=None, end=None):
+        """
+        Failure counts per (test, failure_code, failure_cause, product, fixture) in a date range
+
+        Args:
+            start (str): First day ("YYYY-MM-DD", inclusive)
+            end (str): Last day ("YYYY-MM-DD", inclusive)
+
+        Returns:
+            DataFrame: Key columns plus "count"
+        """
+        keys = ["test", "failure_code", "failure_cause", "product", "fixture"]
+        partials = []
+
+        for _, table in self._partitions(start, end, columns=keys + ["result"]):
+            failed = self._failed_rows(table)
+            if len(failed):
+                counts = failed.group_by(keys).aggregate([("test", "count")]).to_pandas()
+                partials.append(counts.rename(columns={"test_count": "count"}))
+
+        if not partials:
+            return pd.DataFrame(columns=keys + ["count"])
+
+        counts = pd.concat(partials, ignore_index=True)
+        for key in ("test", "failure_cause", "product", "fixture"):
+            counts[key] = counts[key].astype(object)
+        return counts.groupby(keys, dropna=False, sort=False, observed=True)["count"].sum().reset_index()
+
+    def failures(self, start=None, end=None, limit=None):
+        """
+        Failed results in a date range, newest days first
+
+        Args:
+            start (str): First day ("YYYY-MM-DD", inclusive)
+            end (str): Last day ("YYYY-MM-DD", inclusive)
+            limit (int): Stop after this many rows (older days are not read)
+
+        Returns:
+            DataFrame: Failed rows (all HISTORY_SCHEMA columns, time as text)
+        """
+        frames = []
+        rows = 0
+
+        for day in reversed(self.days()):
+            if (start is not None and day < start) or (end is not None and day > end):
+                continue
+            for path in reversed(self._parts(os.path.join(self.root, day))):
+                failed = self._failed_rows(self._read(path))
+                frames.append(failed.to_pandas().iloc[::-1])
+                rows += len(failed)
+            if limit is not None and rows >= limit:
+                break
+
+        if not frames:
+            return pd.DataFrame(columns=HISTORY_SCHEMA.names)
+
+        frame = pd.concat(frames, ignore_index=True).sort_values("time", ascending=False, kind="stable")
+        frame = frame.head(limit) if limit is not None else frame
+        frame["time"] = frame["time"].dt.strftime("%Y-%m-%d %H:%M:%S")
+        return frame.reset_index(drop=True)
+
+def _pass_fail_table(counts, key):
+    """Pass/fail statistics by key from (key columns, result, result_count) rows"""
+    columns = [key, "통과", "실패", "총 검사 수", "통과율"]
+    if counts is None:
+        return pd.DataFrame(columns=columns)
+
+    table = counts.pivot_table(index=key, columns="result", values="result_count", aggfunc="sum", fill_value=0)
+    table = table.reindex(columns=["통과", "실패"], fill_value=0).reset_index()
+    table.columns.name = None
+    table["총 검사 수"] = table["통과"] + table["실패"]
+    table["통과율"] = (table["통과"] / table["총 검사 수"] * 100).round(2)
+    return table[columns]
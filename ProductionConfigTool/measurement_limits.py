@@ -0,0 +1,162 @@
+import os
+import json
+import numpy as np
+import pandas as pd
+from test_engine import MEASUREMENT_NAMES
+
+# Per-SKU tolerance table: {SKU name: {measurement: [LSL, USL]}}; "*" applies to every SKU
+LIMITS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "measurement_limits.json")
+
+# SKU key whose limits apply when a SKU has no entry of its own
+DEFAULT_SKU = "*"
+
+# Limits used when no tolerance file exists (220 V mains +/-10%)
+DEFAULT_LIMITS = {DEFAULT_SKU: {"voltage": [198.0, 242.0]}}
+
+# Measurement table columns; measurements are stored as float32
+MEASUREMENT_COLUMNS = ['시간', 'MAC 주소', 'SKU', '픽스처'] + MEASUREMENT_NAMES
+MEASUREMENT_DTYPE = "float32"
+
+# Display names for measurements
+MEASUREMENT_LABELS = {
+    "voltage": "전압 (V)",
+    "outlet1_current": "콘센트1 전류",
+    "outlet2_current": "콘센트2 전류",
+    "power": "전력 (W)",
+}
+
+def empty_measurement_frame():
+    """
+    Create an empty measurement table with typed columns
+
+    Returns:
+        DataFrame: Columns from MEASUREMENT_COLUMNS
+    """
+    frame = pd.DataFrame(columns=MEASUREMENT_COLUMNS)
+    return frame.astype({name: MEASUREMENT_DTYPE for name in MEASUREMENT_NAMES})
+
+def load_limits(path=LIMITS_FILE):
+    """
+    Load the per-SKU tolerance table
+
+    Args:
+        path (str): JSON tolerance file (DEFAULT_LIMITS when it does not exist)
+
+    Returns:
+        DataFrame: One row per (sku, measurement) with float lsl/usl (NaN = no limit)
+    """
+    if os.path.exists(path):
+        with open(path, encoding="utf-8") as f:
+            table = json.load(f)
+    else:
+        table = DEFAULT_LIMITS
+
+    rows = [
+        (sku, measurement, limits[0], limits[1])
+        for sku, measurements in table.items()
+        for measurement, limits in measurements.items()
+    ]
+    return pd.DataFrame(rows, columns=["sku", "measurement", "lsl", "usl"]).astype({"lsl": "float64", "usl": "float64"})
+
+def limit_arrays(limits, skus, measurement):
+    """
+    Resolve the limits of one measurement for every row
+
+    Args:
+        limits (DataFrame): Tolerance table from load_limits
+        skus (Series): SKU name per row
+        measurement (str): Measurement name
+
+    Returns:
+        tuple: (lsl, usl) float64 arrays aligned with skus (NaN = no limit)
+    """
+    rows = limits[limits["measurement"] == measurement].set_index("sku")
+    default = rows.loc[DEFAULT_SKU] if DEFAULT_SKU in rows.index else None
+    has_own = skus.isin(rows.index).to_numpy()
+
+    arrays = []
+    for bound in ("lsl", "usl"):
+        own = skus.map(rows[bound]).to_numpy(dtype="float64")
+        fallback = default[bound] if default is not None else np.nan
+        arrays.append(np.where(has_own, own, fallback))
+    return tuple(arrays)
+
+def check_limits(measurements, limits):
+    """
+    Check every measurement of every row against its SKU limits
+
+    Args:
+        measurements (DataFrame): Measurement table (MEASUREMENT_COLUMNS)
+        limits (DataFrame): Tolerance table from load_limits
+
+    Returns:
+        DataFrame: Boolean column per measurement (True = in spec, missing values and
+                   missing limits count as in spec) plus "in_spec" for the whole row
+    """
+    checks = pd.DataFrame(index=measurements.index)
+
+    # Resolve limits once per distinct SKU and broadcast them to the rows
+    codes, skus = pd.factorize(measurements["SKU"])
+
+    for measurement in MEASUREMENT_NAMES:
+        values = measurements[measurement].to_numpy(dtype="float64")
+        sku_lsl, sku_usl = limit_arrays(limits, pd.Series(skus), measurement)
+        lsl = np.append(sku_lsl, np.nan)[codes]
+        usl = np.append(sku_usl, np.nan)[codes]
+        # NaN comparisons are False, so unmeasured values and absent limits pass
+        checks[measurement] = ~((values < lsl) | (values > usl))
+
+    checks["in_spec"] = checks[MEASUREMENT_NAMES].all(axis=1)
+    return checks
+
+def capability(measurements, limits):
+    """
+    Process capability (Cp, Cpk) of every measurement per SKU
+
+    Args:
+        measurements (DataFrame): Measurement table (MEASUREMENT_COLUMNS)
+        limits (DataFrame): Tolerance table from load_limits
+
+    Returns:
+        DataFrame: One row per (SKU, measurement) with n, mean, std, lsl, usl, cp, cpk
+                   and out_of_spec (cp/cpk are NaN without the limits they need)
+    """
+    checks = check_limits(measurements, limits)
+    frames = []
+
+    for measurement in MEASUREMENT_NAMES:
+        values = measurements[measurement].astype("float64")
+        grouped = values.groupby(measurements["SKU"])
+        stats = grouped.agg(["count", "mean", "std"])
+        stats = stats[stats["count"] > 0]
+        if stats.empty:
+            continue
+
+        out_of_spec = (~checks[measurement] & values.notna()).groupby(measurements["SKU"]).sum()
+        lsl, usl = limit_arrays(limits, stats.index.to_series(), measurement)
+
+        mean = stats["mean"].to_numpy()
+        sigma = stats["std"].to_numpy()
+        with np.errstate(divide="ignore", invalid="ignore"):
+            cpu = (usl - mean) / (3 * sigma)
+            cpl = (mean - lsl) / (3 * sigma)
+            cp = (usl - lsl) / (6 * sigma)
+        # One-sided limits: Cpk is the side that exists
+        cpk = np.where(np.isnan(cpu), cpl, np.where(np.isnan(cpl), cpu, np.minimum(cpu, cpl)))
+
+        frames.append(pd.DataFrame({
+            "SKU": stats.index,
+            "measurement": measurement,
+            "n": stats["count"].to_numpy(dtype="int64"),
+            "mean": mean,
+            "std": sigma,
+            "lsl": lsl,
+            "usl": usl,
+            "cp": cp,
+            "cpk": cpk,
+            "out_of_spec": out_of_spec.reindex(stats.index).to_numpy(dtype="int64"),
+        }))
+
+    if not frames:
+        return pd.DataFrame(columns=["SKU", "measurement", "n", "mean", "std", "lsl", "usl", "cp", "cpk", "out_of_spec"])
+    return pd.concat(frames, ignore_index=True)
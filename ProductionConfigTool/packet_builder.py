@@ -1,5 +1,178 @@
 import time
 import datetime
+from utils import get_current_datetime_bytes, calculate_checksum_xor, calculate_checksum_add
+
+# Fields compared when a configuration is read back from the device
+CONFIG_FIELDS = [
+    'product_type', 'mac_address', 'light_circuits', 'outlet_circuits',
+    'dimming_type', 'delay_time', 'sub_id', 'ir_present', 'scenario',
+    'comm_company', 'three_way', 'overload_protection', 'emergency_call',
+    'outlet1_learn_value', 'outlet1_current_value', 'outlet2_learn_value',
+    'outlet2_current_value', 'relay_status', 'outlet1_mode', 'outlet2_mode',
+    'sleep_mode', 'delay_mode', 'dimming_value', 'color_temp_value'
+]
+
+# Index of the first date/time byte ([29]~[32])
+DATETIME_INDEX = 29
+
+# Byte offsets of the fields that can be patched in place: (index, width)
+# Multi-byte values are little-endian, except the ID bytes which keep the
+# order of the MAC address hex string.
+PATCHABLE_FIELDS = {
+    'mac_address': (2, 2),
+    'delay_time': (6, 1),
+    'sub_id': (7, 1),
+    'outlet1_learn_value': (13, 2),
+    'outlet1_current_value': (15, 2),
+    'outlet2_learn_value': (17, 2),
+    'outlet2_current_value': (19, 2),
+    'relay_status': (21, 1),
+    'dimming_value': (27, 1),
+    'color_temp_value': (28, 1),
+}
+
+class ConfigPacket:
+    """
+    Mutable 40-byte packet whose checksums are maintained incrementally
+    
+    Patching a field folds only the changed bytes into the XOR/ADD checksums,
+    so per-unit updates (ID, SUB ID, date/time) cost O(changed bytes) instead
+    of re-summing bytes [6]~[36]. The packet can be handed to serial.write
+    as a memoryview without copying.
+    """
+    
+    def __init__(self, packet):
+        """
+        Initialize from an existing packet (the buffer is copied once)
+        
+        Args:
+            packet (bytes): Valid 40-byte packet, e.g. a compiled template
+        """
+        if len(packet) != 40:
+            raise ValueError(f"Invalid packet length: {len(packet)}")
+        
+        self._buffer = bytearray(packet)
+        self._view = memoryview(self._buffer)
+    
+    def set_byte(self, index, value):
+        """
+        Replace one byte and update the checksums
+        
+        Args:
+            index (int): Byte index (1~36; STX, checksums and ETX are fixed)
+            value (int): New byte value
+        """
+        if not 1 <= index <= 36:
+            raise IndexError(f"Byte [{index}] cannot be patched")
+        
+        buffer = self._buffer
+        old_value = buffer[index]
+        new_value = value & 0xFF
+        
+        if old_value == new_value:
+            return
+        
+        buffer[index] = new_value
+        
+        # Only bytes [6]~[36] are covered by the checksums
+        if index >= 6:
+            buffer[37] ^= old_value ^ new_value
+            buffer[38] = (buffer[38] - old_value + new_value) & 0xFF
+    
+    def set_bytes(self, index, values):
+        """
+        Replace consecutive bytes starting at index
+        
+        Args:
+            index (int): First byte index
+            values (iterable): New byte values
+        """
+        for offset, value in enumerate(values):
+            self.set_byte(index + offset, value)
+    
+    def set_field(self, name, value):
+        """
+        Update a configuration field in place
+        
+        Args:
+            name (str): Field name (see PATCHABLE_FIELDS)
+            value: New value (hex string for mac_address, int otherwise)
+        """
+        if name not in PATCHABLE_FIELDS:
+            raise KeyError(f"Field cannot be patched in place: {name}")
+        
+        index, width = PATCHABLE_FIELDS[name]
+        
+        if name == 'mac_address':
+            mac_bytes = bytes.fromhex(value)
+            self.set_bytes(index, [mac_bytes[0] if len(mac_bytes) > 0 else 0,
+                                   mac_bytes[1] if len(mac_bytes) > 1 else 0])
+        elif width == 2:
+            self.set_bytes(index, [value & 0xFF, (value >> 8) & 0xFF])
+        else:
+            self.set_byte(index, value)
+    
+    def set_datetime(self, datetime_bytes=None):
+        """
+        Update the date/time bytes [29]~[32]
+        
+        Args:
+            datetime_bytes (list): 4 date/time bytes (default: current time)
+        """
+        if datetime_bytes is None:
+            datetime_bytes = get_current_datetime_bytes()
+        self.set_bytes(DATETIME_INDEX, datetime_bytes)
+    
+    def view(self):
+        """
+        Zero-copy read-only view of the packet, suitable for serial.write
+        
+        Returns:
+            memoryview: View over the internal buffer (reflects later updates)
+        """
+        return self._view.toreadonly()
+    
+    def to_bytes(self):
+        """
+        Copy of the current packet contents
+        
+        Returns:
+            bytes: 40-byte packet
+        """
+        return bytes(self._buffer)
+    
+    def __len__(self):
+        return 40
+
+def patch_packet(packet, updates):
+    """
+    Replace individual bytes of a packet and update the checksums incrementally
+    
+    Args:
+        packet (bytes): Valid 40-byte packet
+        updates (dict): Mapping of byte index to new byte value
+        
+    Returns:
+        bytes: Patched 40-byte packet
+    """
+    patched = ConfigPacket(packet)
+    for index, value in updates.items():
+        patched.set_byte(index, value)
+    return patched.to_bytes()
+
+def stamp_datetime(packet):
+    """
+    Patch the current date/time into bytes [29]~[32] of a packet
+    
+    Args:
+        packet (bytes): Valid 40-byte packet
+        
+    Returns:
+        bytes: Packet carrying the current date/time
+    """
+    stamped = ConfigPacket(packet)
+    stamped.set_datetime()
+    return stamped.to_bytes()
 
 class PacketBuilder:
     """
@@ -133,22 +306,32 @@ class PacketBuilder:
         packet[36] = 0x13  # Version low byte
         
         # [37] XOR checksum of bytes [6]~[36]
-        xor_checksum = 0
-        for i in range(6, 37):
-            xor_checksum ^= packet[i]
-        packet[37] = xor_checksum
+        checksum_data = memoryview(packet)[6:37]
+        packet[37] = calculate_checksum_xor(checksum_data)
         
-        # [38] ADD checksum of bytes [6]~[36]
-        add_checksum = 0
-        for i in range(6, 37):
-            add_checksum += packet[i]
-        packet[38] = add_checksum & 0xFF  # Take only lower byte
+        # [38] ADD checksum of bytes [6]~[36] (lower byte only)
+        packet[38] = calculate_checksum_add(checksum_data)
+        checksum_data.release()
         
         # [39] ETX
         packet[39] = 0x25
         
         return bytes(packet)
     
+    def build_template(self):
+        """
+        Build a packet template with the per-unit fields cleared
+        
+        The ID bytes [2]~[3] and the date/time bytes [29]~[32] are zeroed so the
+        template only depends on the configuration profile and can be cached.
+        
+        Returns:
+            bytes: 40-byte packet template with valid checksums
+        """
+        updates = {2: 0, 3: 0}
+        updates.update({DATETIME_INDEX + i: 0 for i in range(4)})
+        return patch_packet(self.build_packet(), updates)
+    
     def validate_packet(self, packet):
         """
         Validate packet checksums and structure
@@ -166,20 +349,88 @@ class PacketBuilder:
         if packet[0] != 0xDA or packet[39] != 0x25:
             return False
             
+        checksum_data = memoryview(packet)[6:37]
+        
+        # Calculate and verify ADD checksum (cheapest check first)
+        if calculate_checksum_add(checksum_data) != packet[38]:
+            return False
+        
         # Calculate and verify XOR checksum
-        xor_checksum = 0
-        for i in range(6, 37):
-            xor_checksum ^= packet[i]
-            
-        if xor_checksum != packet[37]:
+        if calculate_checksum_xor(checksum_data) != packet[37]:
             return False
             
-        # Calculate and verify ADD checksum
-        add_checksum = 0
-        for i in range(6, 37):
-            add_checksum += packet[i]
+        return True
+
+    @staticmethod
+    def decode_packet(packet):
+        """
+        Decode a 40-byte configuration packet back into configuration fields
+        
+        Args:
+            packet (bytes): 40-byte packet (as built by build_packet or read back from a device)
             
-        if (add_checksum & 0xFF) != packet[38]:
-            return False
+        Returns:
+            dict: Configuration parameters using the same keys as config_data,
+                  plus 'datetime' and 'version'
+        """
+        if len(packet) != 40:
+            raise ValueError(f"Invalid packet length: {len(packet)}")
+        
+        config = {
+            'product_type': packet[1],
+            'mac_address': f"{packet[2]:02X}{packet[3]:02X}",
+            'light_circuits': packet[5] & 0x0F,
+            'outlet_circuits': (packet[5] >> 4) & 0x03,
+            'dimming_type': (packet[5] >> 6) & 0x03,
+            'delay_time': packet[6],
+            'sub_id': packet[7],
+            'ir_present': packet[8] & 0x01,
+            'scenario': packet[9] & 0x07,
+            'comm_company': packet[10] & 0x07,
+            'three_way': packet[11] & 0x01,
+            'overload_protection': packet[12] & 0x0F,
+            'emergency_call': (packet[12] >> 4) & 0x0F,
+            'outlet1_learn_value': packet[13] | (packet[14] << 8),
+            'outlet1_current_value': packet[15] | (packet[16] << 8),
+            'outlet2_learn_value': packet[17] | (packet[18] << 8),
+            'outlet2_current_value': packet[19] | (packet[20] << 8),
+            'relay_status': packet[21],
+            'outlet1_mode': packet[22] & 0x01,
+            'outlet2_mode': packet[23] & 0x01,
+            'sleep_mode': packet[25] & 0x01,
+            'delay_mode': packet[26] & 0x01,
+            'dimming_value': packet[27],
+            'color_temp_value': packet[28],
+        }
+        
+        # [29]~[32] Date/time (year offset from 2020 and month share byte 29)
+        config['datetime'] = (
+            2020 + ((packet[29] >> 4) & 0x0F), packet[29] & 0x0F,
+            packet[30], packet[31], packet[32]
+        )
+        
+        # [35]~[36] Version information
+        config['version'] = (packet[35] << 8) | packet[36]
+        
+        return config
+    
+    @staticmethod
+    def compare_packets(expected, actual):
+        """
+        Compare two configuration packets field by field
+        
+        Args:
+            expected (bytes): Packet that was sent
+            actual (bytes): Packet that was read back
             
-        return True
+        Returns:
+            list: (field, expected value, actual value) tuples for every mismatching field
+        """
+        expected_config = PacketBuilder.decode_packet(expected)
+        actual_config = PacketBuilder.decode_packet(actual)
+        
+        return [
+            (field, expected_config[field], actual_config[field])
+            for field in CONFIG_FIELDS
+            if expected_config[field] != actual_config[field]
+        ]
@@ -0,0 +1,237 @@
+import os
+import json
+import threading
+import serial.tools.list_ports
+
+# Fixture assignments: USB serial number -> fixture name
+FIXTURE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures.json")
+
+# Negotiated link speeds: fixture name -> baud rate (see SerialHandler.negotiate_baudrate)
+LINK_RATE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "link_rates.json")
+
+# sysfs directory listing every tty device on Linux; its contents change on hot-plug
+SYSFS_TTY_DIR = "/sys/class/tty"
+
+class PortDiscovery:
+    """
+    Cached serial port discovery with background hot-plug detection
+
+    A daemon thread keeps the port list current. On Linux it only lists
+    /sys/class/tty on every poll and re-enumerates ports (comports) when that
+    listing changes; elsewhere it re-enumerates every rescan_interval seconds.
+    Readers always get the cached list, so enumeration never runs on the UI path.
+    """
+
+    def __init__(self, poll_interval=0.5, rescan_interval=3.0, fixture_file=FIXTURE_FILE,
+                 link_rate_file=LINK_RATE_FILE):
+        """
+        Initialize the discovery service (call start() to begin watching)
+
+        Args:
+            poll_interval (float): Seconds between sysfs checks
+            rescan_interval (float): Seconds between full rescans when sysfs is unavailable
+            fixture_file (str): JSON file mapping USB serial numbers to fixture names
+            link_rate_file (str): JSON file with the negotiated baud rate per fixture
+        """
+        self.poll_interval = poll_interval
+        self.rescan_interval = rescan_interval
+        self.fixture_file = fixture_file
+        self.link_rate_file = link_rate_file
+        self.version = 0
+
+        self._ports = []
+        self._signature = None
+        self._callbacks = []
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._rescan_event = threading.Event()
+        self._thread = None
+        self._fixtures = self._load_json(fixture_file)
+        self._link_rates = self._load_json(link_rate_file)
+
+        # Populate synchronously once so the first reader has a list
+        self._scan()
+
+    def _load_json(self, path):
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                return json.load(f)
+        return {}
+
+    def _sysfs_signature(self):
+        try:
+            return frozenset(os.listdir(SYSFS_TTY_DIR))
+        except OSError:
+            return None
+
+    def _scan(self):
+        ports = [
+            {
+                "device": port.device,
+                "description": port.description,
+                "serial_number": port.serial_number,
+                "vid": port.vid,
+                "pid": port.pid,
+            }
+            for port in sorted(serial.tools.list_ports.comports(), key=lambda p: p.device)
+        ]
+
+        with self._lock:
+            changed = ports != self._ports
+            if changed:
+                self._ports = ports
+                self.version += 1
+            callbacks = list(self._callbacks)
+
+        if changed:
+            for callback in callbacks:
+                callback(ports)
+
+    def _run(self):
+        elapsed = 0.0
+        while not self._stop_event.is_set():
+            signature = self._sysfs_signature()
+
+            if self._rescan_event.is_set():
+                self._rescan_event.clear()
+                self._scan()
+                elapsed = 0.0
+            elif signature is not None:
+                if signature != self._signature:
+                    self._signature = signature
+                    self._scan()
+            elif elapsed >= self.rescan_interval:
+                self._scan()
+                elapsed = 0.0
+
+            self._stop_event.wait(self.poll_interval)
+            elapsed += self.poll_interval
+
+    def start(self):
+        """Start the background watcher thread"""
+        if self._thread is None or not self._thread.is_alive():
+            self._signature = self._sysfs_signature()
+            self._stop_event.clear()
+            self._thread = threading.Thread(target=self._run, name="port-discovery", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop the background watcher thread"""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+
+    def rescan(self):
+        """Request a full re-enumeration on the watcher thread (non-blocking)"""
+        self._rescan_event.set()
+
+    def on_change(self, callback):
+        """
+        Register a callback run on the watcher thread whenever the port list changes
+
+        Args:
+            callback (callable): Called with the new port list
+        """
+        with self._lock:
+            self._callbacks.append(callback)
+
+    def ports(self):
+        """
+        Return the cached port list
+
+        Returns:
+            list: Port dictionaries (device, description, serial_number, vid, pid, fixture)
+        """
+        with self._lock:
+            ports = [dict(port) for port in self._ports]
+
+        for port in ports:
+            port["fixture"] = self._fixtures.get(port["serial_number"]) if port["serial_number"] else None
+        return ports
+
+    def devices(self):
+        """
+        Return the cached port device names
+
+        Returns:
+            list: Device names (e.g. "COM3", "/dev/ttyUSB0")
+        """
+        with self._lock:
+            return [port["device"] for port in self._ports]
+
+    def fixture_for_device(self, device):
+        """
+        Look up the fixture assigned to a port
+
+        Args:
+            device (str): Port device name
+
+        Returns:
+            str: Fixture name, or None if the port has no assignment
+        """
+        for port in self.ports():
+            if port["device"] == device:
+                return port["fixture"]
+        return None
+
+    def device_for_fixture(self, fixture_name):
+        """
+        Find the port a fixture is currently plugged into (by USB serial number)
+
+        Args:
+            fixture_name (str): Fixture name
+
+        Returns:
+            str: Device name, or None if the fixture is not connected
+        """
+        for port in self.ports():
+            if port["fixture"] == fixture_name:
+                return port["device"]
+        return None
+
+    def assign_fixture(self, serial_number, fixture_name):
+        """
+        Assign a fixture name to a USB serial number and persist it
+
+        Args:
+            serial_number (str): USB serial number of the adapter
+            fixture_name (str): Fixture name (empty removes the assignment)
+        """
+        with self._lock:
+            if fixture_name:
+                self._fixtures[serial_number] = fixture_name
+            else:
+                self._fixtures.pop(serial_number, None)
+
+            with open(self.fixture_file, "w", encoding="utf-8") as f:
+                json.dump(self._fixtures, f, ensure_ascii=False, indent=2)
+
+    def link_baudrate(self, fixture_name):
+        """
+        Look up the baud rate last negotiated on a fixture
+
+        Args:
+            fixture_name (str): Fixture name
+
+        Returns:
+            int: Baud rate, or None if none was recorded
+        """
+        with self._lock:
+            return self._link_rates.get(fixture_name)
+
+    def record_link_baudrate(self, fixture_name, baudrate):
+        """
+        Persist the baud rate negotiated on a fixture
+
+        Args:
+            fixture_name (str): Fixture name
+            baudrate (int): Negotiated baud rate
+        """
+        with self._lock:
+            if self._link_rates.get(fixture_name) == baudrate:
+                return
+            self._link_rates[fixture_name] = baudrate
+
+            with open(self.link_rate_file, "w", encoding="utf-8") as f:
+                json.dump(self._link_rates, f, ensure_ascii=False, indent=2)
@@ -0,0 +1,192 @@
+import streamlit as st
+import pandas as pd
+import time
+import datetime
+from packet_builder import PacketBuilder, patch_packet, stamp_datetime
+from utils import parse_mac_range, parse_mac_list
+
+def build_packet_queue(config_data, mac_addresses, profile_library=None, profile_name=None):
+    """
+    설정 프로필과 MAC 주소 목록으로 전송할 패킷을 한 번에 미리 생성하는 함수
+
+    프로필 라이브러리가 주어지면 프로필의 최신 버전을, 그렇지 않으면 현재 설정을
+    템플릿으로 한 번 만든 뒤 보드마다 MAC 바이트만 덮어씁니다.
+    날짜/시간 바이트는 전송 시점에 채워집니다.
+
+    Args:
+        config_data (dict): 현재 설정 (프로필을 사용하지 않을 때)
+        mac_addresses (list): MAC 주소 목록
+        profile_library (ProfileLibrary): 프로필 라이브러리
+        profile_name (str): 사용할 프로필 이름
+
+    Returns:
+        list: {"MAC": str, "패킷": bytes} 딕셔너리 목록
+    """
+    # 프로필 버전은 큐 전체에 대해 한 번만 확인
+    if profile_library is not None and profile_name:
+        template = profile_library.compile(profile_name)
+    else:
+        template = PacketBuilder(config_data).build_template()
+    queue = []
+
+    for mac in mac_addresses:
+        mac_bytes = bytes.fromhex(mac)
+        queue.append({"MAC": mac, "패킷": patch_packet(template, {2: mac_bytes[0], 3: mac_bytes[1]})})
+
+    return queue
+
+def provision_unit(serial_handler, item, verify_mode=None):
+    """
+    미리 생성된 패킷 하나를 장착된 보드에 전송하고 확인하는 함수
+
+    Args:
+        serial_handler: 시리얼 통신 핸들러
+        item (dict): build_packet_queue에서 생성된 항목
+        verify_mode (str): None이면 상태 확인만, "ack" 또는 "readback"이면 디바이스 검증
+
+    Returns:
+        dict: 전송 결과 딕셔너리
+    """
+    start_time = time.time()
+    packet = stamp_datetime(item["패킷"])
+    result = {
+        "MAC": item["MAC"],
+        "결과": "실패",
+        "시간": datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "소요 시간": "",
+        "오류": "-"
+    }
+
+    try:
+        if verify_mode is not None:
+            outcome = serial_handler.send_packet_verified(packet, mode=verify_mode)
+            if outcome["verified"]:
+                result["결과"] = "통과"
+            else:
+                result["오류"] = outcome["error"]
+        elif not serial_handler.send_packet(packet):
+            result["오류"] = "패킷 일부만 전송됨"
+        elif serial_handler.consume_acknowledgement() is None and not serial_handler.check_device_status():
+            result["오류"] = "전송 후 디바이스 응답 없음"
+        else:
+            result["결과"] = "통과"
+    except Exception as e:
+        result["오류"] = str(e)
+
+    result["소요 시간"] = f"{time.time() - start_time:.2f}초"
+    return result
+
+def provisioning_ui(profile_library=None):
+    """
+    일괄 MAC 설정 UI 컴포넌트
+
+    Args:
+        profile_library (ProfileLibrary): 설정 프로필 라이브러리
+    """
+    st.header("일괄 MAC 설정")
+
+    if 'provision_queue' not in st.session_state:
+        st.session_state.provision_queue = []
+    if 'provision_index' not in st.session_state:
+        st.session_state.provision_index = 0
+    if 'provision_log' not in st.session_state:
+        st.session_state.provision_log = []
+
+    # 설정 프로필 선택
+    profile_options = ["현재 설정"]
+    if profile_library is not None:
+        profile_options += profile_library.list_profiles()
+    selected_profile = st.selectbox("설정 프로필", options=profile_options)
+    profile_name = None if selected_profile == "현재 설정" else selected_profile
+
+    st.info("선택한 프로필로 모든 패킷을 미리 생성합니다. MAC 주소만 보드마다 자동으로 증가합니다.")
+
+    # MAC 주소 입력 방식 선택
+    input_mode = st.radio("MAC 주소 입력 방식", ["MAC 범위", "목록 파일 업로드"], horizontal=True)
+
+    mac_addresses = []
+    try:
+        if input_mode == "MAC 범위":
+            range_col1, range_col2 = st.columns(2)
+            with range_col1:
+                start_mac = st.text_input("시작 MAC 주소 (HEX)", value=st.session_state.config_data['mac_address'])
+            with range_col2:
+                end_mac = st.text_input("종료 MAC 주소 (HEX)", value=st.session_state.config_data['mac_address'])
+            mac_addresses = parse_mac_range(start_mac, end_mac)
+        else:
+            uploaded_file = st.file_uploader("MAC 주소 목록 (txt/csv)", type=["txt", "csv"])
+            if uploaded_file is not None:
+                mac_addresses = parse_mac_list(uploaded_file.getvalue().decode("utf-8-sig"))
+    except ValueError as e:
+        st.error(str(e))
+
+    st.write(f"대상 보드 수: {len(mac_addresses)}")
+
+    if st.button("패킷 생성", disabled=len(mac_addresses) == 0):
+        st.session_state.provision_queue = build_packet_queue(
+            st.session_state.config_data, mac_addresses, profile_library, profile_name
+        )
+        st.session_state.provision_index = 0
+        st.session_state.provision_log = []
+        st.success(f"{len(st.session_state.provision_queue)}개의 패킷이 생성되었습니다.")
+
+    queue = st.session_state.provision_queue
+    remaining = len(queue) - st.session_state.provision_index
+
+    if queue:
+        st.progress(st.session_state.provision_index / len(queue))
+        if remaining > 0:
+            st.write(f"다음 MAC 주소: {queue[st.session_state.provision_index]['MAC']} (남은 보드 {remaining}개)")
+        else:
+            st.success("모든 보드의 설정이 완료되었습니다.")
+
+    unit_timeout = st.number_input("보드 장착 대기 시간 (초)", min_value=5, max_value=600, value=60)
+
+    verify_options = {"상태 확인": None, "ACK 대기": "ack", "설정 읽기 비교": "readback"}
+    selected_verify = st.selectbox("전송 확인 방식", options=list(verify_options.keys()), index=1)
+
+    # 일괄 설정 실행 (다른 버튼을 누르면 Streamlit이 재실행되면서 중지됨)
+    station = st.session_state.station
+    if st.button("일괄 설정 시작", disabled=not station.serial_connected or remaining <= 0):
+        serial_handler = station.serial_handler
+        status = st.empty()
+
+        # 일괄 설정 중에는 다른 세션이 장치를 사용하지 않음
+        with station.device_lock:
+            while st.session_state.provision_index < len(queue):
+                item = queue[st.session_state.provision_index]
+
+                status.info(f"MAC {item['MAC']}: 보드를 장착하세요...")
+                if not serial_handler.wait_for_device(present=True, timeout=unit_timeout):
+                    status.warning("보드 장착 대기 시간이 초과되었습니다. 일괄 설정을 중지합니다.")
+                    break
+
+                result = provision_unit(serial_handler, item, verify_options[selected_verify])
+                st.session_state.provision_log.append(result)
+
+                if result["결과"] != "통과":
+                    status.error(f"MAC {item['MAC']} 설정 실패: {result['오류']}")
+                    break
+
+                st.session_state.provision_index += 1
+
+                status.success(f"MAC {item['MAC']} 설정 완료. 보드를 제거하세요...")
+                if not serial_handler.wait_for_device(present=False, timeout=unit_timeout):
+                    status.warning("보드 제거 대기 시간이 초과되었습니다. 일괄 설정을 중지합니다.")
+                    break
+
+    if st.button("일괄 설정 중지"):
+        st.info("일괄 설정이 중지되었습니다.")
+
+    # 전송 기록 표시
+    if st.session_state.provision_log:
+        st.subheader("전송 기록")
+        log_df = pd.DataFrame(st.session_state.provision_log)
+        st.dataframe(log_df, use_container_width=True)
+
+        st.download_button(
+            label="전송 기록 CSV 다운로드",
+            data=log_df.to_csv(index=False),
+            file_name="일괄_설정_기록.csv",
+            mime="text/csv"
+        )
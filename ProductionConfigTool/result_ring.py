@@ -0,0 +1,198 @@
+"""
+Shared-memory ring buffers for test results
+
+One shared memory block holds a fixed-size ring per fixture. Each fixture
+worker is the only writer of its ring; any number of readers (UI, uploader,
+aggregator) follow it with their own cursor. Records are fixed-size numpy
+structs, so a read is one memcpy of the new records, with no pickling and no
+lock shared with the writers.
+
+Layout:
+    [0:64]     header: magic, fixture count, capacity per ring
+    per ring:  64-byte counter block (records written, uint64) + capacity records
+"""
+import time
+import datetime
+import numpy as np
+from multiprocessing import shared_memory
+from test_engine import (TEST_COMMANDS, MEASUREMENT_NAMES, NO_RESPONSE_CAUSE, COMMUNICATION_ERROR_CAUSE,
+                         RESPONSE_TIMEOUT_CAUSE, describe_failure)
+
+RING_MAGIC = 0x52494E47  # "RING"
+HEADER_SIZE = 64
+COUNTER_SIZE = 64
+
+# Result code stored when the device did not answer
+NO_RESULT_CODE = 0xFFFF
+
+# Failure causes that come without a result code, stored as their position + 1 (0 = none)
+UNCODED_CAUSES = (NO_RESPONSE_CAUSE, COMMUNICATION_ERROR_CAUSE, RESPONSE_TIMEOUT_CAUSE)
+
+# One test result (40 bytes); measurements in MEASUREMENT_NAMES order, NaN where not measured
+RECORD_DTYPE = np.dtype({
+    "names": ["time", "duration", "mac", "result_code", "test", "passed", "cause", "measurements"],
+    "formats": ["<f8", "<f4", "<u2", "<u2", "u1", "u1", "u1", ("<f4", (len(MEASUREMENT_NAMES),))],
+    "offsets": [0, 8, 12, 14, 16, 17, 18, 24],
+    "itemsize": 24 + 4 * len(MEASUREMENT_NAMES),
+})
+
+# Test type by command code
+TEST_TYPES = {code: test_type for test_type, code in TEST_COMMANDS.items()}
+
+def record_to_event(record):
+    """
+    Rebuild the station_runtime "test" event of a ring record (without fixture)
+
+    Args:
+        record: One RECORD_DTYPE record
+
+    Returns:
+        dict: {"mac", "test", "result", "result_code", "cause", "measurements", "time", "duration_s"}
+    """
+    test_type = TEST_TYPES[int(record["test"])]
+    result_code = None if record["result_code"] == NO_RESULT_CODE else int(record["result_code"])
+    if result_code is not None:
+        cause = describe_failure(test_type, result_code)
+    else:
+        cause = UNCODED_CAUSES[record["cause"] - 1] if record["cause"] else None
+    measurements = {name: round(float(value), 4) for name, value in zip(MEASUREMENT_NAMES, record["measurements"])
+                    if not np.isnan(value)}
+
+    return {
+        "mac": f"{int(record['mac']):04X}",
+        "test": f"{test_type} 검사",
+        "result": "통과" if record["passed"] else "실패",
+        "result_code": result_code,
+        "cause": cause,
+        "measurements": measurements or None,
+        "time": datetime.datetime.fromtimestamp(float(record["time"])).strftime("%Y-%m-%d %H:%M:%S"),
+        "duration_s": None if np.isnan(record["duration"]) else round(float(record["duration"]), 4),
+    }
+
+class ResultRing:
+    """
+    Per-fixture single-writer rings in one shared memory block
+
+    A writer stores the record first and then publishes it by advancing the
+    ring's counter. A reader copies the records between its cursor and the
+    counter, then checks the counter again: records the writer may have
+    overwritten during the copy are dropped and reported as lost.
+    """
+
+    def __init__(self, fixtures=None, capacity=4096, name=None):
+        """
+        Create a ring block, or attach to an existing one by name
+
+        Args:
+            fixtures (int): Number of fixture rings (creates a new block)
+            capacity (int): Records per ring (new block only)
+            name (str): Shared memory name to attach to (fixtures/capacity are read from it)
+        """
+        if name is None:
+            size = HEADER_SIZE + fixtures * (COUNTER_SIZE + capacity * RECORD_DTYPE.itemsize)
+            self._shm = shared_memory.SharedMemory(create=True, size=size)
+            header = np.ndarray(3, dtype="<u4", buffer=self._shm.buf)
+            header[:] = (RING_MAGIC, fixtures, capacity)
+            self._owner = True
+        else:
+            self._shm = shared_memory.SharedMemory(name=name)
+            header = np.ndarray(3, dtype="<u4", buffer=self._shm.buf)
+            if header[0] != RING_MAGIC:
+                raise ValueError(f"{name} is not a result ring")
+            fixtures, capacity = int(header[1]), int(header[2])
+            self._owner = False
+
+        self.name = self._shm.name
+        self.fixtures = fixtures
+        self.capacity = capacity
+
+        ring_size = COUNTER_SIZE + capacity * RECORD_DTYPE.itemsize
+        self._counters = []
+        self._records = []
+        for fixture in range(fixtures):
+            offset = HEADER_SIZE + fixture * ring_size
+            self._counters.append(np.ndarray(1, dtype="<u8", buffer=self._shm.buf, offset=offset))
+            self._records.append(np.ndarray(capacity, dtype=RECORD_DTYPE, buffer=self._shm.buf,
+                                            offset=offset + COUNTER_SIZE))
+
+    def write(self, fixture, mac, test_code, result_code, duration, passed, timestamp=None,
+              cause=None, measurements=None):
+        """
+        Append one result to a fixture's ring (only that fixture's worker may call this)
+
+        Args:
+            fixture (int): Fixture ring index
+            mac (str): MAC address (last 2 bytes, HEX; None stores 0)
+            test_code (int): Test command code (test_engine.TEST_COMMANDS)
+            result_code (int): Device result code (None = no response)
+            duration (float): Test duration in seconds (None stores NaN)
+            passed (bool): Test result
+            timestamp (float): Epoch seconds (default: now)
+            cause (str): Failure cause of a result without a result code (UNCODED_CAUSES)
+            measurements (dict): Measurement name -> value (MEASUREMENT_NAMES)
+        """
+        counter = self._counters[fixture]
+        index = int(counter[0])
+        record = self._records[fixture][index % self.capacity]
+
+        record["time"] = time.time() if timestamp is None else timestamp
+        record["duration"] = np.nan if duration is None else duration
+        record["mac"] = int(mac, 16) if mac else 0
+        record["result_code"] = NO_RESULT_CODE if result_code is None else result_code
+        record["test"] = test_code
+        record["passed"] = passed
+        record["cause"] = UNCODED_CAUSES.index(cause) + 1 if result_code is None and cause in UNCODED_CAUSES else 0
+        record["measurements"] = [measurements.get(name, np.nan) for name in MEASUREMENT_NAMES] if measurements \
+            else np.nan
+
+        # Publish after the record is complete
+        counter[0] = index + 1
+
+    def written(self, fixture):
+        """
+        Records ever written to a fixture's ring
+
+        Args:
+            fixture (int): Fixture ring index
+
+        Returns:
+            int: Counter value (a reader cursor starts at 0 or at this value)
+        """
+        return int(self._counters[fixture][0])
+
+    def read(self, fixture, cursor):
+        """
+        Copy the records written since a cursor
+
+        Args:
+            fixture (int): Fixture ring index
+            cursor (int): Records already consumed
+
+        Returns:
+            tuple: (records (RECORD_DTYPE array), new cursor, lost record count)
+        """
+        end = int(self._counters[fixture][0])
+        start = max(cursor, end - self.capacity)
+        if start >= end:
+            return np.empty(0, dtype=RECORD_DTYPE), end, 0
+
+        ring = self._records[fixture]
+        first, last = start % self.capacity, end % self.capacity
+        if first < last:
+            records = ring[first:last].copy()
+        else:
+            records = np.concatenate((ring[first:], ring[:last]))
+
+        # Slots the writer reached during the copy may hold newer, partly written records
+        valid_from = int(self._counters[fixture][0]) - self.capacity + 1
+        skip = max(0, valid_from - start)
+        lost = start - cursor + min(skip, len(records))
+        return records[skip:], end, lost
+
+    def close(self):
+        """Detach from the block (the creator also removes it)"""
+        self._counters = []
+        self._records = []
+        self._shm.close()
+        if self._owner:
+            self._shm.unlink()
@@ -0,0 +1,384 @@
+"""
+Line-wide test result aggregation server
+
+Stations POST gzip-compressed JSON lines batches to /results; records are
+stored in an indexed SQLite database (WAL mode, one transaction per batch)
+/stats serves line-wide pass/fail analytics and /pareto failure Paretos.
+
+Usage:
+    python result_server.py --host 0.0.0.0 --port 8600 --db results.db
+"""
+import gzip
+import json
+import time
+import sqlite3
+import argparse
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+
+# Stored result fields and their SQLite column types
+RESULT_FIELDS = {
+    "station": "TEXT",
+    "time": "TEXT",
+    "test": "TEXT",
+    "result": "TEXT",
+    "product": "TEXT",
+    "mac": "TEXT",
+    "fixture": "TEXT",
+    "light_circuits": "INTEGER",
+    "outlet_circuits": "INTEGER",
+    "dimming_type": "INTEGER",
+    "failure_code": "INTEGER",
+    "failure_cause": "TEXT",
+    "duration": "REAL",
+    "voltage": "REAL",
+    "outlet1_current": "REAL",
+    "outlet2_current": "REAL",
+    "power": "REAL",
+    # Unique per uploaded record, so a resent batch is not stored twice (NULL for imports)
+    "record_id": "TEXT",
+}
+
+# Page cache used during bulk imports (KiB)
+IMPORT_CACHE_KIB = 256 * 1024
+
+# Columns a failure Pareto can group by
+PARETO_COLUMNS = ("test", "failure_code", "failure_cause", "product", "fixture", "station")
+
+class ResultStore:
+    """
+    Indexed SQLite store for test results from all stations
+    """
+
+    def __init__(self, path="results.db"):
+        """
+        Open (or create) the store
+
+        Args:
+            path (str): SQLite database path (":memory:" for a throwaway store)
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._ensure_schema()
+
+    def _ensure_schema(self):
+        columns = ", ".join(f"{name} {sql_type}" for name, sql_type in RESULT_FIELDS.items())
+        self._conn.execute(f"CREATE TABLE IF NOT EXISTS results (id INTEGER PRIMARY KEY, {columns}, received_at REAL)")
+
+        # Add columns introduced after the database was created
+        existing = {row[1] for row in self._conn.execute("PRAGMA table_info(results)")}
+        for name, sql_type in RESULT_FIELDS.items():
+            if name not in existing:
+                self._conn.execute(f"ALTER TABLE results ADD COLUMN {name} {sql_type}")
+
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_results_time ON results (time)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_results_station_time ON results (station, time)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_results_test_result ON results (test, result)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_results_mac ON results (mac)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_results_dedupe ON results (time, test, mac)")
+        self._conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_results_record_id ON results (record_id)")
+        # Partial index: Pareto queries only ever look at failures
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_results_failures ON results "
+            "(test, failure_code, product, fixture) WHERE result = '실패'"
+        )
+        self._conn.commit()
+
+    def insert_many(self, records):
+        """
+        Store a batch of result records in one transaction
+
+        Records whose record_id is already stored (a batch resent after a lost
+        response) are skipped.
+
+        Args:
+            records (list): Result dictionaries (keys from RESULT_FIELDS; missing keys are NULL)
+
+        Returns:
+            int: Number of newly stored records
+        """
+        fields = list(RESULT_FIELDS)
+        received_at = time.time()
+        rows = [tuple(record.get(field) for field in fields) + (received_at,) for record in records]
+
+        with self._lock:
+            cursor = self._conn.executemany(
+                f"INSERT OR IGNORE INTO results ({', '.join(fields)}, received_at) "
+                f"VALUES ({', '.join('?' * (len(fields) + 1))})",
+                rows
+            )
+            self._conn.commit()
+
+        return cursor.rowcount
+
+    def bulk_import(self, frames):
+        """
+        Import result batches, skipping records already stored
+
+        Rows are staged in a temporary table, then copied in one statement that
+        keeps the first row per (time, test, mac), skips keys already in the
+        store and inserts in key order so index updates stay mostly sequential.
+        The store is locked for the whole import.
+
+        Args:
+            frames (iterable): DataFrames whose columns are RESULT_FIELDS names
+
+        Returns:
+            dict: {"rows": staged rows, "inserted": new rows, "duplicates": skipped rows}
+        """
+        fields = list(RESULT_FIELDS)
+        columns = ", ".join(fields)
+        staged = 0
+
+        with self._lock:
+            # A large page cache keeps the index B-trees in memory while they grow
+            cache_size = self._conn.execute("PRAGMA cache_size").fetchone()[0]
+            self._conn.execute(f"PRAGMA cache_size = {-IMPORT_CACHE_KIB}")
+            try:
+                self._conn.execute(f"CREATE TEMP TABLE IF NOT EXISTS import_staging ({columns})")
+                self._conn.execute("DELETE FROM import_staging")
+
+                for frame in frames:
+                    # Bind only the columns the batch has (parameter binding dominates the import time);
+                    # column-wise conversion to Python values (NaN -> NULL) is far cheaper than per row
+                    present = [field for field in fields if field in frame]
+                    values = [frame[field].astype(object).where(frame[field].notna(), None).tolist() for field in present]
+                    self._conn.executemany(
+                        f"INSERT INTO import_staging ({', '.join(present)}) VALUES ({', '.join('?' * len(present))})",
+                        zip(*values)
+                    )
+                    staged += len(frame)
+
+                self._conn.execute("CREATE INDEX IF NOT EXISTS temp.idx_import_staging ON import_staging (time, test, mac)")
+                cursor = self._conn.execute(
+                    f"INSERT INTO results ({columns}, received_at) "
+                    f"SELECT {columns}, ? FROM import_staging AS s "
+                    f"WHERE NOT EXISTS (SELECT 1 FROM import_staging AS d "
+                    f"WHERE d.time = s.time AND d.test = s.test AND d.mac IS s.mac AND d.rowid < s.rowid) "
+                    f"AND NOT EXISTS (SELECT 1 FROM results AS r WHERE r.time = s.time AND r.test = s.test AND r.mac IS s.mac) "
+                    f"ORDER BY s.time, s.test, s.mac",
+                    (time.time(),)
+                )
+                inserted = cursor.rowcount
+                self._conn.commit()
+            except BaseException:
+                self._conn.rollback()
+                raise
+            finally:
+                # A failed import leaves neither rows, staging table nor the large cache behind
+                self._conn.execute("DROP TABLE IF EXISTS import_staging")
+                self._conn.execute(f"PRAGMA cache_size = {cache_size}")
+
+        return {"rows": staged, "inserted": inserted, "duplicates": staged - inserted}
+
+    def query(self, sql, params=()):
+        """
+        Run a read-only query
+
+        Args:
+            sql (str): SELECT statement
+            params (tuple): Query parameters
+
+        Returns:
+            list: Rows as dictionaries
+        """
+        with self._lock:
+            cursor = self._conn.execute(sql, params)
+            names = [description[0] for description in cursor.description]
+            return [dict(zip(names, row)) for row in cursor.fetchall()]
+
+    def _time_filter(self, since, until):
+        conditions = []
+        params = []
+        if since:
+            conditions.append("time >= ?")
+            params.append(since)
+        if until:
+            conditions.append("time < ?")
+            params.append(until)
+        return conditions, params
+
+    def stats(self, since=None, until=None):
+        """
+        Line-wide pass/fail statistics
+
+        Args:
+            since (str): Optional start time ("YYYY-MM-DD" or "YYYY-MM-DD HH:MM:SS")
+            until (str): Optional end time (exclusive)
+
+        Returns:
+            dict: Totals plus breakdowns by station, test and product
+        """
+        conditions, params = self._time_filter(since, until)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+
+        def grouped(column):
+            return self.query(
+                f"SELECT {column} AS name, SUM(result = '통과') AS passed, SUM(result = '실패') AS failed, "
+                f"COUNT(*) AS total FROM results {where} GROUP BY {column} ORDER BY {column}",
+                tuple(params)
+            )
+
+        totals = self.query(
+            f"SELECT SUM(result = '통과') AS passed, SUM(result = '실패') AS failed, COUNT(*) AS total, "
+            f"COUNT(DISTINCT mac) AS units FROM results {where}",
+            tuple(params)
+        )[0]
+
+        return {
+            "totals": totals,
+            "by_station": grouped("station"),
+            "by_test": grouped("test"),
+            "by_product": grouped("product"),
+        }
+
+    def pareto(self, by=("test", "failure_code"), since=None, until=None, top=20):
+        """
+        Failure Pareto over the chosen columns
+
+        Args:
+            by (tuple): Columns to group by (test, failure_code, failure_cause, product, fixture, station)
+            since (str): Optional start time
+            until (str): Optional end time (exclusive)
+            top (int): Number of groups to return
+
+        Returns:
+            list: Groups with count and share (%) of all failures, largest first
+        """
+        columns = [column for column in by if column in PARETO_COLUMNS]
+        if not columns:
+            raise ValueError(f"unsupported Pareto columns: {', '.join(by)}")
+
+        conditions, params = self._time_filter(since, until)
+        where = " AND ".join(["result = '실패'"] + conditions)
+        column_list = ", ".join(columns)
+
+        rows = self.query(
+            f"SELECT {column_list}, COUNT(*) AS count FROM results WHERE {where} "
+            f"GROUP BY {column_list} ORDER BY count DESC LIMIT ?",
+            tuple(params) + (top,)
+        )
+        total = self.query(f"SELECT COUNT(*) AS total FROM results WHERE {where}", tuple(params))[0]["total"]
+
+        for row in rows:
+            row["share"] = row["count"] / total * 100 if total else 0.0
+        return rows
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+class ResultRequestHandler(BaseHTTPRequestHandler):
+    """HTTP handler for /results (POST), /stats, /pareto and /health (GET)"""
+
+    # Set by make_server
+    store = None
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        if urlparse(self.path).path != "/results":
+            self._send_json(404, {"error": "not found"})
+            return
+
+        try:
+            body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            if self.headers.get("Content-Encoding") == "gzip":
+                body = gzip.decompress(body)
+            records = [json.loads(line) for line in body.decode("utf-8").splitlines() if line.strip()]
+        except (ValueError, OSError) as e:
+            self._send_json(400, {"error": str(e)})
+            return
+
+        if not all(isinstance(record, dict) for record in records):
+            self._send_json(400, {"error": "every line must be a JSON object"})
+            return
+
+        self._send_json(200, {"stored": self.store.insert_many(records)})
+
+    def do_GET(self):
+        url = urlparse(self.path)
+
+        if url.path == "/health":
+            self._send_json(200, {"status": "ok"})
+        elif url.path == "/stats":
+            params = parse_qs(url.query)
+            self._send_json(200, self.store.stats(
+                since=params.get("since", [None])[0],
+                until=params.get("until", [None])[0]
+            ))
+        elif url.path == "/pareto":
+            params = parse_qs(url.query)
+            try:
+                rows = self.store.pareto(
+                    by=tuple(params.get("by", ["test,failure_code"])[0].split(",")),
+                    since=params.get("since", [None])[0],
+                    until=params.get("until", [None])[0],
+                    top=int(params.get("top", [20])[0])
+                )
+            except ValueError as e:
+                self._send_json(400, {"error": str(e)})
+                return
+            self._send_json(200, {"pareto": rows})
+        else:
+            self._send_json(404, {"error": "not found"})
+
+    def log_message(self, format, *args):
+        # Per-request logging would dominate at thousands of batches per second
+        pass
+
+def make_server(host="127.0.0.1", port=8600, db_path="results.db"):
+    """
+    Create the aggregation server (not yet serving)
+
+    Args:
+        host (str): Bind address
+        port (int): Port (0 picks a free port)
+        db_path (str): SQLite database path
+
+    Returns:
+        ThreadingHTTPServer: Server with its ResultStore as the store attribute
+    """
+    store = ResultStore(db_path)
+    handler = type("BoundResultRequestHandler", (ResultRequestHandler,), {"store": store})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.store = store
+    return server
+
+def start_server_thread(host="127.0.0.1", port=0, db_path=":memory:"):
+    """
+    Run a local aggregation server on a background thread (e.g. for tests)
+
+    Returns:
+        tuple: (server, base URL)
+    """
+    server = make_server(host, port, db_path)
+    threading.Thread(target=server.serve_forever, name="result-server", daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}"
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="검사 결과 집계 서버")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8600)
+    parser.add_argument("--db", default="results.db")
+    args = parser.parse_args()
+
+    server = make_server(args.host, args.port, args.db)
+    print(f"Serving on http://{args.host}:{server.server_address[1]} (db: {args.db})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        server.store.close()
@@ -0,0 +1,177 @@
+import os
+import gzip
+import json
+import time
+import uuid
+import threading
+import urllib.error
+import urllib.request
+
+# Directory for batches that could not be delivered yet
+SPOOL_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "upload_spool")
+
+class ResultUploader:
+    """
+    Station-side uploader that pushes result records to the aggregation server
+
+    Records are batched in memory and sent as gzip-compressed JSON lines from a
+    background thread. Batches that cannot be delivered are written to an
+    on-disk spool and retried (oldest first) before new batches are sent, so
+    results survive network outages and station restarts. A batch the server
+    refuses (4xx) would fail the same way on every retry, so it is moved to
+    spool_dir/rejected instead. Every record carries a unique record_id, so a
+    batch resent after a lost response is stored once.
+    """
+
+    def __init__(self, server_url, station_id, spool_dir=SPOOL_DIR,
+                 batch_size=500, flush_interval=2.0, retry_interval=10.0, timeout=5.0):
+        """
+        Initialize the uploader and start its background thread
+
+        Args:
+            server_url (str): Base URL of the aggregation server (e.g. http://10.0.0.5:8600)
+            station_id (str): Station name stored with every record
+            spool_dir (str): Directory for undelivered batches
+            batch_size (int): Records per upload
+            flush_interval (float): Maximum seconds a record waits before upload
+            retry_interval (float): Seconds between retries while the server is unreachable
+            timeout (float): HTTP timeout in seconds
+        """
+        self.server_url = server_url.rstrip("/")
+        self.station_id = station_id
+        self.spool_dir = spool_dir
+        self.rejected_dir = os.path.join(spool_dir, "rejected")
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.retry_interval = retry_interval
+        self.timeout = timeout
+
+        self.uploaded = 0
+        self.last_error = None
+
+        self._pending = []
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stop_event = threading.Event()
+        self._next_retry = 0.0
+
+        os.makedirs(spool_dir, exist_ok=True)
+        self._thread = threading.Thread(target=self._run, name="result-uploader", daemon=True)
+        self._thread.start()
+
+    def enqueue(self, record):
+        """
+        Queue one result record for upload
+
+        Args:
+            record (dict): Result fields (see result_server.RESULT_FIELDS)
+        """
+        record = dict(record, station=self.station_id, record_id=uuid.uuid4().hex)
+        with self._lock:
+            self._pending.append(record)
+            if len(self._pending) >= self.batch_size:
+                self._wakeup.set()
+
+    @property
+    def spooled_batches(self):
+        """Number of batches waiting in the offline spool"""
+        return len([name for name in os.listdir(self.spool_dir) if name.endswith(".jsonl.gz")])
+
+    def _post(self, payload):
+        request = urllib.request.Request(
+            f"{self.server_url}/results",
+            data=payload,
+            headers={"Content-Type": "application/x-ndjson", "Content-Encoding": "gzip"},
+            method="POST"
+        )
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            return json.loads(response.read())["stored"]
+
+    def _reject(self, payload, error):
+        """Set aside a batch the server refused, so it does not block the batches behind it"""
+        self.last_error = f"서버가 배치를 거부함: {error}"
+        os.makedirs(self.rejected_dir, exist_ok=True)
+        with open(os.path.join(self.rejected_dir, f"{time.time_ns()}.jsonl.gz"), "wb") as f:
+            f.write(payload)
+
+    def _spool(self, payload):
+        path = os.path.join(self.spool_dir, f"{time.time_ns()}.jsonl.gz")
+        with open(path + ".tmp", "wb") as f:
+            f.write(payload)
+        os.replace(path + ".tmp", path)
+
+    def _drain_spool(self):
+        """Send spooled batches oldest first; return False if the server is unreachable"""
+        for name in sorted(name for name in os.listdir(self.spool_dir) if name.endswith(".jsonl.gz")):
+            path = os.path.join(self.spool_dir, name)
+            with open(path, "rb") as f:
+                payload = f.read()
+
+            try:
+                self.uploaded += self._post(payload)
+            except urllib.error.HTTPError as e:
+                if not 400 <= e.code < 500:
+                    self.last_error = str(e)
+                    return False
+                self._reject(payload, e)
+            except Exception as e:
+                self.last_error = str(e)
+                return False
+
+            os.remove(path)
+
+        return True
+
+    def _flush(self):
+        with self._lock:
+            batch, self._pending = self._pending[:self.batch_size], self._pending[self.batch_size:]
+
+        if batch:
+            payload = gzip.compress(
+                "\n".join(json.dumps(record, ensure_ascii=False) for record in batch).encode("utf-8"),
+                compresslevel=5
+            )
+            # Keep delivery order: new batches go behind anything already spooled
+            if time.monotonic() < self._next_retry or not self._drain_spool():
+                self._spool(payload)
+                self._next_retry = max(self._next_retry, time.monotonic() + self.retry_interval)
+            else:
+                try:
+                    self.uploaded += self._post(payload)
+                    self.last_error = None
+                except urllib.error.HTTPError as e:
+                    if 400 <= e.code < 500:
+                        self._reject(payload, e)
+                    else:
+                        self.last_error = str(e)
+                        self._spool(payload)
+                        self._next_retry = time.monotonic() + self.retry_interval
+                except Exception as e:
+                    self.last_error = str(e)
+                    self._spool(payload)
+                    self._next_retry = time.monotonic() + self.retry_interval
+        elif time.monotonic() >= self._next_retry and self.spooled_batches:
+            if not self._drain_spool():
+                self._next_retry = time.monotonic() + self.retry_interval
+
+        with self._lock:
+            return len(self._pending) > 0
+
+    def _run(self):
+        while not self._stop_event.is_set():
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            while self._flush():
+                pass
+
+    def close(self):
+        """Stop the background thread after a final flush (undelivered batches stay spooled)"""
+        self._stop_event.set()
+        self._wakeup.set()
+        self._thread.join(timeout=self.timeout * 2)
+
+        # A thread still busy with an upload would send the same spool files again
+        if self._thread.is_alive():
+            return
+        while self._flush():
+            pass
@@ -0,0 +1,209 @@
+import os
+import sys
+import time
+import threading
+from collections import Counter
+
+# Saved sampling profiles (folded stacks, one "frame;frame;frame count" line per distinct stack),
+# kept apart from the configuration profiles in config_profiles.PROFILE_DIR
+PROFILE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "diagnostics")
+
+class SamplingProfiler:
+    """
+    Low-overhead statistical profiler for one thread
+
+    A background thread looks at the target thread's current stack every
+    interval (sys._current_frames) and counts identical stacks, so the
+    profiled code runs unmodified and the cost is independent of how many
+    calls it makes. Sampling can be paused and resumed; samples accumulate
+    until reset().
+    """
+
+    def __init__(self, interval=0.005, max_depth=128):
+        """
+        Create an idle profiler
+
+        Args:
+            interval (float): Seconds between samples
+            max_depth (int): Innermost frames kept per sample
+        """
+        self.interval = interval
+        self.max_depth = max_depth
+        self.sampled_time = 0.0
+
+        # Guards _stacks: the sampler thread updates it while callers read it
+        self._lock = threading.Lock()
+        self._stacks = Counter()
+        self._labels = {}
+        self._target = None
+        self._started_at = None
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    @property
+    def samples(self):
+        """Number of samples taken"""
+        with self._lock:
+            return sum(self._stacks.values())
+
+    @property
+    def running(self):
+        """Whether the profiler is currently sampling"""
+        return self._thread is not None
+
+    def start(self, thread_id=None):
+        """
+        Start (or retarget) sampling
+
+        Args:
+            thread_id (int): Thread to sample (default: the calling thread)
+        """
+        self._target = thread_id if thread_id is not None else threading.get_ident()
+        if self._thread is not None:
+            return
+
+        self._started_at = time.monotonic()
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Pause sampling (samples are kept)"""
+        if self._thread is None:
+            return
+        self._stop_event.set()
+        self._thread.join()
+        self._thread = None
+        self.sampled_time += time.monotonic() - self._started_at
+
+    def reset(self):
+        """Drop all samples"""
+        with self._lock:
+            self._stacks.clear()
+        self.sampled_time = 0.0
+
+    def _run(self):
+        while not self._stop_event.wait(self.interval):
+            frame = sys._current_frames().get(self._target)
+            if frame is None:
+                continue
+
+            stack = []
+            while frame is not None and len(stack) < self.max_depth:
+                stack.append(frame.f_code)
+                frame = frame.f_back
+            # Outermost frame first
+            stack = tuple(reversed(stack))
+            with self._lock:
+                self._stacks[stack] += 1
+
+    def _label(self, code):
+        label = self._labels.get(code)
+        if label is None:
+            label = f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+            self._labels[code] = label
+        return label
+
+    def stacks(self):
+        """
+        Sampled stacks with readable frame labels
+
+        Returns:
+            list: (tuple of "function (file:line)" labels outermost first, samples)
+        """
+        with self._lock:
+            sampled = list(self._stacks.items())
+        return [(tuple(self._label(code) for code in stack), count) for stack, count in sampled]
+
+    def top_functions(self, limit=20):
+        """
+        Functions ranked by the samples in which they were running
+
+        Args:
+            limit (int): Rows to return
+
+        Returns:
+            list: {"function", "self", "total", "self_share", "total_share"} dicts sorted by
+                  self samples (the function was running), then total samples (the
+                  function was anywhere on the stack); shares in %
+        """
+        own = Counter()
+        total = Counter()
+        stacks = self.stacks()
+        for stack, count in stacks:
+            if stack:
+                own[stack[-1]] += count
+            for label in set(stack):
+                total[label] += count
+
+        # Shares are taken from the same snapshot, not the live counter
+        samples = sum(count for _, count in stacks) or 1
+        return [
+            {"function": label, "self": own[label], "total": count,
+             "self_share": own[label] / samples * 100, "total_share": count / samples * 100}
+            for label, count in sorted(total.items(), key=lambda item: (own[item[0]], item[1]), reverse=True)[:limit]
+        ]
+
+    def flame(self, min_share=0.5):
+        """
+        Flame graph rectangles (icicle layout: depth 0 is the outermost frame)
+
+        Args:
+            min_share (float): Leave out frames below this share of all samples (%)
+
+        Returns:
+            list: {"function", "depth", "start", "end", "samples"} with start/end as
+                  shares of all samples (0-100)
+        """
+        stacks = self.stacks()
+
+        # Frames every sample shares (thread bootstrap, framework entry) are left out,
+        # except the innermost of them
+        shared = 0
+        if stacks:
+            shortest = min(len(stack) for stack, _ in stacks)
+            while shared < shortest - 1 and len({stack[shared + 1] for stack, _ in stacks}) == 1:
+                shared += 1
+
+        # Merge stacks into a call tree: label -> [samples, children]
+        root = [0, {}]
+        for stack, count in ((stack[shared:], count) for stack, count in stacks):
+            root[0] += count
+            node = root
+            for label in stack:
+                node = node[1].setdefault(label, [0, {}])
+                node[0] += count
+
+        samples = root[0] or 1
+        rects = []
+
+        def place(children, depth, start):
+            for label, (count, grandchildren) in sorted(children.items()):
+                width = count / samples * 100
+                if width >= min_share:
+                    rects.append({"function": label, "depth": depth, "start": start,
+                                  "end": start + width, "samples": count})
+                    place(grandchildren, depth + 1, start)
+                start += width
+
+        place(root[1], 0, 0.0)
+        return rects
+
+    def save(self, path=None):
+        """
+        Write the samples as folded stacks (flamegraph.pl / speedscope format)
+
+        Args:
+            path (str): Output file (default: PROFILE_DIR/<timestamp>.folded)
+
+        Returns:
+            str: Path written
+        """
+        if path is None:
+            os.makedirs(PROFILE_DIR, exist_ok=True)
+            path = os.path.join(PROFILE_DIR, f"{time.strftime('%Y%m%d_%H%M%S')}.folded")
+
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, count in sorted(self.stacks()):
+                f.write(f"{';'.join(stack)} {count}\n")
+        return path
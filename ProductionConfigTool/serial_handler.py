@@ -1,19 +1,54 @@
 import serial
 import time
-import streamlit as st
+from packet_builder import PacketBuilder
+from wire_capture import DIRECTION_TX, DIRECTION_RX
+
+# Command code for reading the stored configuration back from the device
+READ_CONFIG_COMMAND = 0x02
+
+# Size of the reusable transmit/receive buffers (grown on demand)
+FRAME_BUFFER_SIZE = 64
+
+# Rate every board boots at
+DEFAULT_BAUDRATE = 115200
+
+# Link speed change: 4-byte little-endian baud rate. The device acknowledges at
+# the current rate (result code 0 = supported) and then switches; it returns to
+# DEFAULT_BAUDRATE if no valid frame arrives at the new rate within
+# LINK_FALLBACK_TIMEOUT seconds.
+SET_BAUDRATE_COMMAND = 0x03
+LINK_FALLBACK_TIMEOUT = 1.0
+
+# Rates tried by negotiate_baudrate, fastest first
+HIGH_SPEED_BAUDRATES = (921600, 460800, 230400)
+
+# Seconds to wait for answers while probing a link speed
+LINK_PROBE_TIMEOUT = 0.2
+
+# Seconds to wait for the status reply when polling for a seated board
+PRESENCE_PROBE_TIMEOUT = 0.2
+
+# Modem status lines a fixture's board-seated switch can be wired to
+PRESENCE_LINES = ("dsr", "cts", "cd")
+
+# Consecutive empty checks before a board counts as removed
+REMOVAL_CONFIRMATIONS = 2
+
+class ResponseTimeout(Exception):
+    """Raised by read_response when the device did not send a whole frame in time"""
 
 class SerialHandler:
     """
     Handler for serial communication with production line devices
     """
     
-    def __init__(self, port, baudrate=115200, timeout=1):
+    def __init__(self, port, baudrate=DEFAULT_BAUDRATE, timeout=1):
         """
         Initialize the serial connection
         
         Args:
             port (str): COM port to connect to
-            baudrate (int): Baud rate (default 115200)
+            baudrate (int): Baud rate the board boots at (default 115200)
             timeout (int): Read timeout in seconds
         """
         try:
@@ -31,6 +66,83 @@ class SerialHandler:
             
         except Exception as e:
             raise Exception(f"Serial port connection failed: {str(e)}")
+        
+        self._init_io_state()
+    
+    @classmethod
+    def from_serial(cls, serial_port):
+        """
+        Wrap an already opened port object (e.g. a DeviceEmulator or replay port)
+        
+        Args:
+            serial_port: Object implementing the serial.Serial methods used here
+            
+        Returns:
+            SerialHandler: Handler using the given port
+        """
+        handler = cls.__new__(cls)
+        handler.serial = serial_port
+        handler._init_io_state()
+        return handler
+    
+    def _init_io_state(self):
+        """Allocate the reusable frame buffers once per connection"""
+        self.capture = None
+        self._capture_port = 0
+        
+        # Rate boards boot at, and the faster rate agreed by negotiate_baudrate (None = not negotiated)
+        self.base_baudrate = getattr(self.serial, "baudrate", DEFAULT_BAUDRATE)
+        self.link_baudrate = None
+        
+        # Modem status line that reports a seated board (None = poll with status commands)
+        self.presence_line = None
+        
+        self._tx_buffer = bytearray(FRAME_BUFFER_SIZE)
+        self._rx_buffer = bytearray(FRAME_BUFFER_SIZE)
+        
+        # Views over the buffers per frame length, created once and reused
+        self._tx_frames = {}
+        self._rx_frames = {}
+    
+    def attach_capture(self, capture, port_name=None):
+        """
+        Record every transmitted and received frame to a wire capture
+        
+        Args:
+            capture (WireCapture): Capture to write to (None detaches)
+            port_name (str): Port name stored in the capture (default: serial port name)
+        """
+        if capture is not None:
+            if port_name is None:
+                port_name = getattr(self.serial, "port", None) or "port"
+            self._capture_port = capture.register_port(port_name)
+        self.capture = capture
+    
+    def _frame_view(self, direction, length):
+        """
+        Return the cached view of the first length bytes of a frame buffer
+        
+        Args:
+            direction (str): "tx" or "rx"
+            length (int): Frame length
+            
+        Returns:
+            memoryview: View over the reusable buffer
+        """
+        frames = self._tx_frames if direction == "tx" else self._rx_frames
+        view = frames.get(length)
+        
+        if view is None:
+            if length > FRAME_BUFFER_SIZE:
+                # Oversized frames get their own buffer (rare; kept for reuse)
+                view = memoryview(bytearray(length))
+            elif direction == "tx":
+                view = memoryview(self._tx_buffer)[:length]
+            else:
+                view = memoryview(self._rx_buffer)[:length]
+            frames[length] = view
+        
+        return view
     
     def send_packet(self, data):
         """
@@ -47,39 +159,61 @@ class SerialHandler:
         
         try:
             bytes_written = self.serial.write(data)
+            if self.capture is not None:
+                self.capture.record(self._capture_port, DIRECTION_TX, data)
             return bytes_written == len(data)
         except Exception as e:
             raise Exception(f"Failed to send data: {str(e)}")
     
-    def read_response(self, expected_bytes=40, timeout=5):
+    def read_response(self, expected_bytes=40, timeout=5, copy=True):
         """
         Read a response from the serial connection
         
+        The bytes are read straight into a preallocated buffer that is reused
+        for every frame.
+        
         Args:
             expected_bytes (int): Number of bytes to read
             timeout (int): Timeout in seconds
+            copy (bool): Return an independent bytes copy. If False, a memoryview
+                         over the internal buffer is returned, which is only
+                         valid until the next read on this handler.
             
         Returns:
-            bytes: Received data
+            bytes or memoryview: Received data
         """
         if not self.serial.is_open:
             raise Exception("Serial port is not open")
         
-        start_time = time.time()
-        buffer = bytearray()
+        view = self._frame_view("rx", expected_bytes)
+        received = 0
+        deadline = time.monotonic() + timeout
         
         # Wait until we receive the expected number of bytes or timeout
-        while (len(buffer) < expected_bytes) and (time.time() - start_time < timeout):
-            if self.serial.in_waiting > 0:
-                buffer += self.serial.read(self.serial.in_waiting)
-            time.sleep(0.01)
+        while received < expected_bytes:
+            waiting = self.serial.in_waiting
+            if received == 0 and waiting >= expected_bytes:
+                # Whole frame already buffered: read it in one call
+                received = self.serial.readinto(view)
+            elif waiting > 0:
+                end = min(expected_bytes, received + waiting)
+                received += self.serial.readinto(view[received:end])
+            elif time.monotonic() >= deadline:
+                break
+            else:
+                time.sleep(0.002)
         
-        if len(buffer) < expected_bytes:
-            raise Exception(f"Timeout waiting for response. Received {len(buffer)}/{expected_bytes} bytes")
+        if self.capture is not None and received > 0:
+            self.capture.record(self._capture_port, DIRECTION_RX, view[:received])
         
-        return bytes(buffer)
+        if received < expected_bytes:
+            raise ResponseTimeout(f"Timeout waiting for response. Received {received}/{expected_bytes} bytes")
+        
+        if copy:
+            return bytes(view)
+        return view
     
-    def send_command(self, command_code, data=None, wait_for_response=True):
+    def send_command(self, command_code, data=None, wait_for_response=True, copy=True):
         """
         Send a command and wait for response
         
@@ -87,42 +221,45 @@ class SerialHandler:
             command_code (int): Command code
             data (bytes): Optional data to send with command
             wait_for_response (bool): Whether to wait for a response
+            copy (bool): Passed to read_response (False returns a reusable view)
             
         Returns:
             bytes: Response data if wait_for_response is True, else None
         """
-        # Create command packet
-        packet = bytearray([0xDA, command_code])  # STX and command code
+        data_length = len(data) if data else 0
+        packet = self._frame_view("tx", data_length + 4)
         
+        # Create command packet in place: STX, command code, data length, data, ETX
+        packet[0] = 0xDA
+        packet[1] = command_code
+        packet[2] = data_length
         if data:
-            packet.extend(data)
-        
-        # Add packet length
-        data_length = len(packet) - 2  # Subtract STX and command code
-        packet.insert(2, data_length)
-        
-        # Add ETX
-        packet.append(0x25)
+            packet[3:3 + data_length] = data
+        packet[3 + data_length] = 0x25
         
         # Send the packet
         self.send_packet(packet)
         
         # Wait for response if required
         if wait_for_response:
-            return self.read_response()
+            return self.read_response(copy=copy)
         
         return None
     
-    def check_device_status(self):
+    def check_device_status(self, timeout=5):
         """
         Check if the device is responsive
         
+        Args:
+            timeout (float): Seconds to wait for the status response
+        
         Returns:
             bool: True if device is responsive, False otherwise
         """
         try:
             # Send a simple status check command
-            response = self.send_command(0x01)  # Assuming 0x01 is status check command
+            self.send_command(0x01, wait_for_response=False)  # Assuming 0x01 is status check command
+            response = self.read_response(timeout=timeout, copy=False)
             
             # Verify the response has correct format
             if response and len(response) >= 3:
@@ -133,6 +270,207 @@ class SerialHandler:
         except Exception:
             return False
     
+    def consume_acknowledgement(self, timeout=1):
+        """
+        Read the acknowledgement of a configuration packet sent without verification
+        
+        The device answers every configuration packet; left unread, that frame
+        would be taken as the reply to the next command.
+        
+        Args:
+            timeout (float): Seconds to wait for the acknowledgement
+            
+        Returns:
+            int: Result code of the acknowledgement (None if none arrived)
+        """
+        try:
+            response = self.read_response(timeout=timeout, copy=False)
+        except Exception:
+            return None
+        return response[2]
+    
+    def send_packet_verified(self, packet, mode="ack", retries=2, timeout=1):
+        """
+        Send a configuration packet and verify that the device stored it
+        
+        Args:
+            packet (bytes): 40-byte configuration packet
+            mode (str): "ack" to wait for an acknowledgement frame whose result
+                        code (3rd byte) is 0, or "readback" to read the stored
+                        configuration back and compare it field by field
+            retries (int): Number of immediate resends after a failed verification
+            timeout (float): Seconds to wait for the ack or readback frame
+            
+        Returns:
+            dict: {"verified": bool, "attempts": int, "error": str or None,
+                   "mismatches": list of (field, expected, actual) tuples}
+        """
+        if mode not in ("ack", "readback"):
+            raise ValueError(f"Unknown verification mode: {mode}")
+        
+        outcome = {"verified": False, "attempts": 0, "error": None, "mismatches": []}
+        
+        for attempt in range(retries + 1):
+            outcome["attempts"] = attempt + 1
+            outcome["mismatches"] = []
+            
+            try:
+                # Drop stale bytes so an old frame is not taken as the reply
+                self.serial.reset_input_buffer()
+                
+                if not self.send_packet(packet):
+                    outcome["error"] = "Packet was only partially written"
+                    continue
+                
+                if mode == "ack":
+                    response = self.read_response(timeout=timeout, copy=False)
+                    if response[0] != 0xDA or response[-1] != 0x25:
+                        outcome["error"] = "Invalid acknowledgement frame"
+                    elif response[2] != 0:
+                        outcome["error"] = f"Device rejected configuration (code {response[2]})"
+                    else:
+                        outcome["verified"] = True
+                        outcome["error"] = None
+                        return outcome
+                else:
+                    self.serial.reset_input_buffer()
+                    self.send_command(READ_CONFIG_COMMAND, wait_for_response=False)
+                    readback = self.read_response(timeout=timeout, copy=False)
+                    outcome["mismatches"] = PacketBuilder.compare_packets(packet, readback)
+                    if outcome["mismatches"]:
+                        outcome["error"] = f"{len(outcome['mismatches'])} field(s) differ after readback"
+                    else:
+                        outcome["verified"] = True
+                        outcome["error"] = None
+                        return outcome
+            
+            except Exception as e:
+                outcome["error"] = str(e)
+        
+        return outcome
+    
+    def _set_port_baudrate(self, baudrate):
+        """Reconfigure the host side of the link once pending output has been sent"""
+        flush = getattr(self.serial, "flush", None)
+        if flush:
+            flush()
+        self.serial.baudrate = baudrate
+        self.serial.reset_input_buffer()
+    
+    def negotiate_baudrate(self, candidates=HIGH_SPEED_BAUDRATES):
+        """
+        Switch the link to the fastest rate that both sides support
+        
+        Each candidate faster than the current rate is requested with
+        SET_BAUDRATE_COMMAND and confirmed with a status check at the new rate.
+        If the confirmation fails, the host returns to the previous rate and
+        waits for the device to fall back (LINK_FALLBACK_TIMEOUT) before trying
+        the next candidate. Firmware without the command rejects or ignores it,
+        leaving the link unchanged.
+        
+        Args:
+            candidates (iterable): Baud rates to try, in order of preference
+            
+        Returns:
+            int: Baud rate in use afterwards
+        """
+        original = self.serial.baudrate
+        
+        for baudrate in candidates:
+            if baudrate <= original:
+                continue
+            
+            try:
+                self.serial.reset_input_buffer()
+                self.send_command(SET_BAUDRATE_COMMAND, baudrate.to_bytes(4, "little"), wait_for_response=False)
+                response = self.read_response(timeout=LINK_PROBE_TIMEOUT, copy=False)
+            except Exception:
+                continue
+            
+            if len(response) < 3 or response[0] != 0xDA or response[-1] != 0x25 or response[2] != 0:
+                continue
+            
+            try:
+                self._set_port_baudrate(baudrate)
+                if self.check_device_status(timeout=LINK_PROBE_TIMEOUT):
+                    self.link_baudrate = baudrate
+                    return baudrate
+            except Exception:
+                pass
+            
+            # Rate unusable on this link: go back and let the device time out to its previous rate
+            self._set_port_baudrate(original)
+            time.sleep(LINK_FALLBACK_TIMEOUT)
+            if not self.check_device_status(timeout=LINK_PROBE_TIMEOUT):
+                break
+        
+        return self.serial.baudrate
+    
+    def board_seated(self):
+        """
+        Cheap check for a board in the fixture
+        
+        Reads the presence line if one is set, otherwise sends one status
+        command with a short timeout, so it can be polled continuously.
+        
+        Returns:
+            bool: True if a board is seated
+        """
+        if self.presence_line is not None:
+            return bool(getattr(self.serial, self.presence_line))
+        return self.check_device_status(timeout=PRESENCE_PROBE_TIMEOUT)
+    
+    def _board_present(self):
+        """Status check that also brings a newly seated board up to the negotiated rate"""
+        if self.link_baudrate is None:
+            return self.check_device_status(timeout=PRESENCE_PROBE_TIMEOUT)
+        
+        # The board that was negotiated with (still) answers at the link rate
+        if self.serial.baudrate != self.link_baudrate:
+            self._set_port_baudrate(self.link_baudrate)
+        if self.check_device_status(timeout=LINK_PROBE_TIMEOUT):
+            return True
+        
+        # A replaced board boots at the base rate and is brought up to the link rate
+        self._set_port_baudrate(self.base_baudrate)
+        if self.check_device_status(timeout=LINK_PROBE_TIMEOUT):
+            self.negotiate_baudrate([self.link_baudrate])
+            return True
+        
+        return False
+    
+    def wait_for_device(self, present=True, timeout=60, poll_interval=0.2, cancel=None):
+        """
+        Wait until a board is seated (or removed)
+        
+        Args:
+            present (bool): True to wait for a board, False to wait for removal
+            timeout (float): Maximum time to wait in seconds (None = no limit)
+            poll_interval (float): Delay between status checks in seconds
+            cancel (callable): Polled between checks; returning True abandons the wait
+            
+        Returns:
+            bool: True if the requested state was reached, False on timeout or cancel
+        """
+        start_time = time.time()
+        absent_checks = 0
+        
+        while timeout is None or time.time() - start_time < timeout:
+            if cancel is not None and cancel():
+                return False
+            if present:
+                # A closed presence line only means seated; the board must also answer
+                if (self.presence_line is None or self.board_seated()) and self._board_present():
+                    return True
+            else:
+                # One missed status reply (or contact bounce) is not a removal
+                absent_checks = 0 if self.board_seated() else absent_checks + 1
+                if absent_checks >= REMOVAL_CONFIRMATIONS:
+                    return True
+            time.sleep(poll_interval)
+        
+        return False
+    
     def close(self):
         """Close the serial connection"""
         if hasattr(self, 'serial') and self.serial.is_open:
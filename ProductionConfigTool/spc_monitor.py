@@ -0,0 +1,271 @@
+import time
+import math
+import threading
+from collections import deque
+
+# Stream key used for the line-wide (all fixtures) statistics of a test
+LINE_WIDE = "__line__"
+
+# Smallest failure rate used for control limits (a perfect baseline would give zero-width limits)
+MIN_BASELINE_RATE = 0.002
+
+class ProportionStream:
+    """
+    Incremental SPC state for the failure proportion of one (test, fixture) stream
+
+    Holds running counts, the current p-chart subgroup, the EWMA statistic and
+    the Bernoulli CUSUM statistic; every update is O(1).
+    """
+
+    def __init__(self, test_name, fixture, max_points=200):
+        """
+        Initialize the stream
+
+        Args:
+            test_name (str): Test name
+            fixture (str): Fixture name (LINE_WIDE for the line-wide stream)
+            max_points (int): p-chart subgroup points kept for display
+        """
+        self.test_name = test_name
+        self.fixture = fixture
+        self.total = 0
+        self.failed = 0
+        self.subgroup_total = 0
+        self.subgroup_failed = 0
+        self.points = deque(maxlen=max_points)
+        self.ewma = None
+        self.cusum = 0.0
+        self.ewma_alarm = False
+
+    @property
+    def failure_rate(self):
+        return self.failed / self.total if self.total else 0.0
+
+class SPCMonitor:
+    """
+    Streaming statistical process control over pass/fail test outcomes
+
+    Every result updates two streams: the line-wide stream of its test and the
+    stream of its (test, fixture) pair. Fixture streams are judged against the
+    line-wide failure rate of the same test with three detectors (the
+    line-wide p-chart shows the same baseline as its center line):
+
+    - p-chart: failure proportion of each subgroup of subgroup_size results
+      against 3-sigma limits
+    - EWMA: exponentially weighted subgroup failure proportion against its
+      asymptotic limit
+    - Bernoulli CUSUM: log-likelihood ratio for a shift of the failure odds by
+      cusum_odds_ratio, alarming when it exceeds cusum_h
+
+    Alerts are only raised once the baseline has min_baseline results.
+    """
+
+    def __init__(self, subgroup_size=20, ewma_lambda=0.2, ewma_L=3.0,
+                 cusum_odds_ratio=3.0, cusum_h=5.0, min_baseline=50,
+                 max_points=200, max_alerts=500):
+        """
+        Initialize the monitor
+
+        Args:
+            subgroup_size (int): Results per p-chart subgroup
+            ewma_lambda (float): EWMA smoothing weight (0 < lambda <= 1)
+            ewma_L (float): EWMA control limit width in sigmas
+            cusum_odds_ratio (float): Failure odds shift the CUSUM is tuned to detect
+            cusum_h (float): CUSUM decision threshold
+            min_baseline (int): Line-wide results required before alerting
+            max_points (int): p-chart points kept per stream
+            max_alerts (int): Alerts kept in memory
+        """
+        self.subgroup_size = subgroup_size
+        self.ewma_lambda = ewma_lambda
+        self.ewma_L = ewma_L
+        self.cusum_odds_ratio = cusum_odds_ratio
+        self.cusum_h = cusum_h
+        self.min_baseline = min_baseline
+        self.max_points = max_points
+
+        self.alerts = deque(maxlen=max_alerts)
+        self._streams = {}
+        self._callbacks = []
+        self._lock = threading.Lock()
+
+    def on_alert(self, callback):
+        """
+        Register a callback run for every new alert
+
+        Args:
+            callback (callable): Called with the alert dictionary
+        """
+        with self._lock:
+            self._callbacks.append(callback)
+
+    def _stream(self, test_name, fixture):
+        key = (test_name, fixture)
+        stream = self._streams.get(key)
+        if stream is None:
+            stream = self._streams[key] = ProportionStream(test_name, fixture, self.max_points)
+        return stream
+
+    def _baseline(self, test_name):
+        """Line-wide failure rate of a test, or None while there is too little data"""
+        line = self._streams.get((test_name, LINE_WIDE))
+        if line is None or line.total < self.min_baseline:
+            return None
+        return min(max(line.failure_rate, MIN_BASELINE_RATE), 1 - MIN_BASELINE_RATE)
+
+    def _update(self, stream, failed, p0, timestamp):
+        """Apply one result to a stream and return the alerts it raised"""
+        alerts = []
+
+        stream.total += 1
+        stream.subgroup_total += 1
+        if failed:
+            stream.failed += 1
+            stream.subgroup_failed += 1
+
+        # p-chart subgroup and EWMA of the subgroup proportions
+        if stream.subgroup_total >= self.subgroup_size:
+            n = stream.subgroup_total
+            p_hat = stream.subgroup_failed / n
+            point = {"time": timestamp, "p": p_hat, "center": p0, "ucl": None, "lcl": None}
+            stream.subgroup_total = 0
+            stream.subgroup_failed = 0
+
+            if p0 is not None:
+                sigma = math.sqrt(p0 * (1 - p0) / n)
+                point["ucl"] = min(1.0, p0 + 3 * sigma)
+                point["lcl"] = max(0.0, p0 - 3 * sigma)
+                if p_hat > point["ucl"]:
+                    alerts.append(("p-chart", p_hat, point["ucl"]))
+
+                # Upper limit only: more failures is the concern
+                stream.ewma = p0 if stream.ewma is None else stream.ewma
+                stream.ewma = self.ewma_lambda * p_hat + (1 - self.ewma_lambda) * stream.ewma
+                ewma_ucl = p0 + self.ewma_L * sigma * math.sqrt(self.ewma_lambda / (2 - self.ewma_lambda))
+                if stream.ewma > ewma_ucl:
+                    if not stream.ewma_alarm:
+                        stream.ewma_alarm = True
+                        alerts.append(("EWMA", stream.ewma, ewma_ucl))
+                else:
+                    stream.ewma_alarm = False
+
+            stream.points.append(point)
+
+        if p0 is None:
+            return alerts
+
+        # Bernoulli CUSUM for an upward shift of the failure odds (per result)
+        p1 = self.cusum_odds_ratio * p0 / (1 - p0 + self.cusum_odds_ratio * p0)
+        if failed:
+            stream.cusum += math.log(p1 / p0)
+        else:
+            stream.cusum += math.log((1 - p1) / (1 - p0))
+        stream.cusum = max(0.0, stream.cusum)
+        if stream.cusum > self.cusum_h:
+            alerts.append(("CUSUM", stream.cusum, self.cusum_h))
+            stream.cusum = 0.0
+
+        return alerts
+
+    def add_result(self, test_name, result, fixture=None, timestamp=None):
+        """
+        Feed one result event
+
+        Args:
+            test_name (str): Test name (e.g. "미터링 검사")
+            result (str): '통과' or '실패'
+            fixture (str): Fixture name (None or empty for unassigned ports)
+            timestamp (float): Event time (default: now)
+
+        Returns:
+            list: Alerts raised by this result
+        """
+        timestamp = time.time() if timestamp is None else timestamp
+        failed = result != "통과"
+        fixture = fixture or "미지정"
+
+        with self._lock:
+            # Judge the fixture against the baseline before this result joins it
+            p0 = self._baseline(test_name)
+            # The line-wide chart is drawn against its own pooled rate; only fixtures raise alerts
+            self._update(self._stream(test_name, LINE_WIDE), failed, p0, timestamp)
+            raised = self._update(self._stream(test_name, fixture), failed, p0, timestamp)
+
+            new_alerts = []
+            for method, value, limit in raised:
+                stream = self._streams[(test_name, fixture)]
+                alert = {
+                    "time": timestamp,
+                    "test": test_name,
+                    "fixture": fixture,
+                    "method": method,
+                    "value": value,
+                    "limit": limit,
+                    "baseline": p0,
+                    "failure_rate": stream.failure_rate,
+                    "results": stream.total,
+                }
+                self.alerts.append(alert)
+                new_alerts.append(alert)
+            callbacks = list(self._callbacks) if new_alerts else []
+
+        for alert in new_alerts:
+            for callback in callbacks:
+                callback(alert)
+
+        return new_alerts
+
+    def p_chart(self, test_name, fixture=LINE_WIDE):
+        """
+        p-chart points of a stream
+
+        Args:
+            test_name (str): Test name
+            fixture (str): Fixture name (default: line-wide)
+
+        Returns:
+            list: Subgroup points (time, p, center, ucl, lcl), oldest first
+        """
+        with self._lock:
+            stream = self._streams.get((test_name, fixture))
+            return [dict(point) for point in stream.points] if stream else []
+
+    def summary(self):
+        """
+        Current state of every fixture stream
+
+        Returns:
+            list: One dictionary per (test, fixture) with counts, rates and detector state
+        """
+        with self._lock:
+            rows = []
+            for (test_name, fixture), stream in sorted(self._streams.items()):
+                if fixture == LINE_WIDE:
+                    continue
+                rows.append({
+                    "test": test_name,
+                    "fixture": fixture,
+                    "results": stream.total,
+                    "failure_rate": stream.failure_rate,
+                    "baseline": self._baseline(test_name),
+                    "ewma": stream.ewma,
+                    "cusum": stream.cusum,
+                    "alarm": stream.ewma_alarm,
+                })
+            return rows
+
+    def tests(self):
+        """Test names seen so far"""
+        with self._lock:
+            return sorted({test_name for test_name, _ in self._streams})
+
+    def fixtures(self, test_name):
+        """Fixture names seen for a test"""
+        with self._lock:
+            return sorted(fixture for name, fixture in self._streams if name == test_name and fixture != LINE_WIDE)
+
+    def reset(self):
+        """Drop all streams and alerts"""
+        with self._lock:
+            self._streams.clear()
+            self.alerts.clear()
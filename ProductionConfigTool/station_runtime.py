@@ -0,0 +1,424 @@
+"""
+Process-per-fixture station runtime
+
+Every fixture gets its own worker process that owns the fixture's
+SerialHandler and runs configuration and tests there, so framing, response
+parsing and result building for many ports never share one interpreter
+lock. The UI process only submits units and drains the event queue.
+
+Every test result is also written to the fixture's slot of a shared-memory
+ResultRing (result_ring.py), which the UI reads without going through the
+queue; with test_events=False the queue only carries the records below
+other than "test".
+
+Events are the JSON-lines records of cli.py plus "fixture":
+    {"type": "ready", "fixture", "baudrate"}    worker opened its port
+    {"type": "config", "fixture", "mac", "ok", "error"}
+    {"type": "test", "fixture", "mac", "test", "result", "result_code", "cause",
+     "error", "measurements", "time", "duration_s"}
+    {"type": "unit", "fixture", "mac", "passed", "tests_passed", "tests_total", "duration_s",
+     "batch_duration_s"}                        time of the batched tests, whose "test"
+                                                records have duration_s None
+    {"type": "auto", "fixture", "state", "mac"} hands-free cycle state (see run_auto_cycle)
+    {"type": "error", "fixture", "error"}       worker could not start, or MAC addresses ran out
+
+In hands-free mode (start_auto) a fixture needs no submitted units: it
+configures and tests every board seated in it. With two fixtures the
+operator loads one while the other tests (ping-pong); MAC addresses are
+handed out in the order boards are seated, across fixtures.
+"""
+import time
+import queue
+import datetime
+import multiprocessing
+from serial_handler import SerialHandler, DEFAULT_BAUDRATE, PRESENCE_PROBE_TIMEOUT
+from test_engine import TEST_COMMANDS, ALL_TESTS, execute_test, execute_test_batch, supports_batch_tests
+from result_ring import ResultRing
+from cli import send_config
+
+# Workers are started with "spawn" so they never inherit the UI process threads
+_CONTEXT = multiprocessing.get_context("spawn")
+
+# Hands-free cycle states reported in "auto" events
+AUTO_WAITING = "waiting"    # fixture empty, waiting for a board
+AUTO_TESTING = "testing"    # configuring and testing the seated board
+AUTO_REMOVE = "remove"      # done, waiting for the board to be taken out
+AUTO_STOPPED = "stopped"    # hands-free mode ended
+
+def _open_handler(port, options):
+    if options.get("emulate") is not None:
+        from device_emulator import DeviceEmulator
+        return SerialHandler.from_serial(DeviceEmulator(**options["emulate"]))
+    return SerialHandler(port, options.get("baudrate", DEFAULT_BAUDRATE))
+
+def _shared_macs(counter, mac_start, mac_end):
+    """MAC addresses taken from a counter shared by all fixture workers"""
+    if mac_start is None:
+        # Tests only: boards are not addressed
+        while True:
+            yield None
+
+    # Without an end address the 2-byte MAC space is the limit
+    last = int(mac_end, 16) if mac_end is not None else 0xFFFF
+
+    while True:
+        with counter.get_lock():
+            index = counter.value
+            counter.value += 1
+        mac = int(mac_start, 16) + index
+        if mac > last:
+            return
+        yield f"{mac:04X}"
+
+def run_fixture_unit(serial_handler, fixture, unit, emit, batch=False, on_result=None, test_events=True):
+    """
+    Configure and test one unit on a fixture, emitting its records
+
+    Args:
+        serial_handler (SerialHandler): Fixture connection
+        fixture (str): Fixture name stored in every record
+        unit (dict): {"mac", "template" (bytes or None), "tests" (list or None), "verify"}
+        emit (callable): Receives every record
+        batch (bool): Run the tests with one batched command (a callable is asked
+                      once the board is configured)
+        on_result (callable): Optional callback(mac, test_type, outcome, duration) per test
+                              (duration is None for batched tests)
+        test_events (bool): Emit a record per test (False: only on_result sees them)
+
+    Returns:
+        bool: True if the unit passed
+    """
+    start_time = time.monotonic()
+    mac = unit.get("mac")
+    test_sequence = unit.get("tests") or ALL_TESTS
+    passed = 0
+    batch_duration = None
+
+    def unit_record(unit_passed):
+        return {"type": "unit", "fixture": fixture, "mac": mac, "passed": unit_passed, "tests_passed": passed,
+                "tests_total": len(test_sequence), "duration_s": round(time.monotonic() - start_time, 3),
+                "batch_duration_s": None if batch_duration is None else round(batch_duration, 4)}
+
+    if unit.get("template") is not None:
+        config_record = send_config(serial_handler, unit["template"], mac, unit.get("verify"))
+        emit(dict(config_record, fixture=fixture))
+        if not config_record["ok"]:
+            emit(unit_record(False))
+            return False
+
+    if callable(batch):
+        batch = batch()
+
+    if batch and len(test_sequence) > 1:
+        batch_start = time.monotonic()
+        outcomes = execute_test_batch(test_sequence, serial_handler)
+        # One time for the whole batch, recorded once on the unit record
+        batch_duration = time.monotonic() - batch_start
+    else:
+        outcomes = None
+
+    for test_type in test_sequence:
+        if outcomes is not None:
+            outcome, duration = outcomes[test_type], None
+        else:
+            test_start = time.monotonic()
+            outcome = execute_test(test_type, serial_handler)
+            duration = time.monotonic() - test_start
+
+        if outcome["result"] == "통과":
+            passed += 1
+        if on_result:
+            on_result(mac, test_type, outcome, duration)
+        if not test_events:
+            continue
+
+        emit({
+            "type": "test",
+            "fixture": fixture,
+            "mac": mac,
+            "test": f"{test_type} 검사",
+            "result": outcome["result"],
+            "result_code": outcome["result_code"],
+            "cause": outcome["cause"],
+            "error": outcome["error"],
+            "measurements": outcome["measurements"] or None,
+            "time": datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "duration_s": None if duration is None else round(duration, 4)
+        })
+
+    unit_passed = passed == len(test_sequence)
+    emit(unit_record(unit_passed))
+    return unit_passed
+
+def run_auto_cycle(serial_handler, fixture, cycle, emit, macs, cancel, batch=False, on_result=None, test_events=True):
+    """
+    Hands-free loop: wait for a board, configure and test it, wait for its removal, repeat
+
+    Args:
+        serial_handler (SerialHandler): Fixture connection
+        fixture (str): Fixture name stored in every record
+        cycle (dict): {"template", "tests", "verify"} applied to every board
+        emit (callable): Receives every record
+        macs (iterator): MAC address for each seated board, taken when it is seated
+        cancel (callable): Polled while waiting for a board; returning True ends the loop
+        batch, on_result, test_events: As for run_fixture_unit
+
+    Returns:
+        int: Units run
+    """
+    units = 0
+
+    def state(name, mac=None):
+        emit({"type": "auto", "fixture": fixture, "state": name, "mac": mac})
+
+    while True:
+        state(AUTO_WAITING)
+        if not serial_handler.wait_for_device(present=True, timeout=None, cancel=cancel):
+            break
+
+        try:
+            mac = next(macs)
+        except StopIteration:
+            emit({"type": "error", "fixture": fixture, "error": "할당할 MAC 주소가 남아 있지 않습니다."})
+            break
+
+        state(AUTO_TESTING, mac)
+        run_fixture_unit(serial_handler, fixture, dict(cycle, mac=mac), emit, batch=batch,
+                         on_result=on_result, test_events=test_events)
+        units += 1
+
+        state(AUTO_REMOVE, mac)
+        if not serial_handler.wait_for_device(present=False, timeout=None, cancel=cancel):
+            break
+
+    state(AUTO_STOPPED)
+    return units
+
+def _fixture_worker(fixture, port, options, commands, events, ring_name, ring_index, unit_counter):
+    """Worker process body: own the fixture port and run submitted units until told to stop"""
+    ring = ResultRing(name=ring_name)
+
+    def write_result(mac, test_type, outcome, duration):
+        ring.write(ring_index, mac, TEST_COMMANDS[test_type], outcome["result_code"], duration,
+                   outcome["result"] == "통과", cause=outcome["cause"], measurements=outcome["measurements"])
+
+    try:
+        serial_handler = _open_handler(port, options)
+        serial_handler.presence_line = options.get("presence_line")
+        if options.get("negotiate"):
+            serial_handler.negotiate_baudrate()
+    except Exception as e:
+        events.put({"type": "error", "fixture": fixture, "error": str(e)})
+        ring.close()
+        return
+
+    events.put({"type": "ready", "fixture": fixture, "baudrate": serial_handler.serial.baudrate})
+
+    # Firmware capability is asked of the first board that answers (a hands-free
+    # fixture is usually empty when the worker starts)
+    capability = {"batch": None}
+
+    def batch():
+        if capability["batch"] is None:
+            capability["batch"] = supports_batch_tests(serial_handler, timeout=PRESENCE_PROBE_TIMEOUT)
+        return bool(capability["batch"])
+
+    # A command that arrives during hands-free mode ends it and runs next
+    pending = []
+
+    def command_waiting():
+        try:
+            pending.append(commands.get_nowait())
+        except queue.Empty:
+            return False
+        return True
+
+    try:
+        while True:
+            unit = pending.pop(0) if pending else commands.get()
+            if unit is None:
+                break
+            if "auto" not in unit:
+                run_fixture_unit(serial_handler, fixture, unit, events.put, batch=batch,
+                                 on_result=write_result, test_events=options["test_events"])
+            elif unit["auto"]:
+                macs = _shared_macs(unit_counter, unit["mac_start"], unit["mac_end"])
+                run_auto_cycle(serial_handler, fixture, unit, events.put, macs, command_waiting, batch=batch,
+                               on_result=write_result, test_events=options["test_events"])
+    except Exception as e:
+        # Report instead of vanishing, so the UI does not wait on a fixture that stopped
+        events.put({"type": "error", "fixture": fixture, "error": f"작업 프로세스 오류: {e}"})
+        events.put({"type": "auto", "fixture": fixture, "state": AUTO_STOPPED, "mac": None})
+    finally:
+        serial_handler.close()
+        ring.close()
+
+class StationRuntime:
+    """
+    Pool of fixture worker processes
+
+    Units are submitted to a fixture's command queue and every record comes
+    back on one shared event queue, in completion order across fixtures.
+    """
+
+    def __init__(self, fixtures, emulate=None, baudrate=DEFAULT_BAUDRATE, negotiate=False,
+                 test_events=True, ring_capacity=4096, presence_line=None):
+        """
+        Describe the station (call start() to launch the workers)
+
+        Args:
+            fixtures (dict): Fixture name -> serial port device
+            emulate (dict): DeviceEmulator keyword arguments to use emulated boards
+                            instead of the ports (default: real ports)
+            baudrate (int): Rate the ports are opened at
+            negotiate (bool): Negotiate the fastest link rate in every worker
+            test_events (bool): Also send every test result over the event queue
+                                (False: results only travel through the ring)
+            ring_capacity (int): Results kept per fixture in the shared-memory ring
+            presence_line (str): Modem status line wired to the fixtures' board-seated
+                                 switch (serial_handler.PRESENCE_LINES; default: status polling)
+        """
+        self.fixtures = dict(fixtures)
+        self.options = {"emulate": emulate, "baudrate": baudrate, "negotiate": negotiate,
+                        "test_events": test_events, "presence_line": presence_line}
+
+        # Next MAC address index of the hands-free cycle, shared by the workers
+        self._unit_counter = _CONTEXT.Value("l", 0)
+
+        # Ring slot per fixture, in fixture order
+        self.ring = ResultRing(len(self.fixtures), capacity=ring_capacity)
+        self._ring_cursors = [0] * len(self.fixtures)
+        self._ring_lost = 0
+
+        self._events = _CONTEXT.Queue()
+        self._commands = {}
+        self._workers = {}
+
+    def start(self):
+        """Launch one worker process per fixture"""
+        for ring_index, (fixture, port) in enumerate(self.fixtures.items()):
+            if fixture in self._workers:
+                continue
+            commands = _CONTEXT.Queue()
+            worker = _CONTEXT.Process(
+                target=_fixture_worker,
+                args=(fixture, port, self.options, commands, self._events, self.ring.name, ring_index,
+                      self._unit_counter),
+                name=f"fixture-{fixture}",
+                daemon=True
+            )
+            worker.start()
+            self._commands[fixture] = commands
+            self._workers[fixture] = worker
+
+    def submit(self, fixture, mac=None, template=None, tests=None, verify=None):
+        """
+        Queue one unit on a fixture
+
+        Args:
+            fixture (str): Fixture name
+            mac (str): MAC address (last 2 bytes, HEX)
+            template (bytes): Compiled configuration packet (None = tests only)
+            tests (list): Test sequence (default: all tests)
+            verify (str): Configuration verification mode ("ack", "readback" or None)
+        """
+        self._commands[fixture].put({"mac": mac, "template": template, "tests": tests, "verify": verify})
+
+    def start_auto(self, template=None, tests=None, verify=None, mac_start=None, mac_end=None, fixtures=None):
+        """
+        Switch fixtures to hands-free mode (every seated board is configured and tested)
+
+        Args:
+            template (bytes): Compiled configuration packet (None = tests only)
+            tests (list): Test sequence (default: all tests)
+            verify (str): Configuration verification mode ("ack", "readback" or None)
+            mac_start (str): MAC address of the first board seated on any fixture
+            mac_end (str): Last MAC address to hand out (None = no limit)
+            fixtures (list): Fixture names (default: all)
+        """
+        with self._unit_counter.get_lock():
+            self._unit_counter.value = 0
+
+        for fixture in fixtures or self.fixtures:
+            self._commands[fixture].put({"auto": True, "template": template, "tests": tests, "verify": verify,
+                                         "mac_start": mac_start, "mac_end": mac_end})
+
+    def stop_auto(self, fixtures=None):
+        """
+        Leave hands-free mode (a fixture in the middle of a unit finishes it first)
+
+        Args:
+            fixtures (list): Fixture names (default: all)
+        """
+        for fixture in fixtures or self.fixtures:
+            self._commands[fixture].put({"auto": False})
+
+    def events(self, timeout=0, max_events=None):
+        """
+        Take the records produced since the last call
+
+        Args:
+            timeout (float): Seconds to wait for the first record
+            max_events (int): Stop after this many records
+
+        Returns:
+            list: Event dictionaries in arrival order
+        """
+        records = []
+        try:
+            records.append(self._events.get(timeout=timeout) if timeout else self._events.get_nowait())
+            while max_events is None or len(records) < max_events:
+                records.append(self._events.get_nowait())
+        except queue.Empty:
+            pass
+        return records
+
+    def results(self):
+        """
+        Take the test results written to the ring since the last call
+
+        Returns:
+            list: (fixture name, RECORD_DTYPE array) per fixture with new results
+        """
+        fresh = []
+        for ring_index, fixture in enumerate(self.fixtures):
+            records, self._ring_cursors[ring_index], lost = self.ring.read(ring_index, self._ring_cursors[ring_index])
+            self._ring_lost += lost
+            if len(records):
+                fresh.append((fixture, records))
+        return fresh
+
+    @property
+    def lost_results(self):
+        """Results overwritten in the ring before results() read them"""
+        return self._ring_lost
+
+    def alive(self):
+        """
+        Names of the fixtures whose worker is running
+
+        Returns:
+            list: Fixture names
+        """
+        return [fixture for fixture, worker in self._workers.items() if worker.is_alive()]
+
+    def stop(self, timeout=5):
+        """
+        Stop every worker after its current unit
+
+        Args:
+            timeout (float): Seconds to wait per worker before terminating it
+        """
+        for commands in self._commands.values():
+            commands.put(None)
+        for worker in self._workers.values():
+            worker.join(timeout)
+            if worker.is_alive():
+                worker.terminate()
+        self._commands.clear()
+        self._workers.clear()
+
+    def close(self):
+        """Stop the workers and release the result ring"""
+        self.stop()
+        self.ring.close()
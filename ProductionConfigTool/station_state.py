@@ -0,0 +1,209 @@
+import os
+import datetime
+import threading
+import pandas as pd
+from failure_index import FailureIndex
+from wire_capture import WireCapture, CAPTURE_DIR
+from measurement_limits import empty_measurement_frame
+
+# Columns of the test result table
+RESULT_COLUMNS = ['테스트', '결과', '시간', '제품 종류', '조명 회로', '콘센트 회로', '디밍 종류', 'MAC 주소', '픽스처', '오류 코드', '원인',
+                  '소요 시간 (초)']
+
+# Pass/fail statistic columns kept per test type and per day
+STATISTIC_COLUMNS = ['통과 수', '실패 수', '총 검사 수', '통과율']
+
+class StationState:
+    """
+    Station-level results, statistics and device connection shared by every session
+
+    One instance lives per process (app.get_station_state), so any number of
+    browser tabs see the same tables instead of holding copies. Writers
+    serialize on a lock and replace the tables instead of editing them in
+    place, so readers use whatever table they got without locking: it is a
+    consistent snapshot that later results never modify. Values derived from
+    the tables are computed once per change and shared by all viewers.
+    """
+
+    def __init__(self):
+        self.lock = threading.RLock()
+
+        # Held while a session talks to the device, so two tabs never interleave frames
+        self.device_lock = threading.RLock()
+        self.serial_handler = None
+
+        # Hands-free cycle in progress (hands_free.start_hands_free), None when off
+        self.hands_free = None
+
+        # Uploader to the line aggregation server (ResultUploader), None when off
+        self.result_uploader = None
+
+        self.version = 0
+        self._derived = {}
+        self.reset()
+
+    @property
+    def serial_connected(self):
+        """Whether the station has an open device connection"""
+        return self.serial_handler is not None
+
+    def connect(self, serial_handler):
+        """
+        Make a handler the station's device connection
+
+        Args:
+            serial_handler (SerialHandler): Opened connection
+        """
+        with self.device_lock:
+            self.serial_handler = serial_handler
+
+    def disconnect(self):
+        """Close and drop the device connection"""
+        with self.device_lock:
+            handler, self.serial_handler = self.serial_handler, None
+            if handler is not None:
+                if handler.capture is not None:
+                    handler.capture.close()
+                handler.close()
+
+    @property
+    def capture_path(self):
+        """File the device connection is being captured to (None when not capturing)"""
+        handler = self.serial_handler
+        if handler is None or handler.capture is None:
+            return None
+        return handler.capture.path
+
+    def start_capture(self, port_name=None):
+        """
+        Start recording every frame of the device connection to a new capture file
+
+        Args:
+            port_name (str): Port name stored in the capture
+        """
+        with self.device_lock:
+            if self.serial_handler is None or self.serial_handler.capture is not None:
+                return
+            path = os.path.join(CAPTURE_DIR, f"{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}.wcap")
+            self.serial_handler.attach_capture(WireCapture(path), port_name)
+
+    def stop_capture(self):
+        """Stop recording and close the capture file"""
+        with self.device_lock:
+            if self.serial_handler is None or self.serial_handler.capture is None:
+                return
+            self.serial_handler.capture.close()
+            self.serial_handler.attach_capture(None)
+
+    def set_result_uploader(self, uploader):
+        """
+        Send results to a new uploader and stop the previous one
+
+        Args:
+            uploader (ResultUploader): Started uploader (None to stop uploading)
+        """
+        with self.lock:
+            previous, self.result_uploader = self.result_uploader, uploader
+        if previous is not None:
+            previous.close()
+
+    def reset(self):
+        """Drop all results, statistics and measurements"""
+        with self.lock:
+            self.test_results = pd.DataFrame(columns=RESULT_COLUMNS)
+            self.test_count_by_type = pd.DataFrame(columns=['테스트'] + STATISTIC_COLUMNS)
+            self.daily_pass_rate = pd.DataFrame(columns=['날짜'] + STATISTIC_COLUMNS)
+            self.measurements = empty_measurement_frame()
+            self.failure_index = FailureIndex()
+            self._changed()
+
+    def clear_results(self):
+        """Drop the result table and failure index (statistics are kept)"""
+        with self.lock:
+            self.test_results = pd.DataFrame(columns=RESULT_COLUMNS)
+            self.failure_index.clear()
+            self._changed()
+
+    def add_result(self, record, measurement_row=None):
+        """
+        Append one test result and update the statistics
+
+        Args:
+            record (dict): Result row (RESULT_COLUMNS)
+            measurement_row (dict): Measurement table row for tests with measurements
+        """
+        with self.lock:
+            self.test_results = pd.concat(
+                [self.test_results, pd.DataFrame([record], columns=RESULT_COLUMNS)], ignore_index=True
+            )
+            self.update_statistics(record['테스트'], record['결과'])
+
+            if record['결과'] == '실패':
+                self.failure_index.add(
+                    record['테스트'], record['오류 코드'], record['원인'], record['제품 종류'], record['픽스처']
+                )
+
+            if measurement_row is not None:
+                row = pd.DataFrame([measurement_row]).astype(self.measurements.dtypes.to_dict())
+                self.measurements = pd.concat([self.measurements, row], ignore_index=True)
+
+            self._changed()
+
+    def update_statistics(self, test_name, result):
+        """
+        Count one result in the per-test and per-day statistics
+
+        Args:
+            test_name (str): Name of the test
+            result (str): Result of the test ('통과' or '실패')
+        """
+        today = datetime.datetime.now().strftime("%Y-%m-%d")
+
+        with self.lock:
+            self.test_count_by_type = _count_result(self.test_count_by_type, '테스트', test_name, result)
+            self.daily_pass_rate = _count_result(self.daily_pass_rate, '날짜', today, result)
+            self._changed()
+
+    def derived(self, key, compute):
+        """
+        Value computed from the current tables, shared by every session until the next change
+
+        Args:
+            key (str): Name of the derived value
+            compute (callable): Function of this state returning the value
+
+        Returns:
+            object: Cached or newly computed value
+        """
+        with self.lock:
+            version = self.version
+            cached = self._derived.get(key)
+            if cached is not None and cached[0] == version:
+                return cached[1]
+
+            value = compute(self)
+            self._derived[key] = (version, value)
+            return value
+
+    def _changed(self):
+        self.version += 1
+
+def _count_result(table, key_column, key, result):
+    """Return a copy of a statistics table with one more result counted for key"""
+    table = table.copy()
+    matches = table.index[table[key_column] == key]
+
+    if len(matches) == 0:
+        row = {key_column: key, '통과 수': 0, '실패 수': 0, '총 검사 수': 0, '통과율': 0.0}
+        table = pd.concat([table, pd.DataFrame([row])], ignore_index=True)
+        index = table.index[-1]
+    else:
+        index = matches[0]
+
+    if result == '통과':
+        table.at[index, '통과 수'] += 1
+    else:
+        table.at[index, '실패 수'] += 1
+    table.at[index, '총 검사 수'] += 1
+    table.at[index, '통과율'] = table.at[index, '통과 수'] / table.at[index, '총 검사 수'] * 100
+    return table
@@ -0,0 +1,360 @@
+import time
+import struct
+import datetime
+from serial_handler import ResponseTimeout
+
+# Command codes for different test types
+TEST_COMMANDS = {
+    "터치": 0x10,
+    "도플러 센서": 0x11,
+    "IR": 0x12,
+    "콘센트 릴레이": 0x13,
+    "조명 릴레이": 0x14,
+    "미터링": 0x15,
+    "LED": 0x16,
+    "부저": 0x17
+}
+
+# Default test sequence (all tests in protocol order)
+ALL_TESTS = list(TEST_COMMANDS.keys())
+
+# Status check command; byte [3] of its response carries the firmware capability flags
+STATUS_COMMAND = 0x01
+
+# Capability flag: the firmware understands BATCH_TEST_COMMAND
+CAPABILITY_BATCH_TEST = 0x01
+
+# Batched test command. The 1-byte data field is a bitmap of the tests to run
+# (bit n = command code 0x10 + n); the firmware runs them in protocol order and
+# answers with one frame: [2] 0 if every requested test passed, [3]~[10] the
+# result code of each bitmap bit, then the measurement payloads of the requested
+# tests (MEASUREMENT_LAYOUTS) back to back in protocol order.
+BATCH_TEST_COMMAND = 0x18
+BATCH_RESULT_OFFSET = 3
+BATCH_MEASUREMENT_OFFSET = BATCH_RESULT_OFFSET + len(TEST_COMMANDS)
+
+# Seconds the device may take per test before a response is considered missing
+TEST_TIMEOUT = 5
+
+# Failure causes by result code (response byte [2]) per test type.
+# Codes 1~0x7F are test specific; 0x80 and above are shared by every test.
+FAILURE_CODES = {
+    "터치": {1: "터치 채널 무응답", 2: "터치 감도 미달", 3: "터치 키 고착"},
+    "도플러 센서": {1: "센서 무응답", 2: "감지 신호 없음", 3: "오감지 (노이즈)"},
+    "IR": {1: "IR 수신 없음", 2: "IR 데이터 불일치"},
+    "콘센트 릴레이": {1: "릴레이 1 동작 불량", 2: "릴레이 2 동작 불량", 3: "릴레이 접점 융착"},
+    "조명 릴레이": {1: "릴레이 1 동작 불량", 2: "릴레이 2 동작 불량", 3: "릴레이 3 동작 불량", 4: "릴레이 접점 융착"},
+    "미터링": {1: "계량 IC 무응답", 2: "전압 측정 이상", 3: "전류 측정 이상", 4: "교정값 없음"},
+    "LED": {1: "LED 점등 불량", 2: "LED 색상 불량"},
+    "부저": {1: "부저 무음", 2: "부저 음량 미달"},
+}
+COMMON_FAILURE_CODES = {
+    0x80: "검사 시간 초과",
+    0xFE: "검사 준비 안 됨",
+    0xFF: "지원하지 않는 명령",
+}
+
+# Causes recorded when there is no result code
+NO_RESPONSE_CAUSE = "응답 없음"
+COMMUNICATION_ERROR_CAUSE = "통신 오류"
+
+# Cause recorded when the device did not answer within the test timeout
+RESPONSE_TIMEOUT_CAUSE = "응답 시간 초과"
+
+def describe_failure(test_type, result_code):
+    """
+    Look up the cause of a failure code
+
+    Args:
+        test_type (str): Type of test
+        result_code (int): Result code from the response (None when there was no response)
+
+    Returns:
+        str: Failure cause (None for a pass)
+    """
+    if result_code is None:
+        return NO_RESPONSE_CAUSE
+    if result_code == 0:
+        return None
+
+    cause = FAILURE_CODES.get(test_type, {}).get(result_code) or COMMON_FAILURE_CODES.get(result_code)
+    return cause or f"알 수 없는 오류 (코드 {result_code})"
+
+# Measurement payloads carried in test responses from byte [3]:
+# test type -> (little-endian layout, [(measurement name, raw counts per engineering unit)])
+# Outlet currents use the same raw units as outlet1/2_current_value in the config packet.
+MEASUREMENT_LAYOUTS = {
+    "미터링": (struct.Struct("<HHHH"), [
+        ("voltage", 10),            # [3]~[4] Line voltage (0.1 V)
+        ("outlet1_current", 1),     # [5]~[6] Outlet 1 current
+        ("outlet2_current", 1),     # [7]~[8] Outlet 2 current
+        ("power", 10),              # [9]~[10] Active power (0.1 W)
+    ]),
+}
+
+# Every measurement name in column order
+MEASUREMENT_NAMES = [name for _, fields in MEASUREMENT_LAYOUTS.values() for name, _ in fields]
+
+def decode_measurements(test_type, response, offset=3):
+    """
+    Decode the numeric measurements carried in a test response
+
+    Args:
+        test_type (str): Type of test that produced the response
+        response (bytes): 40-byte response frame
+        offset (int): Position of the measurement payload in the frame
+
+    Returns:
+        dict: Measurement name -> float (empty if the test carries no measurements)
+    """
+    layout = MEASUREMENT_LAYOUTS.get(test_type)
+    if layout is None or len(response) < offset + layout[0].size:
+        return {}
+
+    structure, fields = layout
+    raw_values = structure.unpack_from(response, offset)
+    return {name: raw / counts for (name, counts), raw in zip(fields, raw_values)}
+
+def batch_bitmap(test_sequence):
+    """
+    Encode a set of tests as a BATCH_TEST_COMMAND bitmap
+
+    Args:
+        test_sequence (list): Test types
+
+    Returns:
+        int: Bitmap with bit (command code - 0x10) set for every test
+    """
+    bitmap = 0
+    for test_type in test_sequence:
+        bitmap |= 1 << (TEST_COMMANDS[test_type] - TEST_COMMANDS[ALL_TESTS[0]])
+    return bitmap
+
+def supports_batch_tests(serial_handler, timeout=5):
+    """
+    Ask the device firmware whether it understands BATCH_TEST_COMMAND
+
+    Firmware without capability flags answers the status check with a zero
+    byte [3] and is treated as unsupported.
+
+    Args:
+        serial_handler (SerialHandler): Serial connection handler
+        timeout (float): Seconds to wait for the status response
+
+    Returns:
+        bool: True if batched tests can be used, None if the device did not answer
+    """
+    try:
+        serial_handler.send_command(STATUS_COMMAND, wait_for_response=False)
+        response = serial_handler.read_response(timeout=timeout, copy=False)
+    except Exception:
+        return None
+
+    if not response or len(response) < 4 or response[0] != 0xDA or response[-1] != 0x25:
+        return None
+    return bool(response[3] & CAPABILITY_BATCH_TEST)
+
+def _test_outcome(test_type, result_code, measurements):
+    """Build an execute_test style outcome from a received result code"""
+    outcome = {"result": "실패", "result_code": result_code, "cause": None, "error": None,
+               "measurements": measurements}
+
+    if result_code == 0:
+        outcome["result"] = "통과"
+    else:
+        outcome["cause"] = describe_failure(test_type, result_code)
+        outcome["error"] = f"{test_type} 검사 실패: {outcome['cause']} (오류 코드 {result_code})"
+    return outcome
+
+def execute_test(test_type, serial_handler):
+    """
+    Run a specific test on the device without any UI side effects
+
+    Args:
+        test_type (str): Type of test to run
+        serial_handler (SerialHandler): Serial connection handler
+
+    Returns:
+        dict: {"result": "통과" or "실패", "result_code": int or None,
+               "cause": str or None, "error": str or None, "measurements": dict}
+    """
+    outcome = {"result": "실패", "result_code": None, "cause": None, "error": None, "measurements": {}}
+
+    if not serial_handler:
+        outcome["error"] = "시리얼 연결이 필요합니다."
+        return outcome
+
+    if test_type not in TEST_COMMANDS:
+        outcome["error"] = f"알 수 없는 테스트 유형: {test_type}"
+        return outcome
+
+    command = TEST_COMMANDS[test_type]
+
+    try:
+        # Send test command
+        deadline = time.monotonic() + TEST_TIMEOUT
+        serial_handler.send_command(command, wait_for_response=False)
+        response = serial_handler.read_response(timeout=TEST_TIMEOUT, copy=False)
+
+        # A frame that answers another command (e.g. a late configuration ack) is not this result
+        while len(response) >= 3 and response[0] == 0xDA and response[-1] == 0x25 and response[1] != command:
+            response = serial_handler.read_response(timeout=max(0.0, deadline - time.monotonic()), copy=False)
+
+        # Process the response
+        if response and len(response) >= 3 and response[0] == 0xDA and response[-1] == 0x25:
+            # Check the result code (assuming it's in the 3rd byte)
+            return _test_outcome(test_type, response[2], decode_measurements(test_type, response))
+
+        outcome["cause"] = NO_RESPONSE_CAUSE
+        outcome["error"] = f"{test_type} 검사 실패: 응답 없음 또는 잘못된 응답"
+        return outcome
+
+    except ResponseTimeout as e:
+        outcome["cause"] = RESPONSE_TIMEOUT_CAUSE
+        outcome["error"] = f"{test_type} 검사 실패: {str(e)}"
+        return outcome
+    except Exception as e:
+        outcome["cause"] = COMMUNICATION_ERROR_CAUSE
+        outcome["error"] = f"{test_type} 검사 오류: {str(e)}"
+        return outcome
+
+def execute_test_batch(test_sequence, serial_handler):
+    """
+    Run several tests with one BATCH_TEST_COMMAND round-trip
+
+    The device runs the tests in protocol order regardless of the order given.
+    Only use this after supports_batch_tests() returned True.
+
+    Args:
+        test_sequence (list): Test types to run
+        serial_handler (SerialHandler): Serial connection handler
+
+    Returns:
+        dict: Test type -> execute_test style outcome
+    """
+    def failed_all(cause, error):
+        return {
+            test_type: {"result": "실패", "result_code": None, "cause": cause, "error": error, "measurements": {}}
+            for test_type in test_sequence
+        }
+
+    if not serial_handler:
+        return failed_all(None, "시리얼 연결이 필요합니다.")
+
+    unknown = [test_type for test_type in test_sequence if test_type not in TEST_COMMANDS]
+    if unknown:
+        return failed_all(None, f"알 수 없는 테스트 유형: {', '.join(unknown)}")
+
+    try:
+        serial_handler.send_command(BATCH_TEST_COMMAND, bytes([batch_bitmap(test_sequence)]), wait_for_response=False)
+        response = serial_handler.read_response(timeout=TEST_TIMEOUT * len(test_sequence), copy=False)
+    except ResponseTimeout as e:
+        return failed_all(RESPONSE_TIMEOUT_CAUSE, f"일괄 검사 실패: {str(e)}")
+    except Exception as e:
+        return failed_all(COMMUNICATION_ERROR_CAUSE, f"일괄 검사 오류: {str(e)}")
+
+    if not (response and len(response) >= BATCH_MEASUREMENT_OFFSET and response[0] == 0xDA
+            and response[1] == BATCH_TEST_COMMAND and response[-1] == 0x25):
+        return failed_all(NO_RESPONSE_CAUSE, "일괄 검사 실패: 응답 없음 또는 잘못된 응답")
+
+    requested = set(test_sequence)
+    outcomes = {}
+    offset = BATCH_MEASUREMENT_OFFSET
+    for position, test_type in enumerate(ALL_TESTS):
+        if test_type not in requested:
+            continue
+        measurements = decode_measurements(test_type, response, offset)
+        if test_type in MEASUREMENT_LAYOUTS:
+            offset += MEASUREMENT_LAYOUTS[test_type][0].size
+        outcomes[test_type] = _test_outcome(test_type, response[BATCH_RESULT_OFFSET + position], measurements)
+
+    return {test_type: outcomes[test_type] for test_type in test_sequence}
+
+def run_test_sequence(serial_handler, test_sequence=None, on_progress=None, test_runner=None, batch_runner=None):
+    """
+    Run a test sequence and summarize the results
+
+    Args:
+        serial_handler (SerialHandler): Serial connection handler
+        test_sequence (list): Test types to run (default: all tests)
+        on_progress (callable): Optional callback(test_name) before each test
+        test_runner (callable): Optional runner(test_type, serial_handler) returning
+                                an execute_test style dict (default: execute_test)
+        batch_runner (callable): Optional runner(test_sequence, serial_handler) returning
+                                 {test_type: outcome} (e.g. execute_test_batch); when
+                                 given, all tests run in one round-trip instead
+
+    Returns:
+        dict: {"results": {test_name: {"결과", "시간", "소요 시간 (초)", ["오류"], ["오류 코드"], ["원인"], ["측정값"]}},
+               "summary": {...}}
+               ("소요 시간 (초)" is measured with a monotonic clock; batched tests have no
+               time of their own, so it is None and the batch's time is
+               summary["일괄 검사 시간 (초)"], None when the tests ran one by one)
+    """
+    if test_sequence is None:
+        test_sequence = ALL_TESTS
+    if test_runner is None:
+        test_runner = execute_test
+
+    results = {}
+    summary = {
+        "총 검사 수": len(test_sequence),
+        "통과": 0,
+        "실패": 0,
+        "통과율": 0.0,
+        "시작 시간": datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "종료 시간": "",
+        "소요 시간": "",
+        "일괄 검사 시간 (초)": None
+    }
+
+    start_time = time.time()
+
+    if batch_runner is not None and test_sequence:
+        if on_progress:
+            on_progress(f"일괄 검사 ({len(test_sequence)}개)")
+        batch_start = time.monotonic()
+        batch_outcomes = batch_runner(test_sequence, serial_handler)
+        summary["일괄 검사 시간 (초)"] = time.monotonic() - batch_start
+
+    for test_type in test_sequence:
+        test_name = f"{test_type} 검사"
+
+        if batch_runner is not None:
+            outcome, duration = batch_outcomes[test_type], None
+        else:
+            if on_progress:
+                on_progress(test_name)
+            test_start = time.monotonic()
+            outcome = test_runner(test_type, serial_handler)
+            duration = time.monotonic() - test_start
+
+        results[test_name] = {
+            "결과": outcome["result"],
+            "시간": datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "소요 시간 (초)": duration
+        }
+        if outcome["error"]:
+            results[test_name]["오류"] = outcome["error"]
+        if outcome.get("cause"):
+            results[test_name]["오류 코드"] = outcome["result_code"]
+            results[test_name]["원인"] = outcome["cause"]
+        if outcome.get("measurements"):
+            results[test_name]["측정값"] = outcome["measurements"]
+
+        if outcome["result"] == "통과":
+            summary["통과"] += 1
+        else:
+            summary["실패"] += 1
+
+    end_time = time.time()
+    summary["종료 시간"] = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    summary["소요 시간"] = f"{end_time - start_time:.2f}초"
+
+    if summary["총 검사 수"] > 0:
+        summary["통과율"] = (summary["통과"] / summary["총 검사 수"]) * 100
+
+    return {
+        "results": results,
+        "summary": summary
+    }
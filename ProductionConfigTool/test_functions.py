@@ -1,6 +1,46 @@
-import time
-import random
 import streamlit as st
+from test_engine import execute_test, execute_test_batch
+from test_plan import resolve_test_plan
+
+def run_test_outcome(test_type, serial_handler):
+    """
+    Run a specific test on the device and report errors in the UI
+    
+    Args:
+        test_type (str): Type of test to run
+        serial_handler (SerialHandler): Serial connection handler
+        
+    Returns:
+        dict: Test outcome from test_engine.execute_test
+    """
+    # Show test is running
+    with st.spinner(f"{test_type} 검사 실행 중..."):
+        outcome = execute_test(test_type, serial_handler)
+    
+    if outcome["error"]:
+        st.error(outcome["error"])
+    
+    return outcome
+
+def run_batch_outcome(test_sequence, serial_handler):
+    """
+    Run several tests in one batched round-trip and report errors in the UI
+    
+    Args:
+        test_sequence (list): Types of test to run
+        serial_handler (SerialHandler): Serial connection handler
+        
+    Returns:
+        dict: Test type -> outcome from test_engine.execute_test_batch
+    """
+    with st.spinner(f"{len(test_sequence)}개 검사 일괄 실행 중..."):
+        outcomes = execute_test_batch(test_sequence, serial_handler)
+    
+    for outcome in outcomes.values():
+        if outcome["error"]:
+            st.error(outcome["error"])
+    
+    return outcomes
 
 def run_test(test_type, serial_handler):
     """
@@ -13,51 +53,7 @@ def run_test(test_type, serial_handler):
     Returns:
         str: "통과" if test passed, "실패" if failed
     """
-    if not serial_handler:
-        st.error("시리얼 연결이 필요합니다.")
-        return "실패"
-    
-    try:
-        # Command codes for different test types
-        test_commands = {
-            "터치": 0x10,
-            "도플러 센서": 0x11,
-            "IR": 0x12,
-            "콘센트 릴레이": 0x13,
-            "조명 릴레이": 0x14,
-            "미터링": 0x15,
-            "LED": 0x16,
-            "부저": 0x17
-        }
-        
-        if test_type not in test_commands:
-            st.error(f"알 수 없는 테스트 유형: {test_type}")
-            return "실패"
-        
-        # Show test is running
-        with st.spinner(f"{test_type} 검사 실행 중..."):
-            # Send test command
-            command_code = test_commands[test_type]
-            response = serial_handler.send_command(command_code)
-            
-            # Process the response
-            if response and len(response) >= 3:
-                if response[0] == 0xDA and response[-1] == 0x25:
-                    # Check the result code (assuming it's in the 3rd byte)
-                    result_code = response[2]
-                    
-                    if result_code == 0:
-                        return "통과"
-                    else:
-                        st.error(f"{test_type} 검사 실패: 오류 코드 {result_code}")
-                        return "실패"
-            
-            st.error(f"{test_type} 검사 실패: 응답 없음 또는 잘못된 응답")
-            return "실패"
-    
-    except Exception as e:
-        st.error(f"{test_type} 검사 오류: {str(e)}")
-        return "실패"
+    return run_test_outcome(test_type, serial_handler)["result"]
 
 def touch_test(serial_handler):
     """
@@ -155,30 +151,35 @@ def buzzer_test(serial_handler):
     """
     return run_test("부저", serial_handler) == "통과"
 
-def run_all_tests(serial_handler):
+def run_all_tests(serial_handler, config_data=None):
     """
     Run all tests sequentially
     
     Args:
         serial_handler (SerialHandler): Serial connection handler
+        config_data (dict): Configuration of the board under test; tests without
+                            matching hardware are skipped (default: run every test)
         
     Returns:
         dict: Dictionary with test results
     """
     results = {}
     
-    test_functions = [
-        touch_test,
-        doppler_sensor_test,
-        ir_test,
-        outlet_relay_test,
-        light_relay_test,
-        metering_test,
-        led_test,
-        buzzer_test
-    ]
-    
-    for test_func in test_functions:
+    test_functions = {
+        "터치": touch_test,
+        "도플러 센서": doppler_sensor_test,
+        "IR": ir_test,
+        "콘센트 릴레이": outlet_relay_test,
+        "조명 릴레이": light_relay_test,
+        "미터링": metering_test,
+        "LED": led_test,
+        "부저": buzzer_test
+    }
+    
+    test_sequence = resolve_test_plan(config_data) if config_data is not None else list(test_functions)
+    
+    for test_type in test_sequence:
+        test_func = test_functions[test_type]
         test_name = test_func.__name__.replace("_test", "").replace("_", " ")
         results[test_name] = test_func(serial_handler)
     
@@ -0,0 +1,85 @@
+import os
+import json
+from test_engine import ALL_TESTS
+from config_profiles import sku_profile_name
+
+# Per-SKU test plan overrides: {SKU name: {"include": [...], "exclude": [...]}} or
+# {SKU name: {"tests": [...]}} for an explicit sequence; "*" applies to every SKU
+TEST_PLAN_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "test_plans.json")
+
+# SKU key whose override applies to every SKU (before the SKU's own override)
+DEFAULT_SKU = "*"
+
+def applies(test_type, config_data):
+    """
+    Check whether a test applies to the hardware described by a configuration
+
+    Args:
+        test_type (str): Test type (key of test_engine.TEST_COMMANDS)
+        config_data (dict): Configuration parameters
+
+    Returns:
+        bool: False when the board has no hardware for the test
+    """
+    if test_type in ("콘센트 릴레이", "미터링"):
+        return config_data.get('outlet_circuits', 0) > 0
+    if test_type == "조명 릴레이":
+        return config_data.get('light_circuits', 0) > 0
+    if test_type == "IR":
+        return bool(config_data.get('ir_present', 0))
+    return True
+
+def load_plan_overrides(path=TEST_PLAN_FILE):
+    """
+    Load the per-SKU test plan overrides
+
+    Args:
+        path (str): JSON override file (no overrides when it does not exist)
+
+    Returns:
+        dict: {SKU name: {"include", "exclude"} or {"tests"}}
+    """
+    if not os.path.exists(path):
+        return {}
+
+    with open(path, encoding="utf-8") as f:
+        overrides = json.load(f)
+
+    for sku, override in overrides.items():
+        unknown = [t for key in ("tests", "include", "exclude") for t in override.get(key, []) if t not in ALL_TESTS]
+        if unknown:
+            raise ValueError(f"{sku}: 알 수 없는 검사: {', '.join(unknown)}")
+    return overrides
+
+def resolve_test_plan(config_data, overrides=None):
+    """
+    Derive the test sequence for a configuration
+
+    Tests without matching hardware (no outlet circuits, no IR receiver, ...)
+    are left out, then the "*" override and the SKU's own override are applied.
+    An explicit "tests" list replaces the derived plan; "include"/"exclude"
+    adjust it. The result is always in protocol order unless "tests" gives one.
+
+    Args:
+        config_data (dict): Configuration parameters
+        overrides (dict): Per-SKU overrides (default: load_plan_overrides())
+
+    Returns:
+        list: Test types to run
+    """
+    if overrides is None:
+        overrides = load_plan_overrides()
+
+    plan = [test_type for test_type in ALL_TESTS if applies(test_type, config_data)]
+
+    for sku in (DEFAULT_SKU, sku_profile_name(config_data)):
+        override = overrides.get(sku)
+        if not override:
+            continue
+        if "tests" in override:
+            plan = list(override["tests"])
+            continue
+        selected = (set(plan) | set(override.get("include", []))) - set(override.get("exclude", []))
+        plan = [test_type for test_type in ALL_TESTS if test_type in selected]
+
+    return plan
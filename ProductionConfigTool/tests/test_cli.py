@@ -0,0 +1,39 @@
+from cli import send_config
+from serial_handler import SerialHandler
+from device_emulator import DeviceEmulator
+from packet_builder import PacketBuilder
+from bench_station import CONFIG
+from test_engine import execute_test
+
+def test_unverified_config_ack_is_not_a_test_result():
+    handler = SerialHandler.from_serial(DeviceEmulator(test_results={0x10: 2}))
+    record = send_config(handler, PacketBuilder(CONFIG).build_template(), "0001", None)
+    assert record["ok"]
+
+    touch = execute_test("터치", handler)
+    led = execute_test("LED", handler)
+    assert (touch["result"], touch["result_code"]) == ("실패", 2)
+    assert (led["result"], led["result_code"]) == ("통과", 0)
+
+def test_stale_frame_is_skipped():
+    emulator = DeviceEmulator(test_results={0x10: 2})
+    handler = SerialHandler.from_serial(emulator)
+
+    # A configuration ack that arrived after the host stopped waiting for it
+    handler.send_packet(PacketBuilder(CONFIG).build_packet())
+    assert execute_test("터치", handler)["result_code"] == 2
+    assert emulator.in_waiting == 0
+
+def test_failed_negotiation_is_not_retried_per_unit(monkeypatch, capsys):
+    import cli
+    handler = SerialHandler.from_serial(DeviceEmulator(supported_baudrates=()))
+    handler.wait_for_device = lambda present, timeout: True
+    attempts = []
+    negotiate = handler.negotiate_baudrate
+    handler.negotiate_baudrate = lambda: attempts.append(1) or negotiate()
+    monkeypatch.setattr(cli, "open_handler", lambda args: handler)
+
+    assert cli.main(["--emulate", "--no-config", "--tests", "터치", "--mac", "0001", "--mac-end", "0003",
+                     "--negotiate"]) == 0
+    assert len(attempts) == 1
+    assert '"units": 3' in capsys.readouterr().out
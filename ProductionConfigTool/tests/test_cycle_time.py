@@ -0,0 +1,24 @@
+import time
+import pandas as pd
+import test_engine
+from test_engine import execute_test, RESPONSE_TIMEOUT_CAUSE
+from cycle_time import cycle_time_report
+from serial_handler import SerialHandler
+from device_emulator import DeviceEmulator
+
+def test_read_timeout_counts_as_timeout(monkeypatch):
+    monkeypatch.setattr(test_engine, "TEST_TIMEOUT", 0.1)
+    handler = SerialHandler.from_serial(DeviceEmulator(present=False))
+
+    start = time.monotonic()
+    outcome = execute_test("터치", handler)
+    duration = time.monotonic() - start
+    assert outcome["cause"] == RESPONSE_TIMEOUT_CAUSE
+
+    results = pd.DataFrame([
+        {"test": "터치 검사", "fixture": "A", "failure_cause": outcome["cause"], "duration": duration},
+        {"test": "터치 검사", "fixture": "A", "failure_cause": None, "duration": 0.01},
+    ])
+    report = cycle_time_report(results)
+    assert report["by_test"].loc[0, "timeout_share"] == 50.0
+    assert report["timeout_time_share"] > 50.0
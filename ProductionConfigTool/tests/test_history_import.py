@@ -0,0 +1,32 @@
+import pandas as pd
+from history_import import import_csv_files
+from result_server import ResultStore
+
+# Layout of "CSV 파일로 내보내기" before the MAC, fixture and failure columns existed
+BASELINE_EXPORT = pd.DataFrame({
+    '테스트': ['터치 검사', 'LED 검사', '터치 검사'],
+    '결과': ['통과', '실패', '통과'],
+    '시간': ['2026-01-05 09:00:01', '2026-01-05 09:00:02', '2026-01-05 09:01:30'],
+    '제품 종류': ['조명 스위치'] * 3,
+    '조명 회로': [1, 1, 1],
+    '콘센트 회로': [0, 0, 0],
+    '디밍 종류': [0, 0, 0],
+})
+
+def test_baseline_export_imports(tmp_path):
+    path = tmp_path / "export.csv"
+    BASELINE_EXPORT.to_csv(path, index=False, encoding="utf-8-sig")
+    store = ResultStore(":memory:")
+
+    first = import_csv_files([str(path)], store, workers=1)
+    assert first["errors"] == []
+    assert first["inserted"] == 3
+
+    rows = store.query("SELECT test, result, mac FROM results ORDER BY time")
+    assert [row["mac"] for row in rows] == [None] * 3
+    assert rows[1] == {"test": "LED 검사", "result": "실패", "mac": None}
+
+    # The same export imported again is recognized without a MAC
+    again = import_csv_files([str(path)], store, workers=1)
+    assert (again["inserted"], again["duplicates"]) == (0, 3)
+    store.close()
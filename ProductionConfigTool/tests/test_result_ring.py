@@ -0,0 +1,22 @@
+from result_ring import ResultRing, record_to_event
+from test_engine import TEST_COMMANDS, RESPONSE_TIMEOUT_CAUSE
+
+def test_records_carry_what_the_ui_records():
+    ring = ResultRing(1, capacity=8)
+    try:
+        ring.write(0, "00AB", TEST_COMMANDS["미터링"], 0, 0.25, True,
+                   measurements={"voltage": 220.5, "outlet1_current": 12.0})
+        ring.write(0, "00AB", TEST_COMMANDS["터치"], 2, 0.1, False)
+        ring.write(0, "00AB", TEST_COMMANDS["LED"], None, None, False, cause=RESPONSE_TIMEOUT_CAUSE)
+
+        records, cursor, lost = ring.read(0, 0)
+        assert (cursor, lost) == (3, 0)
+        metering, touch, led = (record_to_event(record) for record in records)
+    finally:
+        ring.close()
+
+    assert metering["measurements"] == {"voltage": 220.5, "outlet1_current": 12.0}
+    assert metering["duration_s"] == 0.25
+    assert (touch["result"], touch["result_code"], touch["cause"]) == ("실패", 2, "터치 감도 미달")
+    assert (led["result_code"], led["cause"], led["duration_s"]) == (None, RESPONSE_TIMEOUT_CAUSE, None)
+    assert led["mac"] == "00AB" and led["test"] == "LED 검사"
@@ -0,0 +1,43 @@
+import gzip
+import json
+import urllib.error
+import urllib.request
+from result_server import start_server_thread
+from result_uploader import ResultUploader
+
+def post(url, lines):
+    request = urllib.request.Request(f"{url}/results", data=gzip.compress("\n".join(lines).encode("utf-8")),
+                                     headers={"Content-Encoding": "gzip"}, method="POST")
+    with urllib.request.urlopen(request, timeout=5) as response:
+        return json.loads(response.read())
+
+def test_resent_batch_is_stored_once_and_bad_records_are_refused():
+    server, url = start_server_thread()
+    try:
+        batch = [json.dumps({"time": "2026-10-19 09:00:00", "test": "터치 검사", "result": "통과",
+                             "record_id": f"r{i}"}) for i in range(3)]
+        assert post(url, batch)["stored"] == 3
+        assert post(url, batch)["stored"] == 0
+
+        try:
+            post(url, ["[1, 2]"])
+            assert False, "non-object record accepted"
+        except urllib.error.HTTPError as e:
+            assert e.code == 400
+    finally:
+        server.shutdown()
+
+def test_refused_batch_does_not_block_the_spool(tmp_path):
+    server, url = start_server_thread()
+    uploader = ResultUploader(url, "station-1", spool_dir=str(tmp_path), flush_interval=60)
+    try:
+        # A batch the server rejects, spooled ahead of a good one
+        uploader._spool(gzip.compress(b"not json"))
+        uploader.enqueue({"time": "2026-10-19 09:00:00", "test": "터치 검사", "result": "통과"})
+        uploader.close()
+
+        assert uploader.uploaded == 1
+        assert uploader.spooled_batches == 0
+        assert len(list((tmp_path / "rejected").iterdir())) == 1
+    finally:
+        server.shutdown()
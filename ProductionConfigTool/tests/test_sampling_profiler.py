@@ -0,0 +1,39 @@
+import threading
+import time
+
+from sampling_profiler import SamplingProfiler
+
+
+def _busy(stop):
+    # Recurse to varying depths so the sampler keeps adding new stacks
+    def descend(depth):
+        if depth:
+            return descend(depth - 1)
+        return sum(range(200))
+
+    n = 0
+    while not stop.is_set():
+        descend(n % 40)
+        n += 1
+
+
+def test_running_profiler_can_be_read():
+    stop = threading.Event()
+    worker = threading.Thread(target=_busy, args=(stop,), daemon=True)
+    worker.start()
+
+    profiler = SamplingProfiler(interval=0.0005)
+    profiler.start(worker.ident)
+    try:
+        deadline = time.monotonic() + 1.0
+        while time.monotonic() < deadline:
+            profiler.stacks()
+            profiler.top_functions()
+            profiler.flame()
+    finally:
+        profiler.stop()
+        stop.set()
+        worker.join()
+
+    assert profiler.samples > 0
+    assert sum(count for _, count in profiler.stacks()) == profiler.samples
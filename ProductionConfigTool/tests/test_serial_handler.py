@@ -0,0 +1,34 @@
+from serial_handler import SerialHandler, DEFAULT_BAUDRATE
+from device_emulator import DeviceEmulator
+
+def seat_new_board(emulator):
+    """A freshly seated board boots at the default rate"""
+    emulator.device_baudrate = DEFAULT_BAUDRATE
+    emulator.present = True
+
+def test_swapped_boards_are_renegotiated():
+    emulator = DeviceEmulator()
+    handler = SerialHandler.from_serial(emulator)
+    assert handler.negotiate_baudrate([921600]) == 921600
+
+    for _ in range(3):
+        emulator.present = False
+        assert handler.wait_for_device(present=False, timeout=5, poll_interval=0)
+
+        # Empty polls while the fixture is open
+        assert not handler.wait_for_device(present=True, timeout=0.5, poll_interval=0)
+
+        seat_new_board(emulator)
+        assert handler.wait_for_device(present=True, timeout=5, poll_interval=0)
+        assert handler.serial.baudrate == 921600
+        assert emulator.device_baudrate == 921600
+
+def test_board_still_at_link_rate_is_found():
+    emulator = DeviceEmulator()
+    handler = SerialHandler.from_serial(emulator)
+    handler.negotiate_baudrate([921600])
+
+    # Host dropped to the base rate while the board kept the link rate
+    handler._set_port_baudrate(DEFAULT_BAUDRATE)
+    assert handler.wait_for_device(present=True, timeout=5, poll_interval=0)
+    assert handler.serial.baudrate == 921600
@@ -0,0 +1,34 @@
+import queue
+import multiprocessing
+import station_runtime
+from station_runtime import _fixture_worker, _shared_macs, AUTO_STOPPED
+from serial_handler import SerialHandler
+from device_emulator import DeviceEmulator
+from result_ring import ResultRing
+
+def test_mac_allocation_stops_at_ffff():
+    macs = _shared_macs(multiprocessing.Value("l", 0), "FFFE", None)
+    assert list(macs) == ["FFFE", "FFFF"]
+
+def test_worker_reports_a_crash(monkeypatch):
+    def crash(*args, **kwargs):
+        raise OSError("port vanished")
+
+    monkeypatch.setattr(station_runtime, "_open_handler",
+                        lambda port, options: SerialHandler.from_serial(DeviceEmulator()))
+    monkeypatch.setattr(station_runtime, "run_auto_cycle", crash)
+
+    ring = ResultRing(1, capacity=8)
+    commands, events = queue.Queue(), queue.Queue()
+    commands.put({"auto": True, "template": None, "tests": ["터치"], "verify": None,
+                  "mac_start": "0001", "mac_end": None})
+    try:
+        _fixture_worker("A", None, {"test_events": False}, commands, events, ring.name, 0,
+                        multiprocessing.Value("l", 0))
+    finally:
+        ring.close()
+
+    records = [events.get_nowait() for _ in range(events.qsize())]
+    assert records[0]["type"] == "ready"
+    assert records[1] == {"type": "error", "fixture": "A", "error": "작업 프로세스 오류: port vanished"}
+    assert records[2]["state"] == AUTO_STOPPED
@@ -0,0 +1,16 @@
+import pytest
+from utils import parse_mac_range, parse_mac_list
+
+@pytest.mark.parametrize("mac", ["0x12", "+123", " 123", "12 3", "123", "10000", "FFFG", "-001"])
+def test_malformed_range_macs_are_rejected(mac):
+    with pytest.raises(ValueError):
+        parse_mac_range(mac, "FFFF")
+
+@pytest.mark.parametrize("token", ["0x12", "+123", "123", "FFFG", "-001"])
+def test_malformed_list_macs_are_rejected(token):
+    with pytest.raises(ValueError):
+        parse_mac_list(f"0001, {token}")
+
+def test_mac_range_and_list():
+    assert parse_mac_range("fffe", "FFFF") == ["FFFE", "FFFF"]
+    assert parse_mac_list("00ab, AA:BB:CC:DD:00:0C\n00AB") == ["00AB", "000C"]
@@ -1,5 +1,9 @@
+import re
 import datetime
 
+# MAC address as used on the line: the last 2 bytes as exactly 4 hex digits (0000~FFFF)
+MAC_PATTERN = re.compile(r"[0-9A-Fa-f]{4}")
+
 def get_current_datetime_bytes():
     """
     Get current date and time formatted according to the protocol
@@ -90,3 +94,68 @@ def validate_hex_string(hex_str):
         return True
     except ValueError:
         return False
+
+def validate_mac(mac):
+    """
+    Validate a MAC address (last 2 bytes)
+    
+    Unlike int(mac, 16), this rejects prefixes, signs and whitespace ("0x12",
+    "+123", " 123") that would later fail in bytes.fromhex.
+    
+    Args:
+        mac (str): MAC address to validate
+        
+    Returns:
+        bool: True if mac is exactly 4 hex digits
+    """
+    return bool(mac) and MAC_PATTERN.fullmatch(mac) is not None
+
+def parse_mac_range(start_mac, end_mac):
+    """
+    Expand a MAC address range (last 2 bytes) into a list of addresses
+    
+    Args:
+        start_mac (str): First MAC address (4 hex digits)
+        end_mac (str): Last MAC address (4 hex digits, inclusive)
+        
+    Returns:
+        list: Upper-case 4-digit hex strings
+    """
+    for mac in (start_mac, end_mac):
+        if not validate_mac(mac):
+            raise ValueError(f"잘못된 MAC 주소: {mac}")
+
+    start = int(start_mac, 16)
+    end = int(end_mac, 16)
+
+    if end < start:
+        raise ValueError("종료 MAC 주소가 시작 MAC 주소보다 작습니다.")
+
+    return [f"{value:04X}" for value in range(start, end + 1)]
+
+def parse_mac_list(text):
+    """
+    Read MAC addresses from a list separated by newlines, commas or spaces
+    
+    Args:
+        text (str): MAC address list
+        
+    Returns:
+        list: Upper-case 4-digit hex strings (input order, duplicates removed)
+    """
+    mac_addresses = []
+    seen = set()
+
+    for token in text.replace(",", " ").split():
+        mac = token.strip().upper()
+        # Accept 'AA:BB' or full MAC addresses and keep the last 2 bytes
+        mac = mac.replace(":", "").replace("-", "")[-4:]
+
+        if not validate_mac(mac):
+            raise ValueError(f"잘못된 MAC 주소: {token}")
+
+        if mac not in seen:
+            seen.add(mac)
+            mac_addresses.append(mac)
+
+    return mac_addresses
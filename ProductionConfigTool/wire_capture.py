@@ -0,0 +1,289 @@
+"""
+Binary wire-level capture and replay for SerialHandler
+
+Capture file layout (little-endian):
+    8-byte magic b"PCTCAP01"
+    records: timestamp_ns (u64, time.monotonic_ns), port_id (u16),
+             direction (u8), reserved (u8), length (u32), payload
+
+Direction 0 is host -> device (TX), 1 is device -> host (RX). A PORT record
+(direction 2) maps a port_id to its name and is written once per port.
+
+Usage:
+    python wire_capture.py dump capture.wcap
+"""
+import os
+import sys
+import time
+import struct
+import threading
+
+CAPTURE_MAGIC = b"PCTCAP01"
+
+# Default directory for captures started from the app
+CAPTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "captures")
+
+RECORD_HEADER = struct.Struct("<QHBxI")
+
+DIRECTION_TX = 0
+DIRECTION_RX = 1
+DIRECTION_PORT = 2
+
+DIRECTION_NAMES = {DIRECTION_TX: "TX", DIRECTION_RX: "RX", DIRECTION_PORT: "PORT"}
+
+class WireCapture:
+    """
+    Append-only binary log of serial frames with bounded in-memory batching
+
+    Records are packed into an in-memory batch and written with a single
+    write() once the batch reaches batch_bytes or flush_interval has passed,
+    so the per-frame cost on the I/O path is one struct pack and a copy.
+    """
+
+    def __init__(self, path, batch_bytes=64 * 1024, flush_interval=1.0):
+        """
+        Open (or append to) a capture file
+
+        Args:
+            path (str): Capture file path
+            batch_bytes (int): Batch size that triggers a write to disk
+            flush_interval (float): Maximum seconds a record stays in memory
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        is_new = not os.path.exists(path) or os.path.getsize(path) == 0
+        self.path = path
+        self._file = open(path, "ab")
+        if is_new:
+            self._file.write(CAPTURE_MAGIC)
+
+        self.batch_bytes = batch_bytes
+        self.flush_interval = flush_interval
+        self._batch = bytearray()
+        self._last_flush = time.monotonic()
+        self._ports = {}
+        self._lock = threading.Lock()
+
+    def register_port(self, port_name):
+        """
+        Get the port ID used for a port name, writing its PORT record once
+
+        Args:
+            port_name (str): Port name (e.g. "COM3")
+
+        Returns:
+            int: Port ID
+        """
+        with self._lock:
+            if port_name not in self._ports:
+                port_id = len(self._ports)
+                self._ports[port_name] = port_id
+                self._append(port_id, DIRECTION_PORT, port_name.encode("utf-8"))
+            return self._ports[port_name]
+
+    def record(self, port_id, direction, data):
+        """
+        Record one frame
+
+        Args:
+            port_id (int): Port ID from register_port
+            direction (int): DIRECTION_TX or DIRECTION_RX
+            data (bytes): Frame bytes (any buffer object)
+        """
+        with self._lock:
+            self._append(port_id, direction, data)
+
+    def _append(self, port_id, direction, data):
+        batch = self._batch
+        batch += RECORD_HEADER.pack(time.monotonic_ns(), port_id, direction, len(data))
+        batch += data
+
+        if len(batch) >= self.batch_bytes or time.monotonic() - self._last_flush >= self.flush_interval:
+            self._flush()
+
+    def _flush(self):
+        if self._batch:
+            self._file.write(self._batch)
+            self._file.flush()
+            self._batch.clear()
+        self._last_flush = time.monotonic()
+
+    def flush(self):
+        """Write all batched records to disk"""
+        with self._lock:
+            self._flush()
+
+    def close(self):
+        """Flush and close the capture file"""
+        with self._lock:
+            if not self._file.closed:
+                self._flush()
+                self._file.close()
+
+def read_capture(path):
+    """
+    Read all records of a capture file
+
+    Args:
+        path (str): Capture file path
+
+    Returns:
+        list: (timestamp_ns, port_name, direction, data) tuples in file order
+    """
+    with open(path, "rb") as f:
+        content = f.read()
+
+    if content[:len(CAPTURE_MAGIC)] != CAPTURE_MAGIC:
+        raise ValueError(f"Not a capture file: {path}")
+
+    records = []
+    ports = {}
+    offset = len(CAPTURE_MAGIC)
+    view = memoryview(content)
+
+    while offset + RECORD_HEADER.size <= len(content):
+        timestamp_ns, port_id, direction, length = RECORD_HEADER.unpack_from(content, offset)
+        offset += RECORD_HEADER.size
+        data = bytes(view[offset:offset + length])
+        offset += length
+
+        if direction == DIRECTION_PORT:
+            ports[port_id] = data.decode("utf-8")
+        else:
+            records.append((timestamp_ns, ports.get(port_id, str(port_id)), direction, data))
+
+    return records
+
+class ReplayPort:
+    """
+    Fake serial port that plays back the device side of a capture
+
+    Each host write releases the RX frames that followed the matching TX frame
+    in the capture, delayed by their recorded latency divided by speed.
+    Written frames are compared with the recorded TX frames.
+    """
+
+    def __init__(self, records, port_name=None, speed=1.0):
+        """
+        Initialize the replay port
+
+        Args:
+            records (list): Records from read_capture
+            port_name (str): Port to replay (default: the first port in the capture)
+            speed (float): Playback speed factor (0 releases responses immediately)
+        """
+        if port_name is None and records:
+            port_name = records[0][1]
+
+        # Group the capture into exchanges: one TX frame and the RX frames after it
+        self._exchanges = []
+        for timestamp_ns, name, direction, data in records:
+            if name != port_name:
+                continue
+            if direction == DIRECTION_TX:
+                self._exchanges.append((data, timestamp_ns, []))
+            elif self._exchanges:
+                self._exchanges[-1][2].append((timestamp_ns, data))
+
+        self.speed = speed
+        self.is_open = True
+        self.mismatches = []
+        self._next_exchange = 0
+        self._pending = []
+        self._rx = bytearray()
+
+    @property
+    def finished(self):
+        """True once every recorded exchange has been replayed"""
+        return self._next_exchange >= len(self._exchanges) and not self._pending and not self._rx
+
+    def _release(self):
+        now = time.perf_counter()
+        while self._pending and self._pending[0][0] <= now:
+            self._rx += self._pending.pop(0)[1]
+
+    @property
+    def in_waiting(self):
+        self._release()
+        return len(self._rx)
+
+    def write(self, data):
+        frame = bytes(data)
+
+        if self._next_exchange >= len(self._exchanges):
+            self.mismatches.append((self._next_exchange, None, frame))
+            return len(frame)
+
+        expected, tx_timestamp_ns, responses = self._exchanges[self._next_exchange]
+        if frame != expected:
+            self.mismatches.append((self._next_exchange, expected, frame))
+        self._next_exchange += 1
+
+        now = time.perf_counter()
+        for rx_timestamp_ns, rx_data in responses:
+            delay = (rx_timestamp_ns - tx_timestamp_ns) / 1e9 / self.speed if self.speed else 0
+            self._pending.append((now + delay, rx_data))
+
+        return len(frame)
+
+    def readinto(self, buffer):
+        self._release()
+        count = min(len(buffer), len(self._rx))
+        buffer[:count] = self._rx[:count]
+        del self._rx[:count]
+        return count
+
+    def read(self, size=1):
+        data = bytearray(min(size, self.in_waiting))
+        self.readinto(data)
+        return bytes(data)
+
+    def reset_input_buffer(self):
+        self._rx.clear()
+
+    def close(self):
+        self.is_open = False
+
+def replay(records, port_name=None, speed=1.0):
+    """
+    Replay the host side of a capture through a SerialHandler on a ReplayPort
+
+    Args:
+        records (list): Records from read_capture
+        port_name (str): Port to replay (default: the first port in the capture)
+        speed (float): Playback speed factor (0 = as fast as possible)
+
+    Returns:
+        ReplayPort: The port after replay (see its mismatches attribute)
+    """
+    from serial_handler import SerialHandler
+
+    port = ReplayPort(records, port_name, speed)
+    handler = SerialHandler.from_serial(port)
+
+    for tx_data, _, responses in port._exchanges:
+        handler.send_packet(tx_data)
+        expected_bytes = sum(len(data) for _, data in responses)
+        if expected_bytes:
+            handler.read_response(expected_bytes=expected_bytes, copy=False)
+
+    return port
+
+def dump(path):
+    """Print a capture file as timestamped hex lines"""
+    records = read_capture(path)
+    if not records:
+        return
+
+    start_ns = records[0][0]
+    for timestamp_ns, port_name, direction, data in records:
+        print(f"{(timestamp_ns - start_ns) / 1e6:12.3f} ms  {port_name:<8} {DIRECTION_NAMES[direction]}  {data.hex(' ').upper()}")
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3 or sys.argv[1] != "dump":
+        print(__doc__)
+        sys.exit(1)
+
+    dump(sys.argv[2])
@@ -0,0 +1,197 @@
+import time
+import threading
+from collections import deque, OrderedDict
+
+class RollingWindow:
+    """
+    Time-based sliding window of result events with incrementally maintained counts
+
+    Each event is counted once when it arrives and subtracted once when it
+    falls out of the window, so updates and reads cost O(1) amortized and
+    memory is bounded by max_events.
+    """
+
+    def __init__(self, seconds, max_events=100000):
+        """
+        Initialize the window
+
+        Args:
+            seconds (float): Window length in seconds
+            max_events (int): Upper bound on events kept in memory
+        """
+        self.seconds = seconds
+        self._events = deque()
+        self._max_events = max_events
+        self.total = 0
+        self.failed = 0
+        self.test_totals = {}
+        self.test_failures = {}
+        self.units = {}
+        self.failed_units = {}
+
+    def add(self, timestamp, test_name, passed, unit, first_attempt):
+        """
+        Add an event
+
+        Args:
+            timestamp (float): Event time (time.time())
+            test_name (str): Test name
+            passed (bool): Whether the test passed
+            unit (str): Unit identifier (MAC address)
+            first_attempt (bool): First result of this test for the unit
+        """
+        self._events.append((timestamp, test_name, passed, unit, first_attempt))
+        self.total += 1
+        self.test_totals[test_name] = self.test_totals.get(test_name, 0) + 1
+        if not passed:
+            self.failed += 1
+            self.test_failures[test_name] = self.test_failures.get(test_name, 0) + 1
+
+        self.units[unit] = self.units.get(unit, 0) + 1
+        if first_attempt and not passed:
+            self.failed_units[unit] = self.failed_units.get(unit, 0) + 1
+
+        if len(self._events) > self._max_events:
+            self._evict_one()
+
+    def _evict_one(self):
+        timestamp, test_name, passed, unit, first_attempt = self._events.popleft()
+        self.total -= 1
+        self.test_totals[test_name] -= 1
+        if not self.test_totals[test_name]:
+            del self.test_totals[test_name]
+        if not passed:
+            self.failed -= 1
+            self.test_failures[test_name] -= 1
+            if not self.test_failures[test_name]:
+                del self.test_failures[test_name]
+
+        self.units[unit] -= 1
+        if not self.units[unit]:
+            del self.units[unit]
+        if first_attempt and not passed:
+            self.failed_units[unit] -= 1
+            if not self.failed_units[unit]:
+                del self.failed_units[unit]
+
+    def expire(self, now):
+        """Drop events older than the window"""
+        cutoff = now - self.seconds
+        while self._events and self._events[0][0] < cutoff:
+            self._evict_one()
+
+    def snapshot(self):
+        """
+        Current window statistics
+
+        Returns:
+            dict: Counts, rates and per-test failure rates for the window
+        """
+        unit_count = len(self.units)
+        return {
+            "window_seconds": self.seconds,
+            "tests": self.total,
+            "failed": self.failed,
+            "pass_rate": (self.total - self.failed) / self.total * 100 if self.total else None,
+            "units": unit_count,
+            "first_pass_yield": (unit_count - len(self.failed_units)) / unit_count * 100 if unit_count else None,
+            "units_per_hour": unit_count * 3600 / self.seconds,
+            "failure_rate_by_test": {
+                test_name: self.test_failures.get(test_name, 0) / count * 100
+                for test_name, count in sorted(self.test_totals.items())
+            },
+        }
+
+class YieldMonitor:
+    """
+    Live yield statistics over rolling windows, fed by a stream of result events
+
+    First-pass yield counts a unit as passed when the first result of every
+    test it ran was a pass; retests do not change it. Units are identified by
+    MAC address and remembered up to max_units (oldest forgotten first).
+    """
+
+    def __init__(self, windows=(900, 3600), max_units=50000):
+        """
+        Initialize the monitor
+
+        Args:
+            windows (tuple): Rolling window lengths in seconds
+            max_units (int): Units remembered for first-attempt tracking
+        """
+        self.windows = [RollingWindow(seconds) for seconds in windows]
+        self.started_at = time.time()
+        self.shift_total = 0
+        self.shift_failed = 0
+        self._units = OrderedDict()
+        self._max_units = max_units
+        self._lock = threading.Lock()
+
+    def add_result(self, test_name, result, unit, timestamp=None):
+        """
+        Feed one result event
+
+        Args:
+            test_name (str): Test name (e.g. "터치 검사")
+            result (str): '통과' or '실패'
+            unit (str): Unit identifier (MAC address)
+            timestamp (float): Event time (default: now)
+        """
+        timestamp = time.time() if timestamp is None else timestamp
+        passed = result == "통과"
+
+        with self._lock:
+            tested = self._units.get(unit)
+            if tested is None:
+                tested = self._units[unit] = set()
+                if len(self._units) > self._max_units:
+                    self._units.popitem(last=False)
+            else:
+                self._units.move_to_end(unit)
+
+            first_attempt = test_name not in tested
+            tested.add(test_name)
+
+            self.shift_total += 1
+            if not passed:
+                self.shift_failed += 1
+
+            for window in self.windows:
+                window.add(timestamp, test_name, passed, unit, first_attempt)
+                window.expire(timestamp)
+
+    def snapshot(self, now=None):
+        """
+        Statistics for every window plus shift totals
+
+        Args:
+            now (float): Reference time (default: now)
+
+        Returns:
+            dict: {"shift": {...}, "windows": [window snapshots]}
+        """
+        now = time.time() if now is None else now
+
+        with self._lock:
+            for window in self.windows:
+                window.expire(now)
+
+            return {
+                "shift": {
+                    "started_at": self.started_at,
+                    "tests": self.shift_total,
+                    "failed": self.shift_failed,
+                    "pass_rate": (self.shift_total - self.shift_failed) / self.shift_total * 100 if self.shift_total else None,
+                    "units": len(self._units),
+                },
+                "windows": [window.snapshot() for window in self.windows],
+            }
+
+    def reset(self):
+        """Start a new shift"""
+        with self._lock:
+            self.windows = [RollingWindow(window.seconds) for window in self.windows]
+            self.started_at = time.time()
+            self.shift_total = 0
+            self.shift_failed = 0
+            self._units.clear()